@@ -0,0 +1,618 @@
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Union
+from contextlib import asynccontextmanager
+import asyncio
+import configparser
+import itertools
+import logging
+from storageservice.awsmysqllib import AWSMySQLLib, _statement_template
+from storageservice.connectionpool import STATEMENT_ERRORS
+from storageservice.querystats import QueryEvent, QueryStats
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+
+class AsyncAWSMySQLLib:
+    """
+    An asyncio library for interacting with an AWS MySQL RDS instance.
+
+    Mirrors the methods of AWSMySQLLib as coroutines running over an aiomysql connection pool,
+    so many concurrent tasks can share a few connections without blocking the event loop.
+    """
+
+    def __init__(self, host: str, user: str, password: str, database: str, port: int,
+                 pool_min_size: int = 1, pool_max_size: int = 10, pool_timeout: float = 30.0,
+                 pool_max_idle: float = 300.0, slow_query_threshold: Optional[float] = 1.0):
+        """
+        Initialize the AsyncAWSMySQLLib instance with the given connection parameters.
+
+        Args:
+            host (str): The hostname of the MySQL server.
+            user (str): The username for the MySQL server.
+            password (str): The password for the MySQL server.
+            database (str): The database name.
+            port (int): The port number for the MySQL server.
+            pool_min_size (int): The number of pooled connections kept open while idle.
+            pool_max_size (int): The maximum number of pooled connections.
+            pool_timeout (float): Seconds to wait for a free pooled connection.
+            pool_max_idle (float): Seconds after which an unused connection is reopened on checkout.
+            slow_query_threshold (Optional[float]): Seconds above which a statement is logged as
+                slow, None to disable.
+
+        Raises:
+            ImportError: If aiomysql is not installed.
+        """
+        if aiomysql is None:
+            raise ImportError(
+                "AsyncAWSMySQLLib requires aiomysql, install it with 'pip install aiomysql'")
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.port = port
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_timeout = pool_timeout
+        self.pool_max_idle = pool_max_idle
+        self.pool = None
+        self._max_allowed_packet = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.query_stats = QueryStats(slow_query_threshold, self.logger)
+        self.logger.info(
+            f"Creating an instance of {str(self.__class__.__name__)}")
+
+    @classmethod
+    def init_from_file(cls, file_name: str) -> Union[None, 'AsyncAWSMySQLLib']:
+        """
+        Initialize an AsyncAWSMySQLLib instance from a configuration file.
+
+        Args:
+            file_name (str): The name of the configuration file.
+
+        Returns:
+            Union[None, 'AsyncAWSMySQLLib']: An instance of AsyncAWSMySQLLib if successful, None otherwise.
+        """
+        config = configparser.ConfigParser()
+        config.read(file_name)
+        try:
+            details = config['AWS_MYSQL_CONFIG']
+            return cls(
+                details['host'],
+                details['user'],
+                details['password'],
+                details['database'],
+                int(details['port']),
+                pool_min_size=details.getint('pool_min_size', fallback=1),
+                pool_max_size=details.getint('pool_max_size', fallback=10),
+                pool_timeout=details.getfloat('pool_timeout', fallback=30.0),
+                pool_max_idle=details.getfloat('pool_max_idle', fallback=300.0),
+                slow_query_threshold=details.getfloat('slow_query_threshold', fallback=1.0)
+            )
+        except (KeyError, configparser.Error) as err:
+            logging.getLogger(cls.__name__).exception(
+                f"Error reading configuration file '{file_name}': {err}")
+            return None
+
+    async def __aenter__(self) -> 'AsyncAWSMySQLLib':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close_connection()
+
+    async def test_can_reach_host(self) -> bool:
+        """
+        Test if the MySQL host can be reached.
+
+        Returns:
+            bool: True if the host can be reached, False otherwise.
+        """
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout=5)
+            writer.close()
+            self.logger.info(f"Can reach AWS RDS host: {self.host}:{self.port}")
+            return True
+        except Exception as e:
+            self.logger.exception(
+                f"Failed to reach AWS RDS host: {self.host}:{self.port}, Error: {e}")
+            return False
+
+    async def connect_to_rds_host(self) -> bool:
+        """
+        Connect to the AWS RDS host.
+
+        Returns:
+            bool: True if the connection is successful, False otherwise.
+        """
+        try:
+            await self._open_pool(None)
+            self.logger.debug(f"Connected to AWS RDS host: {self.host}:{self.port}")
+            return True
+        except Exception as e:
+            self.logger.exception(
+                f"Error connecting to AWS RDS host: {self.host}:{self.port}, Error: {e}")
+            return False
+
+    async def connect_to_database(self) -> bool:
+        """
+        Connect to the specified database on the AWS RDS host.
+
+        Returns:
+            bool: True if the connection is successful, False otherwise.
+        """
+        try:
+            await self._open_pool(self.database)
+            self.logger.debug(f"Connected to the database: {self.database}")
+            return True
+        except Exception as e:
+            self.logger.exception(f"Error connecting to the database: {e}")
+            return False
+
+    async def _open_pool(self, database: Optional[str]) -> None:
+        """
+        Replace any existing pool with a new aiomysql pool.
+
+        Args:
+            database (Optional[str]): The database pooled connections select, or None for the host only.
+        """
+        await self.close_connection()
+        self._max_allowed_packet = None
+        self.pool = await aiomysql.create_pool(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            db=database,
+            port=self.port,
+            minsize=self.pool_min_size,
+            maxsize=self.pool_max_size,
+            pool_recycle=self.pool_max_idle,
+            autocommit=True
+        )
+        async with self._borrow() as connection:
+            self.logger.debug(
+                f"Connected to AWS MySQL RDS (version {connection.get_server_info()})")
+
+    @asynccontextmanager
+    async def _borrow(self):
+        """
+        Borrow a pooled connection for a single library call.
+
+        Yields:
+            Connection: The aiomysql connection to run the call on.
+        """
+        # Bound locally, so the connection goes back to the pool it came from even if the
+        # instance reconnects or closes meanwhile.
+        pool = self.pool
+        if pool is None:
+            raise aiomysql.InterfaceError("Not connected to AWS RDS host")
+        connection = await asyncio.wait_for(pool.acquire(), self.pool_timeout)
+        try:
+            yield connection
+        except STATEMENT_ERRORS:
+            raise
+        except BaseException:
+            # The session state is unknown, so the connection must not be reused.
+            connection.close()
+            raise
+        finally:
+            pool.release(connection)
+
+    async def _execute(self, cursor: 'aiomysql.Cursor', query: str,
+                       params: Union[Sequence[Any], Dict[str, Any], None] = None,
+                       table: Optional[str] = None) -> int:
+        """
+        Execute a statement and record its latency, rows and size in query_stats.
+
+        Args:
+            cursor (Cursor): The cursor to execute the statement on.
+            query (str): The statement, with %s placeholders if params are given.
+            params (Union[Sequence[Any], Dict[str, Any], None]): The values for the placeholders.
+            table (Optional[str]): The table the statement targets, used to group statistics.
+
+        Returns:
+            int: The number of rows returned or affected, as reported by the driver.
+        """
+        # Unbuffered cursors do not know the row count until the result has been read.
+        with self.query_stats.timed(cursor, query, table, isinstance(cursor, aiomysql.SSCursor)):
+            return await cursor.execute(query, params)
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Summarize the statements executed by this instance.
+
+        Returns:
+            Dict[str, Dict]: 'total' with the count, errors, rows, statement bytes and
+                p50/p95/p99/max latencies in seconds over all statements, and 'statements' with
+                the same summary per "KIND table" key.
+        """
+        return self.query_stats.snapshot()
+
+    def add_query_listener(self, callback: Callable[[QueryEvent], None]) -> None:
+        """
+        Call a function with a QueryEvent for every statement this instance executes.
+
+        Args:
+            callback (Callable[[QueryEvent], None]): The function to call, e.g. a metrics exporter.
+        """
+        self.query_stats.add_listener(callback)
+
+    async def get_database_info(self, include_sizes: bool = False) -> list:
+        """
+        Retrieve detailed information about databases.
+
+        Args:
+            include_sizes (bool): Also report the number of tables and the data and index sizes
+                in bytes of each database.
+
+        Returns:
+            list: A list of dictionaries containing database information.
+        """
+        if include_sizes:
+            query = (
+                "SELECT s.SCHEMA_NAME, s.DEFAULT_CHARACTER_SET_NAME, s.DEFAULT_COLLATION_NAME, "
+                "COUNT(t.TABLE_NAME), COALESCE(SUM(t.DATA_LENGTH), 0), "
+                "COALESCE(SUM(t.INDEX_LENGTH), 0) "
+                "FROM information_schema.SCHEMATA s "
+                "LEFT JOIN information_schema.TABLES t ON t.TABLE_SCHEMA = s.SCHEMA_NAME "
+                "GROUP BY s.SCHEMA_NAME, s.DEFAULT_CHARACTER_SET_NAME, s.DEFAULT_COLLATION_NAME "
+                "ORDER BY s.SCHEMA_NAME")
+        else:
+            query = (
+                "SELECT SCHEMA_NAME, DEFAULT_CHARACTER_SET_NAME, DEFAULT_COLLATION_NAME "
+                "FROM information_schema.SCHEMATA ORDER BY SCHEMA_NAME")
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(cursor, query)
+                return [AWSMySQLLib._schema_row_to_info(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.exception(f"Error fetching database information: {e}")
+            return None
+
+    async def get_database_properties(self, database_name: str) -> Dict[str, str]:
+        """
+        Retrieve properties of a database.
+
+        Args:
+            database_name (str): The name of the database.
+
+        Returns:
+            Dict[str, str]: A dictionary containing database properties.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(
+                    cursor,
+                    "SELECT SCHEMA_NAME, DEFAULT_CHARACTER_SET_NAME, DEFAULT_COLLATION_NAME "
+                    "FROM information_schema.SCHEMATA WHERE SCHEMA_NAME = %s", (database_name,))
+                result = await cursor.fetchone()
+                return AWSMySQLLib._schema_row_to_info(result) if result else {}
+        except Exception as e:
+            self.logger.exception("Error fetching database properties: %s", e)
+            return {}
+
+    async def check_database_exists(self, database_name: str) -> bool:
+        """
+        Check if a database exists.
+
+        Args:
+            database_name (str): The name of the database.
+
+        Returns:
+            bool: True if the database exists, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(cursor, "SHOW DATABASES LIKE %s", (database_name,))
+                return await cursor.fetchone() is not None
+        except Exception as e:
+            self.logger.exception("Error checking if database exists: %s", e)
+            return False
+
+    async def create_database(self, database_name: str) -> bool:
+        """
+        Create a database.
+
+        Args:
+            database_name (str): The name of the database to create.
+
+        Returns:
+            bool: True if the database creation is successful, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(cursor, f"CREATE DATABASE `{database_name}`")
+            self.logger.info(
+                f"Database '{database_name}' created successfully.")
+            return True
+        except Exception as e:
+            self.logger.exception(
+                f"Error creating database '{database_name}': {e}")
+            return False
+
+    async def remove_database(self, database_name: str) -> bool:
+        """
+        Remove a database.
+
+        Args:
+            database_name (str): The name of the database to remove.
+
+        Returns:
+            bool: True if the database removal is successful, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(cursor, f"DROP DATABASE `{database_name}`")
+            self.logger.info(
+                f"Database '{database_name}' removed successfully.")
+            return True
+        except Exception as e:
+            self.logger.exception(
+                f"Error removing database '{database_name}': {e}")
+            return False
+
+    async def create_table(self, table_name: str, columns: Dict[str, str]) -> bool:
+        """
+        Create a table with the specified name and columns.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Dict[str, str]): A dictionary specifying column names and their data types.
+
+        Returns:
+            bool: True if the table creation is successful, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                column_definitions = ', '.join(
+                    f"{name} {data_type}" for name, data_type in columns.items())
+                await self._execute(cursor, f"CREATE TABLE {table_name} ({column_definitions})", table=table_name)
+            self.logger.info(f"Table '{table_name}' created successfully.")
+            return True
+        except Exception as e:
+            self.logger.exception(f"Error creating table '{table_name}': {e}")
+            return False
+
+    async def list_tables_with_columns(self) -> List[Dict[str, Union[str, List[Dict[str, str]]]]]:
+        """
+        List all tables within the database with details about their columns.
+
+        Returns:
+            List[Dict[str, Union[str, List[Dict[str, str]]]]]: A list of dictionaries containing table information.
+        """
+        table_info_list = []
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(
+                    cursor,
+                    "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, "
+                    "COLUMN_DEFAULT, EXTRA FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION")
+                table_info = None
+                for column_info in await cursor.fetchall():
+                    if table_info is None or table_info['table_name'] != column_info[0]:
+                        table_info = {'table_name': column_info[0], 'columns': []}
+                        table_info_list.append(table_info)
+                    table_info['columns'].append({
+                        'column_name': column_info[1],
+                        'data_type': column_info[2],
+                        'nullable': 'YES' if column_info[3] == 'YES' else 'NO',
+                        'key': column_info[4],
+                        'default': column_info[5],
+                        'extra': column_info[6]
+                    })
+            return table_info_list
+        except Exception as e:
+            self.logger.exception(
+                f"Error listing tables with column details: {e}")
+            return []
+
+    async def delete_table(self, table_name: str) -> bool:
+        """
+        Delete a table with the specified name.
+
+        Args:
+            table_name (str): The name of the table to delete.
+
+        Returns:
+            bool: True if the table deletion is successful, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(cursor, f"DROP TABLE IF EXISTS {table_name}", table=table_name)
+            self.logger.info(f"Table '{table_name}' deleted successfully.")
+            return True
+        except Exception as e:
+            self.logger.exception(f"Error deleting table '{table_name}': {e}")
+            return False
+
+    async def list_entries_in_table(self, table: str) -> Union[List[Dict[str, Union[str, int, float]]], None]:
+        """
+        List all entries within a specified table.
+
+        Args:
+            table (str): The name of the table.
+
+        Returns:
+            Union[List[Dict[str, Union[str, int, float]]], None]: A list of entries if successful, None otherwise.
+        """
+        try:
+            async with self._borrow() as connection, \
+                    connection.cursor(aiomysql.DictCursor) as cursor:
+                await self._execute(cursor, f"SELECT * FROM {table}", table=table)
+                entries = await cursor.fetchall()
+            self.logger.info(f"Listed {len(entries)} entries in table '{table}'.")
+            return entries
+        except Exception as e:
+            self.logger.exception(
+                f"Error listing entries in table '{table}': {e}")
+            return None
+
+    async def iter_entries(self, table: str, columns: Optional[Sequence[str]] = None,
+                           where: Union[str, Dict[str, Any], None] = None,
+                           batch_size: int = 1000) -> AsyncIterator[Dict[str, Union[str, int, float]]]:
+        """
+        Stream the entries of a specified table through an unbuffered server-side cursor.
+
+        Args:
+            table (str): The name of the table.
+            columns (Optional[Sequence[str]]): The columns to select, all columns if None.
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of
+                column names and values that must all match.
+            batch_size (int): The number of rows fetched from the server at a time.
+
+        Yields:
+            Dict[str, Union[str, int, float]]: One entry per row.
+
+        Raises:
+            Exception: Any error raised while querying, after it has been logged.
+        """
+        try:
+            select = ', '.join(columns) if columns else '*'
+            condition, params = AWSMySQLLib._build_where(where)
+            async with self._borrow() as connection:
+                cursor = await connection.cursor(aiomysql.SSDictCursor)
+                unread = False
+                try:
+                    await self._execute(cursor, f"SELECT {select} FROM {table}{condition}", params, table=table)
+                    unread = True
+                    while True:
+                        rows = await cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield row
+                    unread = False
+                finally:
+                    if unread:
+                        # Closing the cursor would read every remaining row off the socket.
+                        connection.close()
+                    else:
+                        await cursor.close()
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            self.logger.exception(
+                f"Error iterating entries in table '{table}': {e}")
+            raise
+
+    async def insert_record(self, table: str, data: Dict[str, Union[str, int, float]]) -> int:
+        """
+        Insert a record into the specified table.
+
+        Args:
+            table (str): The name of the table.
+            data (dict): A dictionary containing the column names and values for the new record.
+
+        Returns:
+            int: The ID of the inserted record if successful, -1 otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(
+                    cursor, _statement_template('insert', table, tuple(data)), tuple(data.values()), table=table)
+                record_id = cursor.lastrowid
+            self.logger.info(
+                f"Record inserted successfully. Record ID: {record_id}")
+            return record_id
+        except Exception as e:
+            self.logger.exception(f"Error inserting record: {e}")
+            return -1
+
+    async def insert_records(self, table: str, rows: Iterable[Dict[str, Union[str, int, float]]],
+                             max_rows_per_batch: int = 5000) -> int:
+        """
+        Insert many records into the specified table using multi-row INSERT statements.
+
+        Args:
+            table (str): The name of the table.
+            rows (Iterable[dict]): The records to insert, all with the same keys.
+            max_rows_per_batch (int): The maximum number of rows in a single INSERT statement.
+
+        Returns:
+            int: The number of records inserted if successful, -1 otherwise.
+        """
+        inserted = 0
+        try:
+            iterator = iter(rows)
+            first = next(iterator, None)
+            if first is None:
+                return 0
+            columns = tuple(first.keys())
+            header = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                if self._max_allowed_packet is None:
+                    await self._execute(cursor, "SELECT @@max_allowed_packet")
+                    self._max_allowed_packet = int((await cursor.fetchone())[0])
+                max_bytes = int(self._max_allowed_packet * 0.9) - len(header.encode())
+                for batch in AWSMySQLLib._iter_value_batches(
+                        connection, columns, itertools.chain([first], iterator),
+                        max_bytes, max_rows_per_batch):
+                    inserted += await self._execute(cursor, header + ', '.join(batch), table=table)
+            self.logger.info(
+                f"{inserted} records inserted successfully into '{table}'.")
+            return inserted
+        except Exception as e:
+            self.logger.exception(
+                f"Error inserting records into '{table}' after {inserted} rows: {e}")
+            return -1
+
+    async def update_record(self, table: str, record_id: int, data: Dict[str, Union[str, int, float]]) -> bool:
+        """
+        Update a record in the specified table.
+
+        Args:
+            table (str): The name of the table.
+            record_id (int): The ID of the record to update.
+            data (dict): A dictionary containing the column names and new values for the record.
+
+        Returns:
+            bool: True if the update is successful, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(
+                    cursor, _statement_template('update', table, tuple(data)),
+                    tuple(data.values()) + (record_id,), table=table)
+            self.logger.info("Record updated successfully.")
+            return True
+        except Exception as e:
+            self.logger.exception(f"Error updating record: {e}")
+            return False
+
+    async def delete_record(self, table: str, record_id: int) -> bool:
+        """
+        Delete a record from the specified table.
+
+        Args:
+            table (str): The name of the table.
+            record_id (int): The ID of the record to delete.
+
+        Returns:
+            bool: True if the deletion is successful, False otherwise.
+        """
+        try:
+            async with self._borrow() as connection, connection.cursor() as cursor:
+                await self._execute(cursor, _statement_template('delete', table), (record_id,), table=table)
+            self.logger.info("Record deleted successfully.")
+            return True
+        except Exception as e:
+            self.logger.exception(f"Error deleting record: {e}")
+            return False
+
+    async def close_connection(self) -> bool:
+        """
+        Close the pooled connections to the MySQL database if they are open.
+
+        Returns:
+            bool: True if the connections were successfully closed, False if there was no connection to close.
+        """
+        if self.pool is None:
+            return False
+        pool = self.pool
+        self.pool = None
+        pool.close()
+        await pool.wait_closed()
+        self.logger.debug("Connection closed.")
+        return True
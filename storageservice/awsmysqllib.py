@@ -1,18 +1,137 @@
-from typing import Dict, Union, List
+from typing import IO, Any, Callable, Dict, Union, List, Optional, Iterable, Iterator, Sequence, Tuple
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pymysql
+from pymysql.constants import CR, FIELD_TYPE, SERVER_STATUS
+import array
+import base64
+import csv
+import gzip
+import json
+import os
+import tempfile
+import warnings
 import configparser
 import socket
+import itertools
+import functools
+import time
+import threading
 import logging
 import logging.config
+from storageservice.connectionpool import ConnectionPool, PoolClosedError, PoolTimeoutError
+from storageservice.diagnostics import QueryDiagnostics
+from storageservice.options import CacheOptions, DiagnosticsOptions, PoolOptions, ReplicaOptions, WriteBehindOptions
+from storageservice.querystats import QueryEvent, QueryStats, statement_kind
+from storageservice.replicarouter import ReplicaRouter
+from storageservice.resultcache import ResultCache
+from storageservice.writebehind import WriteBehindBuffer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 logging.config.fileConfig('logging_storageservice.cfg')
 
 
+class TransactionRollbackError(Exception):
+    """
+    Raised when a transaction() block is rolled back because a library call inside it failed.
+    """
+
+
+@functools.lru_cache(maxsize=1024)
+def _statement_template(operation: str, table: str, columns: Tuple[str, ...] = ()) -> str:
+    """
+    Build a parameterized statement once per (operation, table, columns) signature.
+
+    The values are bound by the driver through %s placeholders, so repeated calls reuse the
+    same SQL text and the server sees one statement digest per signature.
+
+    Args:
+        operation (str): One of 'insert', 'update' or 'delete'.
+        table (str): The name of the table.
+        columns (Tuple[str, ...]): The columns written by the statement, in parameter order.
+
+    Returns:
+        str: The statement with one placeholder per column, followed by one for the id in
+            update and delete statements.
+    """
+    if operation == 'insert':
+        placeholders = ', '.join(['%s'] * len(columns))
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if operation == 'update':
+        updates = ', '.join(f"{column} = %s" for column in columns)
+        return f"UPDATE {table} SET {updates} WHERE id = %s"
+    if operation == 'delete':
+        return f"DELETE FROM {table} WHERE id = %s"
+    raise ValueError(f"Unknown statement operation: {operation}")
+
+
+@functools.lru_cache(maxsize=256)
+def _row_class(columns: Tuple[str, ...]) -> type:
+    """
+    Build the namedtuple class for rows with the given columns, once per column signature.
+
+    Every row of a result set shares the class, so column names are stored once instead of
+    in a dictionary per row. Column names that are not valid identifiers are renamed _0, _1, ...
+    for attribute access but keep their position for index access.
+
+    Args:
+        columns (Tuple[str, ...]): The column names, in result set order.
+
+    Returns:
+        type: A namedtuple class with one field per column.
+    """
+    return namedtuple('Row', columns, rename=True)
+
+
+_ColumnInfo = namedtuple('ColumnInfo', ['column_name', 'data_type', 'nullable', 'key', 'default', 'extra'])
+
+# Statement kinds that change a table's rows or definition and invalidate its cached results.
+_WRITE_KINDS = frozenset(
+    ('INSERT', 'REPLACE', 'UPDATE', 'DELETE', 'LOAD', 'TRUNCATE', 'DROP', 'ALTER', 'CREATE', 'RENAME'))
+
+# Statement kinds that change table definitions and invalidate the schema cache.
+_DDL_KINDS = frozenset(('CREATE', 'ALTER', 'DROP', 'RENAME'))
+
+# Statement kinds that only read and may run on a read replica.
+_READ_KINDS = frozenset(('SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN'))
+
+# Seconds to wait for a read replica to accept a connection. A read whose replica cannot be
+# reached falls back to the writer, so it should not wait pymysql's default of 10 seconds.
+_REPLICA_CONNECT_TIMEOUT = 2
+
+# Seconds a read waits for a busy replica pool before falling back to the writer.
+_REPLICA_CHECKOUT_TIMEOUT = 0.1
+
+# array.array typecodes of the column types fetch_columns() stores in compact numeric buffers.
+_COLUMN_TYPECODES = {
+    FIELD_TYPE.TINY: 'q',
+    FIELD_TYPE.SHORT: 'q',
+    FIELD_TYPE.INT24: 'q',
+    FIELD_TYPE.LONG: 'q',
+    FIELD_TYPE.LONGLONG: 'q',
+    FIELD_TYPE.YEAR: 'q',
+    FIELD_TYPE.FLOAT: 'd',
+    FIELD_TYPE.DOUBLE: 'd',
+}
+
+
 class AWSMySQLLib:
     """
     A library for interacting with an AWS MySQL RDS instance.
     """
 
-    def __init__(self, host: str, user: str, password: str, database: str, port: int):
+    def __init__(self, host: str, user: str, password: str, database: str, port: int,
+                 pool_options: Optional[PoolOptions] = None, replica_options: Optional[ReplicaOptions] = None,
+                 cache_options: Optional[CacheOptions] = None,
+                 write_behind_options: Optional[WriteBehindOptions] = None,
+                 diagnostics_options: Optional[DiagnosticsOptions] = None,
+                 slow_query_threshold: Optional[float] = 1.0, local_infile: bool = False,
+                 row_format: str = 'dict'):
         """
         Initialize the AWSMySQLLib instance with the given connection parameters.
 
@@ -22,25 +141,83 @@ class AWSMySQLLib:
             password (str): The password for the MySQL server.
             database (str): The database name.
             port (int): The port number for the MySQL server.
+            pool_options (Optional[PoolOptions]): The connection pool settings.
+            replica_options (Optional[ReplicaOptions]): The read replicas reads are routed to,
+                None to send every statement to the writer.
+            cache_options (Optional[CacheOptions]): The schema and result cache settings. The
+                result cache is off unless result_size is set.
+            write_behind_options (Optional[WriteBehindOptions]): Queue insert_record() calls
+                outside transactions and write them in batches from a background thread, None
+                to write them immediately.
+            diagnostics_options (Optional[DiagnosticsOptions]): Explain slow statements in the
+                background and record the expensive steps of their plans, None to disable.
+            slow_query_threshold (Optional[float]): Seconds above which a statement is logged as
+                slow, None to disable.
+            local_infile (bool): Allow LOAD DATA LOCAL INFILE, which bulk_load() requires. Only
+                enable it for trusted servers, since the server chooses which file is sent.
+            row_format (str): The default form of rows returned by the read methods: 'dict' for
+                dictionaries, or 'tuple' for namedtuples with attribute and index access, which
+                use several times less memory for large results.
         """
+        if row_format not in ('dict', 'tuple'):
+            raise ValueError(f"Unknown row format: {row_format}")
         self.host = host
         self.user = user
         self.password = password
         self.database = database
         self.port = port
-        self.connection = None
+        self.pool_options = pool_options or PoolOptions()
+        self.replica_options = replica_options or ReplicaOptions()
+        self.cache_options = cache_options or CacheOptions()
+        self.write_behind_options = write_behind_options
+        self.local_infile = local_infile
+        self.row_format = row_format
+        self.write_buffer = None
+        self.pool = None
+        self.replicas = None
+        self._local = threading.local()
+        self._max_allowed_packet = None
+        self._upsert_alias = None
+        self._schema_cache: Dict[Tuple[Optional[str], str], Tuple[float, list]] = {}
+        self._schema_cache_lock = threading.Lock()
+        self._schema_cache_generation = 0
+        self._connected_database = None
+        # The unpooled connection handed out by the deprecated connection property.
+        self._legacy_connection = None
+        self._legacy_connection_lock = threading.Lock()
+        cache_options = self.cache_options
+        self.result_cache = ResultCache(cache_options.result_size, cache_options.result_ttl,
+                                        cache_options.result_max_bytes) if cache_options.result_size > 0 else None
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.query_stats = QueryStats(slow_query_threshold, self.logger)
+        self.diagnostics = None
+        if diagnostics_options is not None:
+            self.diagnostics = QueryDiagnostics(
+                self._explain,
+                threshold=diagnostics_options.threshold,
+                max_findings=diagnostics_options.max_findings,
+                interval=diagnostics_options.interval,
+                logger=self.logger
+            )
+            self.query_stats.add_listener(self.diagnostics.observe)
         self.logger.info(
             f"Creating an instance of {str(self.__class__.__name__)}")
         self.logger.info("Initializing AWSMySQLLib")
 
+    def __enter__(self) -> 'AWSMySQLLib':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close_connection()
+
     @classmethod
-    def init_from_file(cls, file_name: str) -> Union[None, 'AWSMySQLLib']:
+    def init_from_file(cls, file_name: str, section: str = 'AWS_MYSQL_CONFIG') -> Union[None, 'AWSMySQLLib']:
         """
         Initialize an AWSMySQLLib instance from a configuration file.
 
         Args:
             file_name (str): The name of the configuration file.
+            section (str): The section of the file holding the connection settings.
 
         Returns:
             Union[None, 'AWSMySQLLib']: An instance of AWSMySQLLib if successful, None otherwise.
@@ -48,13 +225,23 @@ class AWSMySQLLib:
         config = configparser.ConfigParser()
         config.read(file_name)
         try:
-            details = config['AWS_MYSQL_CONFIG']
+            details = config[section]
             host = details['host']
             user = details['user']
             password = details['password']
             database = details['database']
             port = int(details['port'])
-            return cls(host, user, password, database, port)
+            return cls(
+                host, user, password, database, port,
+                pool_options=PoolOptions.from_config(details),
+                replica_options=ReplicaOptions.from_config(details),
+                cache_options=CacheOptions.from_config(details),
+                write_behind_options=WriteBehindOptions.from_config(details),
+                diagnostics_options=DiagnosticsOptions.from_config(details),
+                slow_query_threshold=details.getfloat('slow_query_threshold', fallback=1.0),
+                local_infile=details.getboolean('local_infile', fallback=False),
+                row_format=details.get('row_format', fallback='dict')
+            )
         except configparser.NoOptionError as err:
             cls.logger.exception("configparser.NoOptionError:")
             cls.logger.exception(err)
@@ -93,16 +280,8 @@ class AWSMySQLLib:
         self.logger.debug(
             f"Attempting to reach AWS RDS host: {rds_host}:{port}")
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                port=self.port
-            )
+            self._open_pool(None)
             self.logger.debug(f"Connected to AWS RDS host: {rds_host}:{port}")
-            version_info = self.connection.get_server_info()
-            self.logger.debug(
-                f"Connected to AWS MySQL RDS (version {version_info})")
             return True
         except Exception as e:
             self.logger.exception(
@@ -116,47 +295,634 @@ class AWSMySQLLib:
         Returns:
             bool: True if the connection is successful, False otherwise.
         """
-        rds_host = self.host
         database = self.database
-        port = self.port
         self.logger.debug(
             f"Attempting to reach database: {database}")
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                port=self.port
-            )
+            self._open_pool(database)
             self.logger.debug(f"Connected to the database: {database}")
-            version_info = self.connection.get_server_info()
-            self.logger.debug(
-                f"Connected to AWS MySQL RDS (version {version_info})")
             return True
         except Exception as e:
             self.logger.exception(f"Error connecting to the database: {e}")
             return False
 
-    def get_database_info(self) -> list:
+    @property
+    def connection(self) -> Optional[pymysql.connections.Connection]:
+        """
+        A connection to the database, kept for compatibility. Deprecated: use pool.connection().
+
+        Inside transaction() this is the transaction's connection. Otherwise it is one connection
+        outside the pool, opened on first use and shared by every caller until close_connection(),
+        so it does not hold a pool slot. Like the connection of earlier versions, it must not be
+        used by several threads at once.
+
+        Returns:
+            Optional[Connection]: The connection, or None if not connected.
+        """
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            return pinned
+        if self.pool is None:
+            return None
+        warnings.warn("AWSMySQLLib.connection is deprecated, use pool.connection() instead",
+                      DeprecationWarning, stacklevel=2)
+        with self._legacy_connection_lock:
+            if self._legacy_connection is None or not self._legacy_connection.open:
+                self._legacy_connection = self._create_connection(self._connected_database)
+            else:
+                self._select_database(self._legacy_connection)
+            return self._legacy_connection
+
+    def _create_connection(self, database: Optional[str], host: Optional[str] = None) -> pymysql.connections.Connection:
+        """
+        Open a new connection to the AWS RDS host for the pool.
+
+        Pooled connections run in autocommit mode so a connection handed back to the pool never
+        carries an open transaction or a stale read snapshot to the next borrower.
+
+        Args:
+            database (Optional[str]): The database to select, or None to connect to the host only.
+            host (Optional[str]): The endpoint to connect to, defaults to the writer host.
+
+        Returns:
+            Connection: The new connection.
+        """
+        return pymysql.connect(
+            host=host or self.host,
+            user=self.user,
+            password=self.password,
+            database=database,
+            port=self.port,
+            autocommit=True,
+            local_infile=self.local_infile,
+            connect_timeout=10 if host is None else _REPLICA_CONNECT_TIMEOUT
+        )
+
+    def _open_pool(self, database: Optional[str]) -> None:
+        """
+        Open the connection pool and its minimum number of connections, or switch an already
+        open pool to another database instead of reconnecting.
+
+        Args:
+            database (Optional[str]): The database pooled connections select, or None for the host only.
+        """
+        if self.pool is not None:
+            self._switch_database(database)
+            return
+        self._max_allowed_packet = None
+        self._upsert_alias = None
+        self._connected_database = database
+        pool = self._create_pool()
+        try:
+            pool.fill()
+            with pool.connection() as connection:
+                version_info = connection.get_server_info()
+        except Exception:
+            pool.close()
+            self._connected_database = None
+            raise
+        self.pool = pool
+        replica_options = self.replica_options
+        if replica_options.hosts:
+            self.replicas = ReplicaRouter(
+                list(replica_options.hosts),
+                lambda reader: self._create_pool(reader, min_size=0),
+                max_lag=replica_options.max_lag,
+                check_interval=replica_options.check_interval,
+                strategy=replica_options.strategy
+            )
+        write_behind_options = self.write_behind_options
+        if write_behind_options is not None:
+            self.write_buffer = WriteBehindBuffer(
+                self._write_behind_batch,
+                max_size=write_behind_options.max_size,
+                batch_size=write_behind_options.batch_size,
+                flush_interval=write_behind_options.interval,
+                on_error=write_behind_options.on_error,
+                logger=self.logger
+            )
+        self.invalidate_schema_cache()
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        self.logger.debug(
+            f"Connected to AWS MySQL RDS (version {version_info})")
+
+    def _switch_database(self, database: Optional[str]) -> None:
+        """
+        Make the open pool use another database.
+
+        Pooled connections switch with select_db when they are next checked out, so no new
+        connections are opened. MySQL cannot deselect a database, so switching to None keeps the
+        current database selected.
+
+        Args:
+            database (Optional[str]): The database to select, or None to keep the current one.
+        """
+        previous = self._connected_database
+        if database is None or database == previous:
+            return
+        # Queued records belong to the database they were written against.
+        if self.write_buffer is not None:
+            self.write_buffer.flush()
+        self._connected_database = database
+        try:
+            # Selects the database on the pinned connection too, and checks that it exists.
+            with self._borrow() as connection:
+                self._select_database(connection)
+        except Exception:
+            self._connected_database = previous
+            raise
+        self.invalidate_schema_cache()
+        self.logger.debug(f"Switched from database {previous} to {database}")
+
+    def _select_database(self, connection: pymysql.connections.Connection) -> None:
+        """
+        Select the current database on a connection being checked out, if it is not already selected.
+
+        Args:
+            connection (Connection): The connection.
+        """
+        database = self._connected_database
+        if database is None:
+            return
+        current = connection.db.decode(connection.encoding) if isinstance(connection.db, bytes) else connection.db
+        if current != database:
+            connection.select_db(database)
+            # pymysql reconnects to connection.db, so keep it in step with the selected database.
+            connection.db = database
+
+    def _create_pool(self, host: Optional[str] = None, min_size: Optional[int] = None) -> ConnectionPool:
+        """
+        Build a connection pool with this instance's pool settings.
+
+        New connections open the current database, and idle connections are switched to it when
+        they are checked out.
+
+        Args:
+            host (Optional[str]): The endpoint to connect to, defaults to the writer host.
+            min_size (Optional[int]): Overrides pool_min_size.
+
+        Returns:
+            ConnectionPool: The new, empty pool.
+        """
+        return ConnectionPool(
+            lambda: self._create_connection(self._connected_database, host),
+            min_size=self.pool_options.min_size if min_size is None else min_size,
+            max_size=self.pool_options.max_size,
+            timeout=self.pool_options.timeout,
+            max_idle=self.pool_options.max_idle,
+            max_lifetime=self.pool_options.max_lifetime,
+            ping_interval=self.pool_options.ping_interval,
+            on_checkout=self._select_database
+        )
+
+    @contextmanager
+    def _borrow(self, read_only: bool = False):
+        """
+        Borrow a connection for a single library call.
+
+        The connection pinned to the calling thread is used if there is one, which keeps reads
+        inside a transaction on the writer. Otherwise reads go to a healthy read replica when
+        replicas are configured, and everything else to a connection from the writer pool. A
+        replica that cannot be reached is taken out of rotation; a replica whose pool is busy
+        only sends this read to the writer.
+
+        Args:
+            read_only (bool): Whether the call only reads and may run on a replica.
+
+        Yields:
+            Connection: The connection to run the call on.
+        """
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            try:
+                yield pinned
+            except Exception:
+                self._fail_transaction()
+                raise
+            return
+        if self.pool is None:
+            raise pymysql.err.InterfaceError("Not connected to AWS RDS host")
+        replica_pool = self.replicas.choose() if read_only and self.replicas is not None else None
+        if replica_pool is not None:
+            try:
+                connection = replica_pool.acquire(_REPLICA_CHECKOUT_TIMEOUT)
+            except (pymysql.err.OperationalError, pymysql.err.InterfaceError, OSError) as e:
+                # The replica could not be reached; a busy or closed pool is not a failure.
+                self.replicas.mark_down(replica_pool, e)
+            except (PoolTimeoutError, PoolClosedError) as e:
+                self.logger.debug(f"Reading from the writer, read replica unavailable: {e}")
+            else:
+                with replica_pool.checked_out(connection):
+                    yield connection
+                return
+        with self.pool.connection() as connection:
+            yield connection
+
+    def replica_status(self) -> List[Dict[str, Union[str, bool, float, None]]]:
+        """
+        Report the last known health and replication lag of each read replica.
+
+        Returns:
+            List[Dict[str, Union[str, bool, float, None]]]: The host, health and lag in seconds of
+                each replica, empty if no replicas are configured.
+        """
+        return self.replicas.status() if self.replicas is not None else []
+
+    def _execute(self, cursor: pymysql.cursors.Cursor, query: str, params: Union[Sequence[Any], Dict[str, Any], None] = None,
+                 table: Optional[str] = None) -> int:
+        """
+        Execute a statement, reconnecting and retrying once if the server connection was lost.
+
+        The retry only happens outside a transaction, and only for statements that cannot have
+        run twice: reads, or any statement that could not be sent to the server.
+
+        Args:
+            cursor (Cursor): The cursor to execute the statement on.
+            query (str): The statement, with %s placeholders if params are given.
+            params (Union[Sequence[Any], Dict[str, Any], None]): The values for the placeholders.
+            table (Optional[str]): The table the statement targets, used to group statistics.
+
+        Returns:
+            int: The number of rows returned or affected, as reported by the driver.
+        """
+        try:
+            return self._timed_execute(cursor, query, params, table)
+        except pymysql.err.OperationalError as e:
+            if not self._can_retry(cursor.connection, query, e):
+                raise
+            self.logger.warning(
+                f"Lost the connection to the server ({e}), reconnecting and retrying once.")
+            cursor.connection.connect()
+            return self._timed_execute(cursor, query, params, table)
+
+    def _can_retry(self, connection: pymysql.connections.Connection, query: str,
+                   error: pymysql.err.OperationalError) -> bool:
+        """
+        Check whether a statement that failed with a lost connection can safely be run again.
+        """
+        code = error.args[0] if error.args else None
+        if code not in (CR.CR_SERVER_GONE_ERROR, CR.CR_SERVER_LOST):
+            return False
+        if self._in_transaction() or getattr(connection, 'server_status', 0) & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            return False
+        # A connection lost while the statement ran may have lost it after it took effect.
+        kind = statement_kind(query)
+        return code == CR.CR_SERVER_GONE_ERROR or kind in ('SELECT', 'SHOW')
+
+    def _timed_execute(self, cursor: pymysql.cursors.Cursor, query: str,
+                       params: Union[Sequence[Any], Dict[str, Any], None], table: Optional[str]) -> int:
+        """
+        Execute a statement and record its latency, rows and size in query_stats.
+
+        Args:
+            cursor (Cursor): The cursor to execute the statement on.
+            query (str): The statement, with %s placeholders if params are given.
+            params (Union[Sequence[Any], Dict[str, Any], None]): The values for the placeholders.
+            table (Optional[str]): The table the statement targets, used to group statistics.
+
+        Returns:
+            int: The number of rows returned or affected, as reported by the driver.
+        """
+        try:
+            # Unbuffered cursors do not know the row count until the result has been read.
+            with self.query_stats.timed(cursor, query, table, isinstance(cursor, pymysql.cursors.SSCursor)):
+                return cursor.execute(query, params)
+        finally:
+            if self.result_cache is not None and table and statement_kind(query) in _WRITE_KINDS:
+                self._invalidate_results(table)
+
+    def _invalidate_results(self, table: str) -> None:
+        """
+        Drop the cached results of a table after a write to it.
+
+        Inside transaction() or a call's own transaction the table is invalidated again when the
+        transaction ends, since other threads may cache the previously committed rows until then.
+
+        Args:
+            table (str): The table that was written to.
+        """
+        table = self._cache_table(table)
+        self.result_cache.invalidate_table(table)
+        written = getattr(self._local, 'written', None)
+        if written is not None:
+            written.add(table)
+
+    def _cache_table(self, table: str) -> str:
+        """
+        Name a table the way the result cache tracks it, so `example`.`t`, example.t and t are one table.
+
+        Args:
+            table (str): The table name, optionally quoted and qualified with its database.
+
+        Returns:
+            str: 'database.table' without quotes, using the current database for unqualified names.
+        """
+        database, _, name = table.replace('`', '').rpartition('.')
+        return f"{database.strip() or self._connected_database or ''}.{name.strip()}"
+
+    def _invalidate_all_results(self) -> None:
+        """
+        Drop every cached result after a write to tables that are not known.
+
+        Inside transaction() the whole cache is cleared again when the transaction ends.
+        """
+        self.result_cache.clear()
+        written = getattr(self._local, 'written', None)
+        if written is not None:
+            # None stands for every table.
+            written.add(None)
+
+    def result_cache_stats(self) -> Dict[str, int]:
+        """
+        Report the hit, miss and eviction counters and the size of the result cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses, evictions, entries and approximate bytes, empty if
+                the result cache is disabled.
+        """
+        return self.result_cache.stats() if self.result_cache is not None else {}
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Summarize the statements executed by this instance.
+
+        Returns:
+            Dict[str, Dict]: 'total' with the count, errors, rows, statement bytes and
+                p50/p95/p99/max latencies in seconds over all statements, and 'statements' with
+                the same summary per "KIND table" key.
+        """
+        return self.query_stats.snapshot()
+
+    def add_query_listener(self, callback: Callable[[QueryEvent], None]) -> None:
+        """
+        Call a function with a QueryEvent for every statement this instance executes.
+
+        Args:
+            callback (Callable[[QueryEvent], None]): The function to call, e.g. a metrics exporter.
+        """
+        self.query_stats.add_listener(callback)
+
+    def diagnostic_findings(self) -> List[Dict[str, Any]]:
+        """
+        Get the expensive plan steps found for slow statements in diagnostics mode.
+
+        Returns:
+            List[Dict[str, Any]]: The most recent findings, oldest first. Each holds the
+                statement, its latency and table, the parsed EXPLAIN plan, and 'issues': a list of
+                full scans, full index scans, missing indexes, filesorts and temporary tables.
+        """
+        if self.diagnostics is None:
+            return []
+        return self.diagnostics.findings()
+
+    def _explain(self, statement: str, host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the plan of a statement with EXPLAIN FORMAT=JSON, for the diagnostics thread.
+
+        The EXPLAIN runs on its own connection from the pool of the server that ran the statement,
+        since a read replica can have other indexes, statistics or data than the writer. It is not
+        recorded in query_stats, so it is never explained itself, and gives up quickly when the
+        pool is busy.
+
+        Args:
+            statement (str): The statement, with parameters substituted.
+            host (Optional[str]): The server that ran the statement, defaults to the writer host.
+
+        Returns:
+            Dict[str, Any]: The parsed plan.
+        """
+        pool = self.pool
+        if pool is None:
+            raise pymysql.err.InterfaceError("Not connected to AWS RDS host")
+        if host is not None and host != self.host and self.replicas is not None:
+            pool = next((replica.pool for replica in self.replicas.replicas if replica.host == host), pool)
+        with pool.connection(timeout=1.0) as connection, connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN FORMAT=JSON {statement}")
+            return json.loads(cursor.fetchone()[0])
+
+    def _in_transaction(self) -> bool:
+        """
+        Check whether the calling thread is inside transaction().
+        """
+        return bool(getattr(self._local, 'failed', None))
+
+    def _fail_transaction(self) -> None:
+        """
+        Record a failed library call, so the calling thread's transaction() rolls back.
+
+        Called by methods that report errors through their return value, including errors
+        raised before any statement ran, such as invalid arguments.
+        """
+        failed = getattr(self._local, 'failed', None)
+        if failed:
+            failed[-1] = True
+
+    def _commit(self, connection: pymysql.connections.Connection) -> None:
+        """
+        Commit a write made by a single library call.
+
+        Inside transaction() the commit is deferred to the end of the transaction. Outside it the
+        server has already committed an autocommit connection's statement, so only connections
+        with autocommit switched off are sent a COMMIT.
+
+        Args:
+            connection (Connection): The connection the write was made on.
+        """
+        if not self._in_transaction() and not connection.get_autocommit():
+            connection.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group the library calls made by the calling thread into one transaction.
+
+        All calls inside the with-block run on one connection and their individual commits are
+        replaced by a single COMMIT at the end, or a ROLLBACK if the block raises or any library
+        call inside it failed. Nested transaction() blocks use savepoints, so a failure inside a
+        nested block only undoes that block. Note that DDL statements such as create_table()
+        commit implicitly on MySQL.
+
+        Yields:
+            AWSMySQLLib: This instance.
+
+        Raises:
+            TransactionRollbackError: If a library call failed inside the block and its work was
+                rolled back.
+        """
+        failed = getattr(self._local, 'failed', None)
+        if failed:
+            yield from self._savepoint(failed)
+            return
+        # Bound locally, so the connection goes back to the pool it came from even if the
+        # instance reconnects or closes meanwhile.
+        pool = self.pool
+        if pool is None:
+            raise pymysql.err.InterfaceError("Not connected to AWS RDS host")
+        connection = pool.acquire()
+        self._local.connection = connection
+        self._local.failed = [False]
+        self._local.written = set()
+        healthy = True
+        try:
+            connection.begin()
+            yield self
+        except BaseException:
+            try:
+                connection.rollback()
+            except Exception as e:
+                healthy = False
+                self.logger.exception(f"Error rolling back transaction: {e}")
+            raise
+        else:
+            rolled_back = self._local.failed[0]
+            try:
+                if rolled_back:
+                    connection.rollback()
+                else:
+                    connection.commit()
+            except BaseException:
+                # The session and transaction state are unknown, so the connection is not reused.
+                healthy = False
+                raise
+        finally:
+            self._local.failed = None
+            written, self._local.written = self._local.written, None
+            if self.result_cache is not None:
+                if None in written:
+                    self.result_cache.clear()
+                else:
+                    for table in written:
+                        self.result_cache.invalidate_table(table)
+            self._local.connection = None
+            pool.release(connection, discard=not healthy)
+        if rolled_back:
+            raise TransactionRollbackError(
+                "A call inside the transaction failed, the transaction was rolled back")
+
+    def _savepoint(self, failed: List[bool]):
+        """
+        Run a nested transaction() block inside a savepoint of the enclosing transaction.
+
+        Args:
+            failed (List[bool]): The failure flags of the enclosing transaction levels.
+
+        Yields:
+            AWSMySQLLib: This instance.
+        """
+        connection = self._local.connection
+        name = f"sp_{len(failed)}"
+        with connection.cursor() as cursor:
+            self._execute(cursor, f"SAVEPOINT {name}")
+        failed.append(False)
+        try:
+            yield self
+        except BaseException:
+            with connection.cursor() as cursor:
+                self._execute(cursor, f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        else:
+            rolled_back = failed[-1]
+            with connection.cursor() as cursor:
+                if rolled_back:
+                    self._execute(cursor, f"ROLLBACK TO SAVEPOINT {name}")
+                else:
+                    self._execute(cursor, f"RELEASE SAVEPOINT {name}")
+        finally:
+            failed.pop()
+        if rolled_back:
+            raise TransactionRollbackError(
+                f"A call inside savepoint {name} failed, the savepoint was rolled back")
+
+    def batch(self):
+        """
+        Group the library calls made by the calling thread into one commit.
+
+        An alias of transaction() for write batches.
+
+        Returns:
+            ContextManager[AWSMySQLLib]: The transaction context.
+        """
+        return self.transaction()
+
+    def execute_query(self, query: str, params: Union[Sequence[Any], Dict[str, Any], None] = None,
+                      row_format: Optional[str] = None) -> Union[List[Union[Dict[str, Any], Tuple]], int, None]:
+        """
+        Execute an arbitrary statement.
+
+        Reads (SELECT, SHOW, DESCRIBE, EXPLAIN) may run on a read replica and return their rows.
+        Other statements run on the writer, are committed unless inside transaction(), and clear
+        the result cache, since the tables they change are not known. Schema changes also clear
+        the schema cache.
+
+        Args:
+            query (str): The statement, with %s placeholders if params are given.
+            params (Union[Sequence[Any], Dict[str, Any], None]): The values for the placeholders.
+            row_format (Optional[str]): 'dict' or 'tuple', defaults to the instance's row_format.
+
+        Returns:
+            Union[List[Union[Dict[str, Any], Tuple]], int, None]: The rows of a statement that
+                returns a result set, the number of affected rows otherwise, or None on error.
+        """
+        row_format = self._resolve_row_format(row_format)
+        kind = statement_kind(query)
+        try:
+            with self._borrow(read_only=kind in _READ_KINDS) as connection, connection.cursor() as cursor:
+                affected = self._execute(cursor, query, params)
+                if cursor.description is None:
+                    self._commit(connection)
+                    if self.result_cache is not None and kind in _WRITE_KINDS:
+                        self._invalidate_all_results()
+                    if kind in _DDL_KINDS:
+                        self.invalidate_schema_cache()
+                    self.logger.info(f"Statement affected {affected} rows.")
+                    return affected
+                columns = tuple(desc[0] for desc in cursor.description)
+                if row_format == 'tuple':
+                    return list(map(_row_class(columns)._make, cursor.fetchall()))
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(f"Error executing query: {e}")
+            return None
+
+    def get_database_info(self, include_sizes: bool = False) -> list:
         """
         Retrieve detailed information about databases.
 
+        The character set and collation of every database are read with a single
+        information_schema query.
+
+        Args:
+            include_sizes (bool): Also report the number of tables and the data and index sizes
+                in bytes of each database, summed from information_schema.TABLES.
+
         Returns:
             list: A list of dictionaries containing database information.
         """
-        databases_info = []
+        if include_sizes:
+            query = (
+                "SELECT s.SCHEMA_NAME, s.DEFAULT_CHARACTER_SET_NAME, s.DEFAULT_COLLATION_NAME, "
+                "COUNT(t.TABLE_NAME), COALESCE(SUM(t.DATA_LENGTH), 0), "
+                "COALESCE(SUM(t.INDEX_LENGTH), 0) "
+                "FROM information_schema.SCHEMATA s "
+                "LEFT JOIN information_schema.TABLES t ON t.TABLE_SCHEMA = s.SCHEMA_NAME "
+                "GROUP BY s.SCHEMA_NAME, s.DEFAULT_CHARACTER_SET_NAME, s.DEFAULT_COLLATION_NAME "
+                "ORDER BY s.SCHEMA_NAME")
+        else:
+            query = (
+                "SELECT SCHEMA_NAME, DEFAULT_CHARACTER_SET_NAME, DEFAULT_COLLATION_NAME "
+                "FROM information_schema.SCHEMATA ORDER BY SCHEMA_NAME")
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SHOW DATABASES")
-                result = cursor.fetchall()
-                self.logger.debug("List of databases:")
-                for db_name in [item[0] for item in result]:
-                    self.logger.debug(f"Name: {db_name}")
-                    db_info = self.get_database_properties(db_name)
-                    databases_info.append(db_info)
-                return databases_info
+            with self._borrow(read_only=True) as connection, connection.cursor() as cursor:
+                self._execute(cursor, query)
+                databases_info = [self._schema_row_to_info(row) for row in cursor.fetchall()]
+            self.logger.debug("List of databases:")
+            for db_info in databases_info:
+                self.logger.debug(f"Name: {db_info['Name']}")
+            return databases_info
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(f"Error fetching database information: {e}")
             return None
 
@@ -172,30 +938,46 @@ class AWSMySQLLib:
         """
         db_info = {}
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(f"SHOW CREATE DATABASE `{database_name}`")
+            with self._borrow(read_only=True) as connection, connection.cursor() as cursor:
+                self._execute(
+                    cursor,
+                    "SELECT SCHEMA_NAME, DEFAULT_CHARACTER_SET_NAME, DEFAULT_COLLATION_NAME "
+                    "FROM information_schema.SCHEMATA WHERE SCHEMA_NAME = %s", (database_name,))
                 result = cursor.fetchone()
                 if result:
-                    # Updated line for debugging
                     self.logger.debug("Result: %s", result)
-                    # Parse the result to extract database properties
-                    create_statement = result[1]
-                    owner_start = create_statement.find(
-                        "CREATE DATABASE") + len("CREATE DATABASE")
-                    owner_end = create_statement.find("CHARACTER SET") if create_statement.find(
-                        "CHARACTER SET") != -1 else len(create_statement)
-                    owner = create_statement[owner_start:owner_end].strip()
-                    collation_start = create_statement.find("COLLATE") + len(
-                        "COLLATE") if create_statement.find("COLLATE") != -1 else len(create_statement)
-                    collation_end = len(create_statement)
-                    collation = create_statement[collation_start:collation_end].strip(
-                    )
-                    db_info['Owner'] = owner
-                    db_info['Collation'] = collation
+                    db_info = self._schema_row_to_info(result)
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception("Error fetching database properties: %s", e)
         return db_info
 
+    @staticmethod
+    def _schema_row_to_info(row: tuple) -> Dict[str, Union[str, int]]:
+        """
+        Convert an information_schema.SCHEMATA row into a database information dictionary.
+
+        'Owner' holds the database name, as it did when it was parsed from SHOW CREATE DATABASE.
+
+        Args:
+            row (tuple): The schema name, character set and collation, optionally followed by
+                the table count, data size and index size.
+
+        Returns:
+            Dict[str, Union[str, int]]: The database information.
+        """
+        db_info = {
+            'Name': row[0],
+            'Owner': row[0],
+            'CharacterSet': row[1],
+            'Collation': row[2]
+        }
+        if len(row) > 3:
+            db_info['Tables'] = int(row[3])
+            db_info['DataSize'] = int(row[4])
+            db_info['IndexSize'] = int(row[5])
+        return db_info
+
     def check_database_exists(self, database_name: str) -> bool:
         """
         Check if a database exists.
@@ -207,15 +989,16 @@ class AWSMySQLLib:
             bool: True if the database exists, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(f"SHOW DATABASES LIKE '{database_name}'")
+            with self._borrow(read_only=True) as connection, connection.cursor() as cursor:
+                self._execute(cursor, f"SHOW DATABASES LIKE '{database_name}'")
                 result = cursor.fetchone()
                 return result is not None
-        except AttributeError as e:
+        except pymysql.err.InterfaceError as e:
             self.logger.exception(
                 "No Connection in checking if database exists: %s", e)
             return False
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception("Error checking if database exists: %s", e)
             return False
 
@@ -230,12 +1013,13 @@ class AWSMySQLLib:
             bool: True if the database creation is successful, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(f"CREATE DATABASE `{database_name}`")
+            with self._borrow() as connection, connection.cursor() as cursor:
+                self._execute(cursor, f"CREATE DATABASE `{database_name}`")
             self.logger.info(
                 f"Database '{database_name}' created successfully.")
             return True
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(
                 f"Error creating database '{database_name}': {e}")
             return False
@@ -244,6 +1028,9 @@ class AWSMySQLLib:
         """
         Remove a database.
 
+        The result and schema caches are cleared, since their entries may belong to the
+        removed database.
+
         Args:
             database_name (str): The name of the database to remove.
 
@@ -251,88 +1038,310 @@ class AWSMySQLLib:
             bool: True if the database removal is successful, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(f"DROP DATABASE `{database_name}`")
+            with self._borrow() as connection, connection.cursor() as cursor:
+                self._execute(cursor, f"DROP DATABASE `{database_name}`")
+            if self.result_cache is not None:
+                self._invalidate_all_results()
+            self.invalidate_schema_cache()
             self.logger.info(
                 f"Database '{database_name}' removed successfully.")
             return True
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(
                 f"Error removing database '{database_name}': {e}")
             return False
 
-    def create_table(self, table_name: str, columns: Dict[str, str]) -> bool:
+    def create_table(self, table_name: str, columns: Dict[str, str],
+                     primary_key: Union[str, Sequence[str], None] = None,
+                     indexes: Optional[Sequence[Dict[str, Any]]] = None, engine: Optional[str] = None,
+                     table_row_format: Optional[str] = None, key_block_size: Optional[int] = None,
+                     compression: Optional[str] = None,
+                     partition_by: Optional[Dict[str, Any]] = None) -> bool:
         """
         Create a table with the specified name and columns.
 
+        Without a primary key, lookups by ID such as update_record() and delete_record() scan the
+        whole table, so tables with an id column should pass primary_key='id'.
+
         Args:
             table_name (str): The name of the table.
             columns (Dict[str, str]): A dictionary specifying column names and their data types.
+            primary_key (Union[str, Sequence[str], None]): The primary key column or columns.
+            indexes (Optional[Sequence[dict]]): Secondary indexes, each a dictionary with
+                'columns' (a column or list of columns, optionally with a prefix length or
+                DESC), and optionally 'name' and 'unique'.
+            engine (Optional[str]): The storage engine, such as 'InnoDB'.
+            table_row_format (Optional[str]): The InnoDB row format, such as 'DYNAMIC' or
+                'COMPRESSED'.
+            key_block_size (Optional[int]): The page size in KB of a COMPRESSED table.
+            compression (Optional[str]): Transparent page compression, 'zlib', 'lz4' or 'none'.
+                Requires a file system with hole punching support.
+            partition_by (Optional[dict]): Partitioning, as {'type': 'HASH' or 'KEY',
+                'expression': ..., 'partitions': n} or {'type': 'RANGE' or 'RANGE COLUMNS',
+                'expression': ..., 'ranges': {partition: upper bound or 'MAXVALUE'}}. The
+                partitioning columns must be part of every unique key.
 
         Returns:
             bool: True if the table creation is successful, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
-                column_definitions = ', '.join(
-                    f"{name} {data_type}" for name, data_type in columns.items())
-                query = f"CREATE TABLE {table_name} ({column_definitions})"
-                cursor.execute(query)
-            self.connection.commit()
+            definitions = [f"{name} {data_type}" for name, data_type in columns.items()]
+            if primary_key is not None:
+                definitions.append(f"PRIMARY KEY ({self._index_columns(primary_key)})")
+            for index in indexes or ():
+                definitions.append(self._index_definition(table_name, index))
+            query = f"CREATE TABLE {table_name} ({', '.join(definitions)})"
+            options = []
+            if engine is not None:
+                options.append(f"ENGINE={engine}")
+            if table_row_format is not None:
+                options.append(f"ROW_FORMAT={table_row_format.upper()}")
+            if key_block_size is not None:
+                options.append(f"KEY_BLOCK_SIZE={int(key_block_size)}")
+            if compression is not None:
+                if compression.lower() not in ('zlib', 'lz4', 'none'):
+                    raise ValueError(f"Unknown page compression: {compression}")
+                options.append(f"COMPRESSION='{compression.lower()}'")
+            if options:
+                query += ' ' + ' '.join(options)
+            if partition_by is not None:
+                query += ' ' + self._partition_clause(partition_by)
+            with self._borrow() as connection, connection.cursor() as cursor:
+                self._execute(cursor, query, table=table_name)
+                self._commit(connection)
+            self.invalidate_schema_cache()
             self.logger.info(f"Table '{table_name}' created successfully.")
             return True
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(f"Error creating table '{table_name}': {e}")
             return False
 
-    def list_tables_with_columns(self) -> List[Dict[str, Union[str, List[Dict[str, str]]]]]:
+    def create_index(self, table_name: str, columns: Union[str, Sequence[str]], name: Optional[str] = None,
+                     unique: bool = False, online: bool = True) -> bool:
         """
-        List all tables within the database with details about their columns.
+        Add a secondary index to a table.
+
+        By default the index is built online with ALTER TABLE ... ALGORITHM=INPLACE, LOCK=NONE,
+        so reads and writes to the table continue while it is built. If the server cannot build
+        the index that way, the statement fails instead of locking the table.
+
+        Args:
+            table_name (str): The name of the table.
+            columns (Union[str, Sequence[str]]): The indexed column or columns, optionally with a
+                prefix length or DESC.
+            name (Optional[str]): The index name, derived from the table and columns if omitted.
+            unique (bool): Whether the index enforces unique values.
+            online (bool): Build the index without blocking writes, or with CREATE INDEX and the
+                server's default algorithm and locking if False.
 
         Returns:
-            List[Dict[str, Union[str, List[Dict[str, str]]]]]: A list of dictionaries containing table information.
+            bool: True if the index was created, False otherwise.
         """
-        table_info_list = []
+        name = name or self._index_name(table_name, columns)
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        try:
+            if online:
+                query = (f"ALTER TABLE {table_name} ADD {kind} {name} ({self._index_columns(columns)}), "
+                         f"ALGORITHM=INPLACE, LOCK=NONE")
+            else:
+                query = f"CREATE {kind} {name} ON {table_name} ({self._index_columns(columns)})"
+            with self._borrow() as connection, connection.cursor() as cursor:
+                self._execute(cursor, query, table=table_name)
+                self._commit(connection)
+            self.invalidate_schema_cache()
+            self.logger.info(f"Index '{name}' created on table '{table_name}'.")
+            return True
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(f"Error creating index '{name}' on table '{table_name}': {e}")
+            return False
+
+    def drop_index(self, table_name: str, name: str, online: bool = True) -> bool:
+        """
+        Drop a secondary index from a table.
 
+        Args:
+            table_name (str): The name of the table.
+            name (str): The name of the index.
+            online (bool): Drop the index with ALGORITHM=INPLACE, LOCK=NONE so writes continue.
+
+        Returns:
+            bool: True if the index was dropped, False otherwise.
+        """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SHOW TABLES")
-                tables = [table[0] for table in cursor.fetchall()]
+            query = f"ALTER TABLE {table_name} DROP INDEX {name}"
+            if online:
+                query += ", ALGORITHM=INPLACE, LOCK=NONE"
+            with self._borrow() as connection, connection.cursor() as cursor:
+                self._execute(cursor, query, table=table_name)
+                self._commit(connection)
+            self.invalidate_schema_cache()
+            self.logger.info(f"Index '{name}' dropped from table '{table_name}'.")
+            return True
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(f"Error dropping index '{name}' from table '{table_name}': {e}")
+            return False
 
-                for table_name in tables:
-                    table_info = {'table_name': table_name, 'columns': []}
+    @staticmethod
+    def _index_columns(columns: Union[str, Sequence[str]]) -> str:
+        """
+        Join index columns into the column list of a key definition.
+        """
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        if not columns:
+            raise ValueError("An index needs at least one column")
+        return ', '.join(columns)
 
-                    # Retrieve column information for the current table
-                    cursor.execute(f"DESCRIBE {table_name}")
-                    columns_info = cursor.fetchall()
+    @staticmethod
+    def _index_name(table_name: str, columns: Union[str, Sequence[str]]) -> str:
+        """
+        Derive an index name from its table and column names, within MySQL's 64 character limit.
+        """
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        # Keep only the column name from entries such as 'name(10)' or 'created DESC'.
+        names = [column.split('(')[0].split()[0] for column in columns]
+        return f"idx_{table_name}_{'_'.join(names)}"[:64]
 
-                    for column_info in columns_info:
-                        column_details = {
-                            'column_name': column_info[0],
-                            'data_type': column_info[1],
-                            'nullable': 'YES' if column_info[2] == 'YES' else 'NO',
-                            'key': column_info[3],
-                            'default': column_info[4],
-                            'extra': column_info[5]
-                        }
+    @classmethod
+    def _index_definition(cls, table_name: str, index: Dict[str, Any]) -> str:
+        """
+        Build the key definition of an index spec passed to create_table().
+        """
+        if 'columns' not in index:
+            raise ValueError(f"Index spec without columns: {index}")
+        name = index.get('name') or cls._index_name(table_name, index['columns'])
+        kind = 'UNIQUE KEY' if index.get('unique') else 'KEY'
+        return f"{kind} {name} ({cls._index_columns(index['columns'])})"
+
+    @staticmethod
+    def _partition_clause(partition_by: Dict[str, Any]) -> str:
+        """
+        Build the PARTITION BY clause of a partitioning spec passed to create_table().
+        """
+        kind = partition_by.get('type', '').upper()
+        expression = partition_by.get('expression')
+        if not expression:
+            raise ValueError(f"Partitioning spec without expression: {partition_by}")
+        if kind in ('HASH', 'KEY', 'LINEAR HASH', 'LINEAR KEY'):
+            partitions = int(partition_by.get('partitions', 0))
+            if partitions < 1:
+                raise ValueError(f"{kind} partitioning needs a partitions count: {partition_by}")
+            return f"PARTITION BY {kind} ({expression}) PARTITIONS {partitions}"
+        if kind in ('RANGE', 'RANGE COLUMNS'):
+            ranges = partition_by.get('ranges')
+            if not ranges:
+                raise ValueError(f"{kind} partitioning needs ranges: {partition_by}")
+            bounds = ', '.join(
+                f"PARTITION {name} VALUES LESS THAN "
+                f"{'MAXVALUE' if str(bound).upper() == 'MAXVALUE' else f'({bound})'}"
+                for name, bound in ranges.items())
+            return f"PARTITION BY {kind} ({expression}) ({bounds})"
+        raise ValueError(f"Unknown partitioning type: {partition_by.get('type')}")
+
+    def list_tables_with_columns(self, row_format: Optional[str] = None) -> List[Dict[str, Union[str, List[Dict[str, str]]]]]:
+        """
+        List all tables within the database with details about their columns.
+
+        All tables are read with a single information_schema query and the result is cached for
+        schema_cache_ttl seconds. create_table() and delete_table() invalidate the cache, so
+        tables changed through this instance are seen immediately. Every call returns its own
+        copy, so callers may modify it without affecting the cache.
 
-                        table_info['columns'].append(column_details)
+        Args:
+            row_format (Optional[str]): 'dict' or 'tuple' for the column details, defaults to
+                the instance's row_format. Tuples are ColumnInfo namedtuples with the same fields.
+
+        Returns:
+            List[Dict[str, Union[str, List[Dict[str, str]]]]]: A list of dictionaries containing table information.
+        """
+        row_format = self._resolve_row_format(row_format)
+        database = self._connected_database
+        with self._schema_cache_lock:
+            cached = self._schema_cache.get((database, row_format))
+            generation = self._schema_cache_generation
+        if cached is not None and cached[0] > time.monotonic():
+            self.logger.debug("List of tables with column details served from cache.")
+            return self._copy_table_info(cached[1])
 
-                    table_info_list.append(table_info)
+        table_info_list = []
 
-            self.logger.info("List of tables with column details:")
-            for table_info in table_info_list:
-                self.logger.info(f"Table: {table_info['table_name']}")
-                for column_info in table_info['columns']:
-                    self.logger.info(f"  Column: {column_info}")
+        try:
+            with self._borrow(read_only=True) as connection, connection.cursor() as cursor:
+                self._execute(
+                    cursor,
+                    "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, "
+                    "COLUMN_DEFAULT, EXTRA FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION")
+                table_info = None
+                for column_info in cursor.fetchall():
+                    if table_info is None or table_info['table_name'] != column_info[0]:
+                        table_info = {'table_name': column_info[0], 'columns': []}
+                        table_info_list.append(table_info)
+                    column_details = _ColumnInfo(
+                        column_info[1],
+                        column_info[2],
+                        'YES' if column_info[3] == 'YES' else 'NO',
+                        column_info[4],
+                        column_info[5],
+                        column_info[6]
+                    )
+                    table_info['columns'].append(
+                        column_details._asdict() if row_format == 'dict' else column_details)
 
+            self.logger.info(
+                f"Listed {len(table_info_list)} tables with column details.")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                for table_info in table_info_list:
+                    self.logger.debug(f"Table: {table_info['table_name']}")
+                    for column_info in table_info['columns']:
+                        self.logger.debug(f"  Column: {column_info}")
+
+            if self.cache_options.schema_ttl > 0:
+                with self._schema_cache_lock:
+                    # Skip storing if the schema was changed while the query was running.
+                    if generation == self._schema_cache_generation:
+                        self._schema_cache[(database, row_format)] = (
+                            time.monotonic() + self.cache_options.schema_ttl, self._copy_table_info(table_info_list))
             return table_info_list
 
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(
                 f"Error listing tables with column details: {e}")
             return []
 
+    @staticmethod
+    def _copy_table_info(tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Copy a list of tables with column details, so callers cannot change the cached list.
+        """
+        return [{'table_name': table['table_name'],
+                 'columns': [dict(column) if isinstance(column, dict) else column for column in table['columns']]}
+                for table in tables]
+
+    def _resolve_row_format(self, row_format: Optional[str]) -> str:
+        """
+        Check a row_format argument, falling back to the instance's row_format.
+
+        Raises:
+            ValueError: If the row format is unknown.
+        """
+        row_format = row_format or self.row_format
+        if row_format not in ('dict', 'tuple'):
+            raise ValueError(f"Unknown row format: {row_format}")
+        return row_format
+
+    def invalidate_schema_cache(self) -> None:
+        """
+        Discard cached list_tables_with_columns results, e.g. after a schema change made elsewhere.
+        """
+        with self._schema_cache_lock:
+            self._schema_cache.clear()
+            self._schema_cache_generation += 1
+
     def delete_table(self, table_name: str) -> bool:
         """
         Delete a table with the specified name.
@@ -344,74 +1353,1055 @@ class AWSMySQLLib:
             bool: True if the table deletion is successful, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
+            with self._borrow() as connection, connection.cursor() as cursor:
                 query = f"DROP TABLE IF EXISTS {table_name}"
-                cursor.execute(query)
-            self.connection.commit()
+                self._execute(cursor, query, table=table_name)
+                self._commit(connection)
+            self.invalidate_schema_cache()
             self.logger.info(f"Table '{table_name}' deleted successfully.")
             return True
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(f"Error deleting table '{table_name}': {e}")
             return False
 
-    def list_entries_in_table(self, table: str) -> Union[List[Dict[str, Union[str, int, float]]], None]:
+    def list_entries_in_table(self, table: str, row_format: Optional[str] = None
+                              ) -> Union[List[Union[Dict[str, Union[str, int, float]], Tuple]], None]:
         """
         List all entries within a specified table.
 
+        When the result cache is enabled, repeated calls are answered from the cache until the
+        table is written to through this instance or the cached result expires. Writes made by
+        other clients are only picked up after result_cache_ttl.
+
         Args:
             table (str): The name of the table.
+            row_format (Optional[str]): 'dict' or 'tuple', defaults to the instance's row_format.
+                Tuples are namedtuples of one class shared by all rows of the result.
 
         Returns:
-            Union[List[Dict[str, Union[str, int, float]]], None]: A list of entries if successful, None otherwise.
+            Union[List[Union[Dict[str, Union[str, int, float]], Tuple]], None]: A list of entries if successful, None otherwise.
         """
+        row_format = self._resolve_row_format(row_format)
+        # Reads inside a transaction see its uncommitted writes, so they bypass the cache.
+        cache = self.result_cache if not self._in_transaction() else None
+        if cache is not None:
+            cached_table = self._cache_table(table)
+            key = ('entries', cached_table, row_format)
+            hit, entries = cache.get(key)
+            if hit:
+                self.logger.debug(f"Listed {len(entries)} cached entries in table '{table}'.")
+                return [dict(entry) for entry in entries] if row_format == 'dict' else list(entries)
+            generation = cache.generation(cached_table)
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(f"SELECT * FROM {table}")
+            with self._borrow(read_only=True) as connection, connection.cursor() as cursor:
+                self._execute(cursor, f"SELECT * FROM {table}", table=table)
                 result = cursor.fetchall()
                 columns = [desc[0] for desc in cursor.description]
 
-                entries = []
-                for row in result:
-                    entry = dict(zip(columns, row))
-                    entries.append(entry)
-
-                self.logger.info(f"Entries in table '{table}':")
-                for entry in entries:
-                    self.logger.info(entry)
-
+                if row_format == 'tuple':
+                    entries = list(map(_row_class(tuple(columns))._make, result))
+                else:
+                    entries = []
+                    for row in result:
+                        entry = dict(zip(columns, row))
+                        entries.append(entry)
+
+                self.logger.info(f"Listed {len(entries)} entries in table '{table}'.")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    for entry in entries:
+                        self.logger.debug(entry)
+
+                if cache is not None and cache.put(key, cached_table, entries, generation):
+                    # Hand out copies so callers cannot modify the cached rows.
+                    return [dict(entry) for entry in entries] if row_format == 'dict' else list(entries)
                 return entries
 
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(
                 f"Error listing entries in table '{table}': {e}")
             return None
 
+    def iter_entries(self, table: str, columns: Optional[Sequence[str]] = None,
+                     where: Union[str, Dict[str, Any], None] = None,
+                     batch_size: int = 1000, row_format: Optional[str] = None
+                     ) -> Iterator[Union[Dict[str, Union[str, int, float]], Tuple]]:
+        """
+        Stream the entries of a specified table without loading them all into memory.
+
+        Rows are read through an unbuffered server-side cursor batch_size rows at a time, so
+        memory use does not grow with the size of the table. The connection stays checked out
+        until the generator is exhausted or closed; closing it early drops the connection
+        instead of reading the remaining rows.
+
+        Args:
+            table (str): The name of the table.
+            columns (Optional[Sequence[str]]): The columns to select, all columns if None.
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of
+                column names and values that must all match.
+            batch_size (int): The number of rows fetched from the server at a time.
+            row_format (Optional[str]): 'dict' or 'tuple', defaults to the instance's row_format.
+
+        Yields:
+            Union[Dict[str, Union[str, int, float]], Tuple]: One entry per row.
+
+        Raises:
+            Exception: Any error raised while querying, after it has been logged.
+        """
+        try:
+            row_format = self._resolve_row_format(row_format)
+            select = ', '.join(columns) if columns else '*'
+            condition, params = self._build_where(where)
+            query = f"SELECT {select} FROM {table}{condition}"
+            with self._borrow(read_only=True) as connection:
+                cursor = connection.cursor(
+                    pymysql.cursors.SSDictCursor if row_format == 'dict' else pymysql.cursors.SSCursor)
+                unread = False
+                try:
+                    self._execute(cursor, query, params, table=table)
+                    unread = True
+                    if row_format == 'tuple':
+                        make_row = _row_class(tuple(desc[0] for desc in cursor.description))._make
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        if row_format == 'tuple':
+                            yield from map(make_row, rows)
+                        else:
+                            yield from rows
+                    unread = False
+                finally:
+                    if unread and connection is not getattr(self._local, 'connection', None):
+                        # Closing the cursor would read every remaining row off the socket.
+                        connection.close()
+                    else:
+                        cursor.close()
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            self.logger.exception(
+                f"Error iterating entries in table '{table}': {e}")
+            raise
+
+    def iter_pages(self, table: str, order_by: Union[str, Sequence[str]] = 'id', page_size: int = 1000,
+                   after: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                   where: Union[str, Dict[str, Any], None] = None, row_format: Optional[str] = None
+                   ) -> Iterator[Tuple[List[Union[Dict[str, Any], Tuple]], Optional[str]]]:
+        """
+        Page through a table in key order with keyset (seek) pagination.
+
+        Each page is read with a query that seeks past the last key of the previous page
+        instead of using OFFSET, so every page costs O(page_size) however deep it is, provided
+        order_by is backed by an index. order_by must be unique, e.g. the primary key, or end
+        with a unique column. A connection is only borrowed while a page is read, so a consumer
+        can take its time between pages or stop and resume later from a token.
+
+        Args:
+            table (str): The name of the table.
+            order_by (Union[str, Sequence[str]]): The key column, or columns of a composite key.
+            page_size (int): The number of entries per page.
+            after (Optional[str]): A token returned with an earlier page, to resume after it.
+            columns (Optional[Sequence[str]]): The columns to select, all columns if None. The
+                order_by columns are always selected.
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of
+                column names and values that must all match.
+            row_format (Optional[str]): 'dict' or 'tuple', defaults to the instance's row_format.
+
+        Yields:
+            Tuple[List[Union[Dict[str, Any], Tuple]], Optional[str]]: The entries of a page and
+                the token to resume after it, None after the last page.
+
+        Raises:
+            Exception: Any error raised while querying or decoding the token, after it has been logged.
+        """
+        keys = [order_by] if isinstance(order_by, str) else list(order_by)
+        try:
+            row_format = self._resolve_row_format(row_format)
+            select = ', '.join(list(columns) + [key for key in keys if key not in columns]) if columns else '*'
+            condition, params = self._build_where(where)
+            if where and isinstance(where, str):
+                # The condition is combined with placeholders for the key, so escape literal %.
+                condition = f" WHERE ({where.replace('%', '%%')})"
+            last = self._decode_page_token(after, len(keys)) if after else None
+            # (a > x) OR (a = x AND b > y) ... seeks past the last key on a composite index.
+            seek = ' OR '.join(
+                '(' + ' AND '.join([f"{key} = %s" for key in keys[:index]] + [f"{keys[index]} > %s"]) + ')'
+                for index in range(len(keys)))
+            order = ', '.join(keys)
+            while True:
+                query_params = list(params or [])
+                query = f"SELECT {select} FROM {table}{condition}"
+                if last is not None:
+                    query += f" AND ({seek})" if condition else f" WHERE {seek}"
+                    for index in range(len(keys)):
+                        query_params.extend(last[:index + 1])
+                query += f" ORDER BY {order} LIMIT {int(page_size)}"
+                with self._borrow(read_only=True) as connection, connection.cursor(
+                        pymysql.cursors.DictCursor if row_format == 'dict' else pymysql.cursors.Cursor) as cursor:
+                    self._execute(cursor, query, query_params, table=table)
+                    rows = cursor.fetchall()
+                    names = [desc[0] for desc in cursor.description]
+                if row_format == 'tuple':
+                    rows = list(map(_row_class(tuple(names))._make, rows))
+                    last_row = dict(zip(names, rows[-1])) if rows else None
+                else:
+                    rows = list(rows)
+                    last_row = rows[-1] if rows else None
+                if len(rows) < page_size:
+                    yield rows, None
+                    return
+                last = [last_row[key] for key in keys]
+                yield rows, self._encode_page_token(last)
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            self.logger.exception(
+                f"Error paging through table '{table}': {e}")
+            raise
+
+    @staticmethod
+    def _encode_page_token(values: List[Any]) -> str:
+        """
+        Encode the key of the last entry of a page as an opaque, URL-safe token.
+        """
+        return base64.urlsafe_b64encode(json.dumps(values, default=str).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_page_token(token: str, length: int) -> List[Any]:
+        """
+        Decode a token from _encode_page_token().
+
+        Raises:
+            ValueError: If the token is malformed or does not match the number of key columns.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid page token: {token!r}") from e
+        if not isinstance(values, list) or len(values) != length:
+            raise ValueError(f"Page token {token!r} does not match the order_by columns")
+        return values
+
+    def parallel_scan(self, table: str, func: Callable[[List[Dict[str, Any]]], None], workers: int = 4,
+                      key: str = 'id', columns: Optional[Sequence[str]] = None,
+                      where: Union[str, Dict[str, Any], None] = None, chunks: Optional[int] = None,
+                      batch_size: int = 1000) -> int:
+        """
+        Scan a table in parallel by splitting it into ranges of an integer key.
+
+        The range between MIN(key) and MAX(key) is split into chunks ranges, which are scanned
+        by a pool of worker threads, each on its own pooled connection (or read replica)
+        through an unbuffered server-side cursor. Every batch of up to batch_size rows is passed
+        to func as it is read, so func is called from several threads at once and must be
+        thread-safe. There is no merged or ordered result: to merge, collect the batches in func.
+        The ranges are equal slices of the key space, not sampled from the key distribution, so
+        with unevenly distributed keys some ranges hold far more rows than others; more ranges
+        than workers keep all workers busy regardless. pool_max_size should be at least workers.
+        If any range fails, the remaining ranges are abandoned. The workers do not take part in
+        a transaction() of the calling thread.
+
+        Args:
+            table (str): The name of the table.
+            func (Callable[[List[Dict[str, Any]]], None]): Called with each batch of entries.
+            workers (int): The number of ranges scanned at the same time.
+            key (str): An indexed integer column, usually the primary key, to split the table on.
+            columns (Optional[Sequence[str]]): The columns to select, all columns if None.
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of
+                column names and values that must all match.
+            chunks (Optional[int]): The number of key ranges, 4 per worker if None.
+            batch_size (int): The maximum number of entries passed to func at a time.
+
+        Returns:
+            int: The number of entries scanned if successful, -1 otherwise.
+        """
+        try:
+            condition, params = self._build_where(where)
+            if where and isinstance(where, str):
+                # Keep an OR in the condition from escaping the key range.
+                condition = f" WHERE ({where})"
+            with self._borrow(read_only=True) as connection, connection.cursor() as cursor:
+                self._execute(cursor, f"SELECT MIN({key}), MAX({key}) FROM {table}{condition}", params, table=table)
+                low, high = cursor.fetchone()
+            if low is None:
+                return 0
+            low, high = int(low), int(high)
+            step = -(-(high - low + 1) // (chunks or workers * 4))
+            stop = threading.Event()
+            scanned = 0
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parallel-scan') as executor:
+                futures = [executor.submit(self._scan_range, table, func, key, start, min(start + step, high + 1),
+                                           columns, condition, params, batch_size, stop)
+                           for start in range(low, high + 1, step)]
+                try:
+                    for future in as_completed(futures):
+                        scanned += future.result()
+                except BaseException:
+                    stop.set()
+                    for future in futures:
+                        future.cancel()
+                    raise
+            self.logger.info(
+                f"Scanned {scanned} entries in table '{table}' in {len(futures)} ranges.")
+            return scanned
+
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error scanning table '{table}' in parallel: {e}")
+            return -1
+
+    def _scan_range(self, table: str, func: Callable[[List[Dict[str, Any]]], None], key: str,
+                    start: int, end: int, columns: Optional[Sequence[str]], condition: str,
+                    params: Optional[List[Any]], batch_size: int, stop: threading.Event) -> int:
+        """
+        Scan the entries with start <= key < end for parallel_scan() on a connection of its own.
+
+        Returns:
+            int: The number of entries passed to func.
+        """
+        select = ', '.join(columns) if columns else '*'
+        key_range = f"{key} >= {start} AND {key} < {end}"
+        query = f"SELECT {select} FROM {table}{condition} AND {key_range}" if condition \
+            else f"SELECT {select} FROM {table} WHERE {key_range}"
+        scanned = 0
+        with self._borrow(read_only=True) as connection:
+            cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+            unread = False
+            try:
+                self._execute(cursor, query, params, table=table)
+                unread = True
+                while not stop.is_set():
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        unread = False
+                        break
+                    func(rows)
+                    scanned += len(rows)
+            finally:
+                if unread:
+                    # Closing the cursor would read every remaining row off the socket.
+                    connection.close()
+                else:
+                    cursor.close()
+        return scanned
+
+    def fetch_columns(self, table: str, columns: Optional[Sequence[str]] = None,
+                      where: Union[str, Dict[str, Any], None] = None,
+                      batch_size: int = 10000) -> Union[Dict[str, Any], None]:
+        """
+        Read a table column by column for analytical use, without building a dictionary per row.
+
+        Rows are streamed through an unbuffered server-side cursor and each batch is transposed
+        straight into one buffer per column. Integer and floating point columns are stored in
+        compact array.array buffers, other columns in lists. When NumPy is installed the buffers
+        are returned as NumPy arrays (int64, float64, or object for other columns). Integer
+        columns that contain NULL become floating point with NaN in their place, and integers
+        that do not fit in 64 bits fall back to a list or object array.
+
+        Args:
+            table (str): The name of the table.
+            columns (Optional[Sequence[str]]): The columns to select, all columns if None.
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of
+                column names and values that must all match.
+            batch_size (int): The number of rows fetched from the server at a time.
+
+        Returns:
+            Union[Dict[str, Any], None]: The values of each column, keyed by column name, if
+                successful, None otherwise.
+        """
+        try:
+            select = ', '.join(columns) if columns else '*'
+            condition, params = self._build_where(where)
+            query = f"SELECT {select} FROM {table}{condition}"
+            with self._borrow(read_only=True) as connection:
+                cursor = connection.cursor(pymysql.cursors.SSCursor)
+                unread = False
+                try:
+                    self._execute(cursor, query, params, table=table)
+                    unread = True
+                    names = [desc[0] for desc in cursor.description]
+                    buffers = [array.array(_COLUMN_TYPECODES[desc[1]]) if desc[1] in _COLUMN_TYPECODES else []
+                               for desc in cursor.description]
+                    count = 0
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        count += len(rows)
+                        for index, values in enumerate(zip(*rows)):
+                            buffers[index] = self._extend_column(buffers[index], values)
+                    unread = False
+                finally:
+                    if unread and connection is not getattr(self._local, 'connection', None):
+                        # Closing the cursor would read every remaining row off the socket.
+                        connection.close()
+                    else:
+                        cursor.close()
+
+            self.logger.info(
+                f"Fetched {count} rows of {len(names)} columns from table '{table}'.")
+            if numpy is not None:
+                return {name: numpy.frombuffer(buffer, dtype=buffer.typecode) if isinstance(buffer, array.array)
+                        else numpy.array(buffer, dtype=object)
+                        for name, buffer in zip(names, buffers)}
+            return dict(zip(names, buffers))
+
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error fetching columns from table '{table}': {e}")
+            return None
+
+    def export_table(self, table: str, path: str, format: str = 'csv',
+                     columns: Optional[Sequence[str]] = None,
+                     where: Union[str, Dict[str, Any], None] = None,
+                     compress: Optional[str] = None, batch_size: int = 1000,
+                     progress: Optional[Callable[[int], None]] = None,
+                     progress_interval: int = 100000) -> int:
+        """
+        Write the rows of a table to a CSV or JSON Lines file with constant memory use.
+
+        Rows are streamed through an unbuffered server-side cursor batch_size rows at a time
+        and written through a buffered, optionally gzip-compressed, UTF-8 file. CSV files start
+        with a header row and write NULL as an empty field; JSONL files hold one object per row
+        with dates, decimals and other non-JSON values written as strings. A partially written
+        file is removed if the export fails.
+
+        Args:
+            table (str): The name of the table.
+            path (str): The file to write, overwritten if it exists.
+            format (str): 'csv' or 'jsonl'.
+            columns (Optional[Sequence[str]]): The columns to export, all columns if None.
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of
+                column names and values that must all match.
+            compress (Optional[str]): 'gzip' to compress the file, None to write it uncompressed.
+            batch_size (int): The number of rows fetched from the server at a time.
+            progress (Optional[Callable[[int], None]]): Called with the number of rows written so
+                far, every progress_interval rows and once when the export completes.
+            progress_interval (int): The number of rows between progress calls.
+
+        Returns:
+            int: The number of rows exported, or -1 if an error occurred.
+        """
+        if format not in ('csv', 'jsonl'):
+            self._fail_transaction()
+            self.logger.error(f"Unknown export format: {format}")
+            return -1
+        if compress not in (None, 'gzip'):
+            self._fail_transaction()
+            self.logger.error(f"Unknown export compression: {compress}")
+            return -1
+        opened = False
+        try:
+            select = ', '.join(columns) if columns else '*'
+            condition, params = self._build_where(where)
+            query = f"SELECT {select} FROM {table}{condition}"
+            with self._borrow(read_only=True) as connection:
+                cursor = connection.cursor(pymysql.cursors.SSCursor)
+                unread = False
+                try:
+                    self._execute(cursor, query, params, table=table)
+                    unread = True
+                    names = [desc[0] for desc in cursor.description]
+                    if compress == 'gzip':
+                        file = gzip.open(path, 'wt', encoding='utf-8', newline='')
+                    else:
+                        file = open(path, 'w', encoding='utf-8', newline='', buffering=1024 * 1024)
+                    opened = True
+                    with file:
+                        writer = csv.writer(file)
+                        if format == 'csv':
+                            writer.writerow(names)
+                        count = 0
+                        reported = 0
+                        while True:
+                            rows = cursor.fetchmany(batch_size)
+                            if not rows:
+                                break
+                            if format == 'csv':
+                                writer.writerows(rows)
+                            else:
+                                file.writelines(json.dumps(dict(zip(names, row)), default=str) + '\n'
+                                                for row in rows)
+                            count += len(rows)
+                            if progress is not None and count - reported >= progress_interval:
+                                reported = count
+                                progress(count)
+                    unread = False
+                finally:
+                    if unread and connection is not getattr(self._local, 'connection', None):
+                        # Closing the cursor would read every remaining row off the socket.
+                        connection.close()
+                    else:
+                        cursor.close()
+
+            if progress is not None:
+                progress(count)
+            self.logger.info(f"Exported {count} rows from table '{table}' to '{path}'.")
+            return count
+
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error exporting table '{table}' to '{path}': {e}")
+            if opened:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return -1
+
+    @staticmethod
+    def _extend_column(buffer: Union[array.array, list], values: Tuple[Any, ...]) -> Union[array.array, list]:
+        """
+        Append a batch of column values to a column buffer, widening the buffer if they do not fit.
+
+        Args:
+            buffer (Union[array.array, list]): The values read so far.
+            values (Tuple[Any, ...]): The column's values in the next batch of rows.
+
+        Returns:
+            Union[array.array, list]: The buffer holding all values, which is a new object if the
+                buffer had to be widened.
+        """
+        if isinstance(buffer, list):
+            buffer.extend(values)
+            return buffer
+        if None in values:
+            if buffer.typecode == 'q':
+                buffer = array.array('d', buffer)
+            values = [float('nan') if value is None else value for value in values]
+        size = len(buffer)
+        try:
+            buffer.extend(values)
+        except (TypeError, OverflowError):
+            # e.g. BIGINT UNSIGNED values above 2**63 - 1.
+            del buffer[size:]
+            buffer = buffer.tolist()
+            buffer.extend(values)
+        return buffer
+
+    @staticmethod
+    def _build_where(where: Union[str, Dict[str, Any], None]) -> Tuple[str, Optional[List[Any]]]:
+        """
+        Build a WHERE clause from a SQL condition or a dictionary of column values.
+
+        Args:
+            where (Union[str, Dict[str, Any], None]): A SQL condition, or a dictionary of column
+                names and values that must all match. A None value matches NULL.
+
+        Returns:
+            Tuple[str, Optional[List[Any]]]: The clause with a leading space, or an empty string,
+                and the parameters for its placeholders.
+        """
+        if not where:
+            return '', None
+        if isinstance(where, str):
+            return f" WHERE {where}", None
+        conditions = []
+        params = []
+        for column, value in where.items():
+            if value is None:
+                conditions.append(f"{column} IS NULL")
+            else:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        return f" WHERE {' AND '.join(conditions)}", params
+
     def insert_record(self, table: str, data: Dict[str, Union[str, int, float]]) -> int:
         """
         Insert a record into the specified table.
 
+        In write-behind mode a record inserted outside a transaction is only queued, and is
+        written with other queued records by the background thread; call flush() to wait for it.
+
         Args:
             table (str): The name of the table.
             data (dict): A dictionary containing the column names and values for the new record.
 
         Returns:
-            int: The ID of the inserted record if successful, -1 otherwise.
+            int: The ID of the inserted record if successful, 0 if the record was queued, -1 otherwise.
         """
+        if self.write_buffer is not None and not self._in_transaction():
+            if self.write_buffer.put(table, dict(data), self.write_behind_options.timeout):
+                return 0
+            self.logger.error(f"Write-behind buffer is full or closed, record for '{table}' not queued.")
+            return -1
         try:
-            with self.connection.cursor() as cursor:
-                columns = ', '.join(data.keys())
-                values = ', '.join(f"'{value}'" for value in data.values())
-                query = f"INSERT INTO {table} ({columns}) VALUES ({values})"
-                cursor.execute(query)
-                self.connection.commit()
+            with self._borrow() as connection, connection.cursor() as cursor:
+                query = _statement_template('insert', table, tuple(data))
+                self._execute(cursor, query, tuple(data.values()), table=table)
+                self._commit(connection)
                 record_id = cursor.lastrowid
                 self.logger.info(
                     f"Record inserted successfully. Record ID: {record_id}")
                 return record_id
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(f"Error inserting record: {e}")
             return -1
 
+    def _write_behind_batch(self, table: str, records: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of queued records for the write-behind buffer.
+
+        Raises:
+            RuntimeError: If the records could not be inserted.
+        """
+        if self.insert_records(table, records, single_transaction=True) < 0:
+            raise RuntimeError(f"Failed to insert {len(records)} records into '{table}'")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write the records queued in write-behind mode and wait until they are written.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, None to wait as long as needed.
+
+        Returns:
+            bool: True if every queued record was written or passed to on_error, False if
+                the timeout expired first.
+        """
+        if self.write_buffer is None:
+            return True
+        return self.write_buffer.flush(timeout)
+
+    def insert_records(self, table: str, rows: Iterable[Dict[str, Union[str, int, float]]],
+                       single_transaction: bool = False, max_rows_per_batch: int = 5000) -> int:
+        """
+        Insert many records into the specified table using multi-row INSERT statements.
+
+        Rows are grouped into batches that stay under the server's max_allowed_packet, so the
+        rows can come from a generator and are never all held in memory. Every row must have
+        the same keys as the first one.
+
+        Args:
+            table (str): The name of the table.
+            rows (Iterable[dict]): The records to insert, as column name to value dictionaries.
+            single_transaction (bool): Commit once at the end and roll back everything on error,
+                instead of committing each batch as it is written.
+            max_rows_per_batch (int): The maximum number of rows in a single INSERT statement.
+
+        Returns:
+            int: The number of records inserted if successful, -1 otherwise.
+        """
+        inserted = 0
+        try:
+            iterator = iter(rows)
+            first = next(iterator, None)
+            if first is None:
+                return 0
+            columns = tuple(first.keys())
+            header = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            with self._borrow() as connection, connection.cursor() as cursor:
+                max_bytes = self._get_max_allowed_packet(cursor) - len(header.encode())
+                # Inside transaction() the enclosing transaction already spans every batch.
+                own_transaction = single_transaction and not self._in_transaction()
+                if own_transaction:
+                    connection.begin()
+                try:
+                    for batch in self._iter_value_batches(connection, columns, itertools.chain([first], iterator),
+                                                          max_bytes, max_rows_per_batch):
+                        inserted += self._execute(cursor, header + ', '.join(batch), table=table)
+                    if own_transaction:
+                        connection.commit()
+                except BaseException:
+                    if own_transaction:
+                        connection.rollback()
+                        inserted = 0
+                    raise
+                finally:
+                    if own_transaction and self.result_cache is not None:
+                        self._invalidate_results(table)
+            self.logger.info(
+                f"{inserted} records inserted successfully into '{table}'.")
+            return inserted
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error inserting records into '{table}' after {inserted} rows: {e}")
+            return -1
+
+    def upsert_records(self, table: str, rows: Iterable[Dict[str, Union[str, int, float]]],
+                       key_columns: Sequence[str], update_columns: Optional[Sequence[str]] = None,
+                       single_transaction: bool = False,
+                       max_rows_per_batch: int = 5000) -> Union[Dict[str, int], None]:
+        """
+        Insert many records, updating the existing row instead wherever a record's key is taken.
+
+        Rows are written with multi-row INSERT ... ON DUPLICATE KEY UPDATE statements batched
+        like insert_records(), so a sync needs no reads and has no window between checking for
+        a row and writing it. MySQL 8.0.19 and later use the "AS new" row alias; older servers
+        and MariaDB use VALUES(). Every row must have the same keys as the first one.
+
+        Args:
+            table (str): The name of the table.
+            rows (Iterable[dict]): The records to upsert, as column name to value dictionaries.
+            key_columns (Sequence[str]): The columns of the PRIMARY or UNIQUE key that identifies
+                existing rows. They are never updated.
+            update_columns (Optional[Sequence[str]]): The columns overwritten on existing rows,
+                defaults to every column that is not a key column. Empty to leave existing rows
+                untouched.
+            single_transaction (bool): Commit once at the end and roll back everything on error,
+                instead of committing each batch as it is written.
+            max_rows_per_batch (int): The maximum number of rows in a single statement.
+
+        Returns:
+            Union[Dict[str, int], None]: The number of rows 'inserted', 'updated', and found
+                'unchanged' if successful, None otherwise.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        try:
+            iterator = iter(rows)
+            first = next(iterator, None)
+            if first is None:
+                return counts
+            columns = tuple(first.keys())
+            missing = [column for column in key_columns if column not in columns]
+            if missing:
+                raise KeyError(f"Key columns {missing} are missing from the rows")
+            if update_columns is None:
+                update_columns = [column for column in columns if column not in key_columns]
+            header = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            with self._borrow() as connection, connection.cursor() as cursor:
+                alias = self._supports_upsert_alias(connection)
+                if not update_columns:
+                    # Assigning a key column to itself keeps existing rows as they are.
+                    assignments = f"{key_columns[0]} = {key_columns[0]}"
+                elif alias:
+                    assignments = ', '.join(f"{column} = new.{column}" for column in update_columns)
+                else:
+                    assignments = ', '.join(f"{column} = VALUES({column})" for column in update_columns)
+                suffix = f"{' AS new' if alias else ''} ON DUPLICATE KEY UPDATE {assignments}"
+                max_bytes = self._get_max_allowed_packet(cursor) - len(header.encode()) - len(suffix.encode())
+                own_transaction = single_transaction and not self._in_transaction()
+                if own_transaction:
+                    connection.begin()
+                try:
+                    for batch in self._iter_value_batches(connection, columns, itertools.chain([first], iterator),
+                                                          max_bytes, max_rows_per_batch):
+                        affected = self._execute(cursor, header + ', '.join(batch) + suffix, table=table)
+                        for name, count in self._upsert_counts(cursor, len(batch), affected).items():
+                            counts[name] += count
+                    if own_transaction:
+                        connection.commit()
+                except BaseException:
+                    if own_transaction:
+                        connection.rollback()
+                    raise
+                finally:
+                    if own_transaction and self.result_cache is not None:
+                        self._invalidate_results(table)
+            self.logger.info(
+                f"Upserted records into '{table}': {counts['inserted']} inserted, "
+                f"{counts['updated']} updated, {counts['unchanged']} unchanged.")
+            return counts
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error upserting records into '{table}' after {sum(counts.values())} rows: {e}")
+            return None
+
+    def _supports_upsert_alias(self, connection: pymysql.connections.Connection) -> bool:
+        """
+        Check once per pool whether the server accepts INSERT ... AS new row aliases (MySQL 8.0.19+).
+        """
+        if self._upsert_alias is None:
+            version = connection.get_server_info()
+            numbers = [int(part) for part in version.split('-')[0].split('.')[:3] if part.isdigit()]
+            self._upsert_alias = 'MariaDB' not in version and tuple(numbers) >= (8, 0, 19)
+        return self._upsert_alias
+
+    @staticmethod
+    def _upsert_counts(cursor: pymysql.cursors.Cursor, rows: int, affected: int) -> Dict[str, int]:
+        """
+        Split the affected-row count of an upsert statement into inserted, updated and unchanged rows.
+
+        The server counts 1 per inserted row, 2 per updated row and 0 per row left unchanged.
+        Multi-row statements also report "Records: N  Duplicates: D" in their info message.
+        Since pymysql does not set CLIENT_FOUND_ROWS, D only counts the duplicate rows the
+        update actually changed, so it is the number of updated rows.
+
+        Args:
+            cursor (Cursor): The cursor the statement ran on.
+            rows (int): The number of rows in the statement.
+            affected (int): The affected-row count of the statement.
+
+        Returns:
+            Dict[str, int]: The 'inserted', 'updated' and 'unchanged' counts.
+        """
+        message = getattr(getattr(cursor, '_result', None), 'message', None) or b''
+        if isinstance(message, bytes):
+            message = message.decode('utf-8', 'replace')
+        words = message.replace(':', ' ').split()
+        if 'Duplicates' in words:
+            updated = int(words[words.index('Duplicates') + 1])
+            inserted = affected - 2 * updated
+            return {'inserted': inserted, 'updated': updated, 'unchanged': rows - inserted - updated}
+        # Without the info message the split is exact for a single row, but only approximate for
+        # several: it assumes no duplicate row was left unchanged.
+        updated = max(0, affected - rows)
+        inserted = max(0, min(rows, affected) - updated)
+        return {'inserted': inserted, 'updated': updated, 'unchanged': rows - inserted - updated}
+
+    def _get_max_allowed_packet(self, cursor: pymysql.cursors.Cursor) -> int:
+        """
+        Get the usable statement size in bytes, read from the server once per pool.
+
+        Args:
+            cursor (Cursor): A cursor to query the server with.
+
+        Returns:
+            int: The server's max_allowed_packet less a safety margin for protocol overhead.
+        """
+        if self._max_allowed_packet is None:
+            self._execute(cursor, "SELECT @@max_allowed_packet")
+            self._max_allowed_packet = int(cursor.fetchone()[0])
+        return int(self._max_allowed_packet * 0.9)
+
+    @staticmethod
+    def _iter_value_batches(connection: pymysql.connections.Connection, columns: Sequence[str],
+                            rows: Iterable[Dict[str, Union[str, int, float]]], max_bytes: int,
+                            max_rows: int) -> Iterator[List[str]]:
+        """
+        Escape rows into VALUES tuples and group them into batches below a size limit.
+
+        Args:
+            connection (Connection): The connection whose character set is used for escaping.
+            columns (Sequence[str]): The column names, in VALUES order.
+            rows (Iterable[dict]): The records to escape.
+            max_bytes (int): The maximum encoded size of the tuples in one batch.
+            max_rows (int): The maximum number of tuples in one batch.
+
+        Yields:
+            List[str]: The escaped "(...)" tuples of one batch.
+        """
+        batch = []
+        size = 0
+        for row in rows:
+            if len(row) != len(columns):
+                raise KeyError(
+                    f"Row columns {sorted(row)} do not match {sorted(columns)}")
+            values = '(' + ', '.join(connection.escape(row[column]) for column in columns) + ')'
+            # Account for the ", " separator between tuples.
+            length = len(values.encode(connection.encoding, 'replace')) + 2
+            if batch and (size + length > max_bytes or len(batch) >= max_rows):
+                yield batch
+                batch = []
+                size = 0
+            batch.append(values)
+            size += length
+        if batch:
+            yield batch
+
+    def bulk_load(self, table: str, source: Union[str, os.PathLike, IO, Iterable[Union[Dict[str, Any], Sequence[Any]]]],
+                  columns: Optional[Sequence[str]] = None, format: str = 'tsv', skip_lines: int = 0,
+                  relax_checks: bool = False) -> Union[Dict[str, Any], None]:
+        """
+        Load rows into a table with LOAD DATA LOCAL INFILE, MySQL's native bulk load path.
+
+        The source can be a file path, a file-like object, or an iterable of dictionaries or
+        tuples. File-like objects and iterables are streamed to the server through a pipe fed by
+        a background thread (or a temporary file where /dev/fd is not available), so they are
+        never held in memory. Rows from an iterable are written as tab-separated values with
+        NULL, tabs, newlines and backslashes escaped. Files must be in the given format: 'tsv'
+        is MySQL's default text format, 'csv' is comma-separated with optional double quotes
+        and CRLF line endings, as written by export_table(), with empty fields loaded as NULL
+        like export_table() writes them. The load runs in one transaction
+        and is rolled back if the source raises. Requires local_infile to be enabled.
+
+        Args:
+            table (str): The name of the table.
+            source (Union[str, PathLike, IO, Iterable]): The file path, file-like object or rows to load.
+            columns (Optional[Sequence[str]]): The table columns the fields map to, in order.
+                Defaults to the keys of the first row for dictionaries, or all table columns.
+            format (str): 'tsv' or 'csv', for file paths and file-like objects.
+            skip_lines (int): The number of leading lines to skip, e.g. 1 for a header row.
+            relax_checks (bool): Switch off unique_checks and foreign_key_checks for the session
+                during the load. Only use this for data known to be consistent.
+
+        Returns:
+            Union[Dict[str, Any], None]: 'rows' with the number of rows loaded, 'warnings' with
+                the number of warnings and 'messages' with up to 10 warning messages if
+                successful, None otherwise.
+        """
+        if not self.local_infile:
+            self._fail_transaction()
+            self.logger.error("bulk_load() requires the local_infile option to be enabled.")
+            return None
+        if format not in ('tsv', 'csv'):
+            self._fail_transaction()
+            self.logger.error(f"Unknown bulk load format: {format}")
+            return None
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                source = os.fspath(source)
+            elif not hasattr(source, 'read'):
+                iterator = iter(source)
+                first = next(iterator, None)
+                if first is None:
+                    return {'rows': 0, 'warnings': 0, 'messages': []}
+                source = itertools.chain([first], iterator)
+                if columns is None and isinstance(first, dict):
+                    columns = tuple(first)
+                format = 'tsv'
+            if format == 'csv':
+                fields = "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' LINES TERMINATED BY '\\r\\n'"
+            else:
+                fields = "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'"
+            query = f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 {fields}"
+            if skip_lines:
+                query += f" IGNORE {int(skip_lines)} LINES"
+
+            with self._borrow() as connection, connection.cursor() as cursor:
+                if format == 'csv':
+                    if not columns:
+                        self._execute(cursor, f"SELECT * FROM {table} LIMIT 0", table=table)
+                        columns = [desc[0] for desc in cursor.description]
+                    # CSV has no NULL marker, so empty fields are read into variables and loaded as NULL.
+                    query += f" ({', '.join(f'@f{i}' for i in range(len(columns)))}) SET " + \
+                        ', '.join(f"{column} = NULLIF(@f{i}, '')" for i, column in enumerate(columns))
+                elif columns:
+                    query += f" ({', '.join(columns)})"
+                if relax_checks:
+                    self._execute(cursor, "SELECT @@unique_checks, @@foreign_key_checks")
+                    saved_checks = cursor.fetchone()
+                    self._execute(cursor, "SET unique_checks = 0, foreign_key_checks = 0")
+                # Inside transaction() the enclosing transaction already spans the load.
+                own_transaction = not self._in_transaction()
+                try:
+                    if own_transaction:
+                        connection.begin()
+                    try:
+                        with self._load_source(source, columns) as file_name:
+                            rows = self._execute(cursor, query, (file_name,), table=table)
+                        warnings = cursor.warning_count
+                        messages = []
+                        if warnings:
+                            self._execute(cursor, "SHOW WARNINGS LIMIT 10")
+                            messages = [f"{level} {code}: {message}" for level, code, message in cursor.fetchall()]
+                        if own_transaction:
+                            connection.commit()
+                    except BaseException:
+                        if own_transaction:
+                            connection.rollback()
+                        raise
+                    finally:
+                        if own_transaction and self.result_cache is not None:
+                            self._invalidate_results(table)
+                finally:
+                    if relax_checks:
+                        self._execute(cursor, "SET unique_checks = %s, foreign_key_checks = %s", saved_checks)
+
+            self.logger.info(
+                f"{rows} records loaded into '{table}' with {warnings} warnings.")
+            for message in messages:
+                self.logger.warning(f"Bulk load into '{table}': {message}")
+            return {'rows': rows, 'warnings': warnings, 'messages': messages}
+
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error bulk loading records into '{table}': {e}")
+            return None
+
+    @contextmanager
+    def _load_source(self, source: Union[str, IO, Iterable], columns: Optional[Sequence[str]]):
+        """
+        Make a bulk load source available under a file name the driver can open.
+
+        Args:
+            source (Union[str, IO, Iterable]): A file path, a file-like object or rows.
+            columns (Optional[Sequence[str]]): The column order for dictionary rows.
+
+        Yields:
+            str: The file name to send to the server.
+
+        Raises:
+            Exception: Any error raised while reading the source, after the load statement ran.
+        """
+        if isinstance(source, str):
+            yield source
+            return
+        errors: List[BaseException] = []
+        if os.path.isdir('/dev/fd'):
+            read_fd, write_fd = os.pipe()
+            writer = threading.Thread(
+                target=self._write_load_source,
+                args=(source, columns, os.fdopen(write_fd, 'wb', buffering=1024 * 1024), errors),
+                name='bulk-load-writer', daemon=True)
+            writer.start()
+            try:
+                yield f"/dev/fd/{read_fd}"
+            finally:
+                # Closing the read end unblocks the writer if the server stopped reading early.
+                os.close(read_fd)
+                writer.join()
+        else:
+            fd, file_name = tempfile.mkstemp(suffix='.tsv')
+            try:
+                self._write_load_source(source, columns, os.fdopen(fd, 'wb'), errors)
+                if errors:
+                    raise errors[0]
+                yield file_name
+            finally:
+                os.remove(file_name)
+        if errors:
+            raise errors[0]
+
+    @classmethod
+    def _write_load_source(cls, source: Union[IO, Iterable], columns: Optional[Sequence[str]],
+                           file: IO[bytes], errors: List[BaseException]) -> None:
+        """
+        Copy a file-like object, or rows as tab-separated values, to a binary file and close it.
+
+        Args:
+            source (Union[IO, Iterable]): A file-like object or rows.
+            columns (Optional[Sequence[str]]): The column order for dictionary rows.
+            file (IO[bytes]): The file to write.
+            errors (List[BaseException]): Receives the error if the source cannot be read.
+        """
+        try:
+            with file:
+                if hasattr(source, 'read'):
+                    while True:
+                        chunk = source.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        file.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                else:
+                    for row in source:
+                        values = [row[column] for column in columns] if isinstance(row, dict) else row
+                        file.write(b'\t'.join([cls._tsv_field(value) for value in values]) + b'\n')
+        except BrokenPipeError:
+            # The server stopped reading; the load statement reports the reason.
+            pass
+        except BaseException as e:
+            errors.append(e)
+
+    @staticmethod
+    def _tsv_field(value: Any) -> bytes:
+        """
+        Encode a value as a field of MySQL's default LOAD DATA text format.
+
+        Args:
+            value (Any): The value.
+
+        Returns:
+            bytes: The UTF-8 field with NULL written as \\N and special characters escaped.
+        """
+        if value is None:
+            return b'\\N'
+        if isinstance(value, bool):
+            return b'1' if value else b'0'
+        if isinstance(value, (int, float)):
+            return str(value).encode()
+        data = value if isinstance(value, (bytes, bytearray)) else str(value).encode('utf-8')
+        return (data.replace(b'\\', b'\\\\').replace(b'\t', b'\\t').replace(b'\n', b'\\n')
+                .replace(b'\r', b'\\r').replace(b'\0', b'\\0'))
+
     def update_record(self, table: str, record_id: int, data: Dict[str, Union[str, int, float]]) -> bool:
         """
         Update a record in the specified table.
@@ -425,15 +2415,14 @@ class AWSMySQLLib:
             bool: True if the update is successful, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
-                updates = ', '.join(
-                    f"{key} = '{value}'" for key, value in data.items())
-                query = f"UPDATE {table} SET {updates} WHERE id = {record_id}"
-                cursor.execute(query)
-            self.connection.commit()
+            with self._borrow() as connection, connection.cursor() as cursor:
+                query = _statement_template('update', table, tuple(data))
+                self._execute(cursor, query, tuple(data.values()) + (record_id,), table=table)
+                self._commit(connection)
             self.logger.info("Record updated successfully.")
             return True
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(f"Error updating record: {e}")
             return False
 
@@ -449,25 +2438,144 @@ class AWSMySQLLib:
             bool: True if the deletion is successful, False otherwise.
         """
         try:
-            with self.connection.cursor() as cursor:
-                query = f"DELETE FROM {table} WHERE id = {record_id}"
-                cursor.execute(query)
-            self.connection.commit()
+            with self._borrow() as connection, connection.cursor() as cursor:
+                query = _statement_template('delete', table)
+                self._execute(cursor, query, (record_id,), table=table)
+                self._commit(connection)
             self.logger.info("Record deleted successfully.")
             return True
         except Exception as e:
+            self._fail_transaction()
             self.logger.exception(f"Error deleting record: {e}")
             return False
 
+    def update_records(self, table: str, records: Dict[int, Dict[str, Union[str, int, float]]],
+                       chunk_size: int = 500) -> int:
+        """
+        Update many records in the specified table by ID.
+
+        Each chunk of records is written with a single UPDATE using one CASE expression per
+        column, so records may set different columns.
+
+        Args:
+            table (str): The name of the table.
+            records (Dict[int, dict]): The new column values of each record, keyed by record ID.
+            chunk_size (int): The maximum number of records updated by one statement.
+
+        Returns:
+            int: The number of rows affected if successful, -1 otherwise.
+        """
+        affected = 0
+        try:
+            # Records without new values would leave nothing to SET.
+            items = ((record_id, data) for record_id, data in records.items() if data)
+            with self._borrow() as connection, connection.cursor() as cursor:
+                while True:
+                    chunk = list(itertools.islice(items, chunk_size))
+                    if not chunk:
+                        break
+                    query, params = self._build_case_update(table, chunk)
+                    affected += self._execute(cursor, query, params, table=table)
+                self._commit(connection)
+            self.logger.info(
+                f"{affected} records updated successfully in '{table}'.")
+            return affected
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error updating records in '{table}' after {affected} rows: {e}")
+            return -1
+
+    @staticmethod
+    def _build_case_update(table: str, chunk: List[Tuple[int, Dict[str, Union[str, int, float]]]]) -> Tuple[str, list]:
+        """
+        Build one UPDATE statement that sets each record's own values through CASE expressions.
+
+        Args:
+            table (str): The name of the table.
+            chunk (List[Tuple[int, dict]]): The (record ID, new values) pairs to update.
+
+        Returns:
+            Tuple[str, list]: The statement and its parameters.
+        """
+        columns = list(dict.fromkeys(column for _, data in chunk for column in data))
+        assignments = []
+        params = []
+        for column in columns:
+            cases = []
+            for record_id, data in chunk:
+                if column in data:
+                    cases.append("WHEN %s THEN %s")
+                    params.extend((record_id, data[column]))
+            assignments.append(f"{column} = CASE id {' '.join(cases)} ELSE {column} END")
+        params.extend(record_id for record_id, _ in chunk)
+        placeholders = ', '.join(['%s'] * len(chunk))
+        query = f"UPDATE {table} SET {', '.join(assignments)} WHERE id IN ({placeholders})"
+        return query, params
+
+    def delete_records(self, table: str, record_ids: Iterable[int], chunk_size: int = 1000) -> int:
+        """
+        Delete many records from the specified table by ID.
+
+        Args:
+            table (str): The name of the table.
+            record_ids (Iterable[int]): The IDs of the records to delete.
+            chunk_size (int): The maximum number of IDs in one DELETE ... WHERE id IN (...) statement.
+
+        Returns:
+            int: The number of rows deleted if successful, -1 otherwise.
+        """
+        affected = 0
+        try:
+            ids = iter(record_ids)
+            with self._borrow() as connection, connection.cursor() as cursor:
+                while True:
+                    chunk = list(itertools.islice(ids, chunk_size))
+                    if not chunk:
+                        break
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    affected += self._execute(
+                        cursor, f"DELETE FROM {table} WHERE id IN ({placeholders})", chunk, table=table)
+                self._commit(connection)
+            self.logger.info(
+                f"{affected} records deleted successfully from '{table}'.")
+            return affected
+        except Exception as e:
+            self._fail_transaction()
+            self.logger.exception(
+                f"Error deleting records from '{table}' after {affected} rows: {e}")
+            return -1
+
     def close_connection(self) -> bool:
         """
-        Close the connection to the MySQL database if it is open.
+        Close the pooled connections to the MySQL database if they are open.
 
         Returns:
-            bool: True if the connection was successfully closed, False if there was no connection to close.
+            bool: True if the connections were successfully closed, False if there was no connection to close.
         """
-        if self.connection and self.connection.open:
-            self.connection.close()
+        if self.write_buffer is not None:
+            # Drain before the pool closes, so queued records are not lost.
+            drain_timeout = self.write_behind_options.drain_timeout
+            if not self.write_buffer.close(drain_timeout):
+                self.logger.error(
+                    f"Write-behind buffer was not drained within {drain_timeout} seconds; "
+                    f"unwritten records were passed to on_error or logged as dropped.")
+            self.write_buffer = None
+        if self.diagnostics is not None:
+            self.diagnostics.close()
+        if self.replicas is not None:
+            self.replicas.close()
+            self.replicas = None
+        with self._legacy_connection_lock:
+            legacy, self._legacy_connection = self._legacy_connection, None
+        if legacy is not None:
+            try:
+                legacy.close()
+            except Exception as e:
+                self.logger.debug(f"Could not close the deprecated connection: {e}")
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
             self.logger.debug("Connection closed.")
             return True
         else:
@@ -0,0 +1,307 @@
+from typing import Callable, Dict, Optional
+from collections import deque
+from contextlib import contextmanager
+import threading
+import time
+import logging
+import pymysql
+
+# Errors the server reports for a single statement; the connection itself is still usable.
+STATEMENT_ERRORS = (pymysql.err.IntegrityError, pymysql.err.ProgrammingError,
+                    pymysql.err.DataError, pymysql.err.NotSupportedError)
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection could be checked out of the pool before the timeout expired.
+    """
+
+
+class PoolClosedError(Exception):
+    """
+    Raised when a connection is requested from a pool that has been closed.
+    """
+
+
+class ConnectionPool:
+    """
+    A thread-safe, bounded pool of pymysql connections.
+    """
+
+    def __init__(self, factory: Callable[[], pymysql.connections.Connection], min_size: int = 1,
+                 max_size: int = 10, timeout: float = 30.0, max_idle: float = 300.0,
+                 max_lifetime: float = 3600.0, ping_on_checkout: bool = True, ping_interval: float = 0.0,
+                 on_checkout: Optional[Callable[[pymysql.connections.Connection], None]] = None):
+        """
+        Initialize the ConnectionPool with the given sizing and recycling parameters.
+
+        Args:
+            factory (Callable[[], Connection]): A callable that opens a new connection.
+            min_size (int): The number of connections kept open even when idle.
+            max_size (int): The maximum number of connections open at any time.
+            timeout (float): Seconds to wait for a free connection before giving up.
+            max_idle (float): Seconds an idle connection above min_size is kept before it is closed.
+            max_lifetime (float): Seconds after which a connection is recycled regardless of use.
+            ping_on_checkout (bool): Whether to ping a connection before handing it out.
+            ping_interval (float): Seconds a connection must have been idle before it is pinged on
+                checkout, so connections reused in quick succession skip the round trip.
+            on_checkout (Optional[Callable[[Connection], None]]): Called with every connection
+                before it is handed out, e.g. to select a database. A connection it raises for
+                is discarded.
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_on_checkout = ping_on_checkout
+        self.ping_interval = ping_interval
+        self.on_checkout = on_checkout
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._condition = threading.Condition()
+        # Idle connections as (connection, last_used) with the most recently used on the right.
+        self._idle = deque()
+        self._created: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """
+        int: The number of connections currently open, idle or checked out.
+        """
+        with self._condition:
+            return self._size
+
+    @property
+    def idle(self) -> int:
+        """
+        int: The number of connections currently waiting in the pool.
+        """
+        with self._condition:
+            return len(self._idle)
+
+    def fill(self) -> None:
+        """
+        Open connections until the pool holds at least min_size of them.
+
+        Raises:
+            Exception: Any error raised by the connection factory.
+        """
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            connection = self._open()
+            self.release(connection)
+
+    def acquire(self, timeout: Optional[float] = None) -> pymysql.connections.Connection:
+        """
+        Check a connection out of the pool, opening a new one if the pool is below max_size.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for a connection, defaults to the pool timeout.
+
+        Returns:
+            Connection: A live connection that must be handed back with release().
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time.
+            PoolClosedError: If the pool has been closed.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            expired = []
+            connection = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    expired.extend(self._evict_locked())
+                    if self._idle:
+                        connection, last_used = self._idle.pop()
+                        if self._is_expired(connection, time.monotonic()):
+                            self._size -= 1
+                            self._created.pop(id(connection), None)
+                            expired.append(connection)
+                            connection = None
+                            continue
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Timed out waiting for a connection (max_size={self.max_size})")
+                    self._condition.wait(remaining)
+            for stale in expired:
+                self._close(stale)
+            if connection is None:
+                connection = self._open()
+            elif not self._is_usable(connection, time.monotonic() - last_used):
+                self._discard(connection)
+                continue
+            if self.on_checkout is not None:
+                try:
+                    self.on_checkout(connection)
+                except BaseException:
+                    self._discard(connection)
+                    raise
+            return connection
+
+    def release(self, connection: pymysql.connections.Connection, discard: bool = False) -> None:
+        """
+        Hand a connection back to the pool.
+
+        Args:
+            connection (Connection): The connection previously returned by acquire().
+            discard (bool): Close the connection instead of keeping it for reuse.
+        """
+        with self._condition:
+            keep = (not discard and not self._closed and connection.open
+                    and not self._is_expired(connection, time.monotonic()))
+            if keep:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+                return
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Check out a connection for the duration of a with-block.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for a connection, defaults to the pool timeout.
+
+        Yields:
+            Connection: A live connection from the pool.
+        """
+        connection = self.acquire(timeout)
+        with self.checked_out(connection):
+            yield connection
+
+    @contextmanager
+    def checked_out(self, connection: pymysql.connections.Connection):
+        """
+        Hand a connection acquired from this pool back when a with-block exits.
+
+        The connection is discarded rather than reused when the block fails with anything other
+        than an error the server reported for a single statement, since its session state is
+        then unknown.
+
+        Args:
+            connection (Connection): The connection previously returned by acquire().
+
+        Yields:
+            Connection: The same connection.
+        """
+        try:
+            yield connection
+        except STATEMENT_ERRORS:
+            self.release(connection)
+            raise
+        except BaseException:
+            self.release(connection, discard=True)
+            raise
+        self.release(connection)
+
+    def close(self) -> None:
+        """
+        Close all idle connections and refuse further checkouts.
+
+        Connections that are checked out are closed when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for connection in idle:
+            self._discard(connection)
+        self.logger.debug("Connection pool closed.")
+
+    def _open(self) -> pymysql.connections.Connection:
+        """
+        Open a new connection through the factory. The caller must already have reserved a slot.
+        """
+        try:
+            connection = self.factory()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created[id(connection)] = time.monotonic()
+        self.logger.debug("Opened a new pooled connection.")
+        return connection
+
+    def _is_usable(self, connection: pymysql.connections.Connection, idle_for: float) -> bool:
+        """
+        Check that an idle connection is still alive before handing it out.
+        """
+        if not self.ping_on_checkout or idle_for < self.ping_interval:
+            return connection.open
+        try:
+            connection.ping(False)
+            return True
+        except Exception as e:
+            self.logger.debug(f"Pooled connection failed ping, discarding: {e}")
+            return False
+
+    def _is_expired(self, connection: pymysql.connections.Connection, now: float) -> bool:
+        """
+        Check whether a connection has outlived max_lifetime. Must be called with the lock held.
+        """
+        created = self._created.get(id(connection), now)
+        return self.max_lifetime is not None and now - created >= self.max_lifetime
+
+    def _evict_locked(self) -> list:
+        """
+        Remove idle connections past max_idle or max_lifetime. Must be called with the lock held.
+
+        Returns:
+            list: The evicted connections, to be closed once the lock is released.
+        """
+        now = time.monotonic()
+        evicted = []
+        # The left end holds the least recently used connections.
+        while self._idle:
+            connection, last_used = self._idle[0]
+            idle_too_long = (self.max_idle is not None and now - last_used >= self.max_idle
+                             and self._size - len(evicted) > self.min_size)
+            if not (idle_too_long or self._is_expired(connection, now)):
+                break
+            self._idle.popleft()
+            evicted.append(connection)
+        for connection in evicted:
+            self._size -= 1
+            self._created.pop(id(connection), None)
+        return evicted
+
+    def _discard(self, connection: pymysql.connections.Connection) -> None:
+        """
+        Close a connection and free its slot in the pool.
+        """
+        with self._condition:
+            self._size -= 1
+            self._created.pop(id(connection), None)
+            self._condition.notify()
+        self._close(connection)
+
+    def _close(self, connection: pymysql.connections.Connection) -> None:
+        """
+        Close a connection, ignoring errors from an already broken socket.
+        """
+        try:
+            if connection.open:
+                connection.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing pooled connection: {e}")
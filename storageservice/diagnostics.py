@@ -0,0 +1,174 @@
+from typing import Any, Callable, Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import logging
+from storageservice.querystats import QueryEvent, statement_fingerprint
+
+# Statement kinds that EXPLAIN accepts without side effects.
+EXPLAINABLE_KINDS = frozenset(('SELECT', 'UPDATE', 'DELETE'))
+
+
+def analyze_plan(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Find the expensive steps in an EXPLAIN FORMAT=JSON plan from MySQL or MariaDB.
+
+    Args:
+        plan (dict): The parsed plan.
+
+    Returns:
+        List[dict]: One dictionary per issue, with 'issue' set to 'full_scan', 'full_index_scan',
+            'missing_index', 'filesort' or 'temporary_table', and the 'table' and estimated 'rows'
+            where the plan gives them.
+    """
+    issues = []
+
+    def visit(node: Any) -> None:
+        if isinstance(node, list):
+            for item in node:
+                visit(item)
+            return
+        if not isinstance(node, dict):
+            return
+        if node.get('using_filesort') or isinstance(node.get('filesort'), dict):
+            issues.append({'issue': 'filesort'})
+        if node.get('using_temporary_table') or isinstance(node.get('temporary_table'), dict):
+            issues.append({'issue': 'temporary_table'})
+        table = node.get('table')
+        if isinstance(table, dict) and 'table_name' in table:
+            name = table['table_name']
+            rows = table.get('rows_examined_per_scan', table.get('rows'))
+            access_type = table.get('access_type')
+            if access_type == 'ALL':
+                issues.append({'issue': 'full_scan', 'table': name, 'rows': rows})
+                # A filtered scan that no index could serve.
+                if not table.get('possible_keys') and table.get('attached_condition'):
+                    issues.append({'issue': 'missing_index', 'table': name, 'rows': rows,
+                                   'condition': table['attached_condition']})
+            elif access_type == 'index':
+                issues.append({'issue': 'full_index_scan', 'table': name, 'rows': rows,
+                               'key': table.get('key')})
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                visit(value)
+
+    visit(plan)
+    return issues
+
+
+class QueryDiagnostics:
+    """
+    Explains slow statements in the background and keeps a bounded history of expensive plans.
+    """
+
+    def __init__(self, explain: Callable[[str, Optional[str]], Dict[str, Any]], threshold: float = 0.5,
+                 max_findings: int = 100, interval: float = 60.0, max_pending: int = 8,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize QueryDiagnostics.
+
+        Args:
+            explain (Callable[[str, Optional[str]], dict]): Runs EXPLAIN FORMAT=JSON for a
+                statement on the given host, or the primary server for None, and returns the
+                parsed plan. It must not report its own statement back to observe().
+            threshold (float): Seconds above which a statement is explained.
+            max_findings (int): The number of findings kept, oldest dropped first.
+            interval (float): Seconds before a statement of the same shape is explained again.
+            max_pending (int): The number of statements waiting to be explained, beyond which
+                slow statements are skipped.
+            logger (Optional[logging.Logger]): The logger for findings and errors.
+        """
+        self.explain = explain
+        self.threshold = threshold
+        self.interval = interval
+        self.max_pending = max_pending
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._findings: deque = deque(maxlen=max_findings)
+        self._explained_at: Dict[str, float] = {}
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def observe(self, event: QueryEvent) -> None:
+        """
+        Queue a slow statement to be explained. Registered as a query listener.
+
+        Args:
+            event (QueryEvent): The executed statement.
+        """
+        if event.error is not None or event.latency < self.threshold or event.kind not in EXPLAINABLE_KINDS:
+            return
+        fingerprint = statement_fingerprint(event.statement)
+        now = time.monotonic()
+        with self._lock:
+            if self._pending >= self.max_pending or now - self._explained_at.get(fingerprint, float('-inf')) < self.interval:
+                return
+            self._explained_at[fingerprint] = now
+            if len(self._explained_at) > 10 * self._findings.maxlen:
+                # Forget shapes whose interval has passed, so the map stays bounded.
+                self._explained_at = {key: at for key, at in self._explained_at.items()
+                                      if now - at < self.interval}
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='diagnostics')
+            self._executor.submit(self._diagnose, event, fingerprint)
+            self._pending += 1
+
+    def findings(self) -> List[Dict[str, Any]]:
+        """
+        Get the findings recorded so far, oldest first.
+
+        Returns:
+            List[dict]: One dictionary per explained statement with issues, holding 'time' (Unix
+                time), 'kind', 'table', 'host', 'latency', 'fingerprint', 'issues' and 'plan'.
+                The statement is kept as its fingerprint, so findings hold no values.
+        """
+        with self._lock:
+            return list(self._findings)
+
+    def clear(self) -> None:
+        """
+        Discard the recorded findings and explain every statement shape again when next slow.
+        """
+        with self._lock:
+            self._findings.clear()
+            self._explained_at.clear()
+
+    def close(self) -> None:
+        """
+        Wait for the statements being explained and stop the background thread.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _diagnose(self, event: QueryEvent, fingerprint: str) -> None:
+        """
+        Explain a statement and record a finding if its plan has issues.
+        """
+        try:
+            plan = self.explain(event.statement, event.host)
+            issues = analyze_plan(plan)
+            if not issues:
+                return
+            finding = {
+                'time': time.time(),
+                'kind': event.kind,
+                'table': event.table,
+                'host': event.host,
+                'latency': event.latency,
+                'fingerprint': fingerprint,
+                'issues': issues,
+                'plan': plan,
+            }
+            with self._lock:
+                self._findings.append(finding)
+            summary = ', '.join(sorted({issue['issue'] for issue in issues}))
+            self.logger.warning(
+                f"Slow {event.kind} on {event.table} ({event.latency * 1000:.1f} ms): {summary}")
+        except Exception as e:
+            self.logger.debug(f"Could not explain statement: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
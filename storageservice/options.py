@@ -0,0 +1,200 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import configparser
+
+
+class PoolOptions(NamedTuple):
+    """
+    Settings of the connection pools opened to the writer and to each read replica.
+
+    Attributes:
+        min_size (int): The number of pooled connections kept open while idle.
+        max_size (int): The maximum number of pooled connections.
+        timeout (float): Seconds to wait for a free pooled connection.
+        max_idle (float): Seconds before an idle connection above min_size is closed.
+        max_lifetime (float): Seconds after which a pooled connection is recycled.
+        ping_interval (float): Seconds a pooled connection must have been idle before it is
+            pinged on checkout.
+    """
+    min_size: int = 1
+    max_size: int = 10
+    timeout: float = 30.0
+    max_idle: float = 300.0
+    max_lifetime: float = 3600.0
+    ping_interval: float = 5.0
+
+    @classmethod
+    def from_config(cls, details: configparser.SectionProxy) -> 'PoolOptions':
+        """
+        Read the pool_* keys of a configuration section.
+
+        Args:
+            details (SectionProxy): The section holding the connection settings.
+
+        Returns:
+            PoolOptions: The options, with defaults for missing keys.
+        """
+        defaults = cls()
+        return cls(
+            min_size=details.getint('pool_min_size', fallback=defaults.min_size),
+            max_size=details.getint('pool_max_size', fallback=defaults.max_size),
+            timeout=details.getfloat('pool_timeout', fallback=defaults.timeout),
+            max_idle=details.getfloat('pool_max_idle', fallback=defaults.max_idle),
+            max_lifetime=details.getfloat('pool_max_lifetime', fallback=defaults.max_lifetime),
+            ping_interval=details.getfloat('pool_ping_interval', fallback=defaults.ping_interval)
+        )
+
+
+class ReplicaOptions(NamedTuple):
+    """
+    Read replicas that reads are routed to, and how their health is checked.
+
+    Attributes:
+        hosts (Sequence[str]): Read replica endpoints.
+        max_lag (Optional[float]): Seconds of replication lag above which a replica is taken out
+            of rotation, None to only check that replicas are reachable.
+        check_interval (float): Seconds between health and lag checks of each replica.
+        strategy (str): 'round_robin' or 'least_loaded' replica selection.
+    """
+    hosts: Sequence[str] = ()
+    max_lag: Optional[float] = None
+    check_interval: float = 5.0
+    strategy: str = 'round_robin'
+
+    @classmethod
+    def from_config(cls, details: configparser.SectionProxy) -> 'ReplicaOptions':
+        """
+        Read the reader_hosts and replica keys of a configuration section.
+
+        Args:
+            details (SectionProxy): The section holding the connection settings.
+
+        Returns:
+            ReplicaOptions: The options, with no replicas if reader_hosts is missing.
+        """
+        defaults = cls()
+        return cls(
+            hosts=tuple(reader.strip() for reader in details.get('reader_hosts', fallback='').split(',')
+                        if reader.strip()),
+            max_lag=details.getfloat('max_replica_lag', fallback=defaults.max_lag),
+            check_interval=details.getfloat('replica_check_interval', fallback=defaults.check_interval),
+            strategy=details.get('replica_strategy', fallback=defaults.strategy)
+        )
+
+
+class CacheOptions(NamedTuple):
+    """
+    Settings of the schema cache and of the result cache.
+
+    Attributes:
+        schema_ttl (float): Seconds list_tables_with_columns results are cached, 0 to disable.
+        result_size (int): The number of table reads whose results are cached, 0 to disable.
+        result_ttl (float): Seconds a cached table read stays valid.
+        result_max_bytes (int): The approximate memory cap of the result cache.
+    """
+    schema_ttl: float = 60.0
+    result_size: int = 0
+    result_ttl: float = 30.0
+    result_max_bytes: int = 64 * 1024 * 1024
+
+    @classmethod
+    def from_config(cls, details: configparser.SectionProxy) -> 'CacheOptions':
+        """
+        Read the schema_cache_ttl and result_cache_* keys of a configuration section.
+
+        Args:
+            details (SectionProxy): The section holding the connection settings.
+
+        Returns:
+            CacheOptions: The options, with defaults for missing keys.
+        """
+        defaults = cls()
+        return cls(
+            schema_ttl=details.getfloat('schema_cache_ttl', fallback=defaults.schema_ttl),
+            result_size=details.getint('result_cache_size', fallback=defaults.result_size),
+            result_ttl=details.getfloat('result_cache_ttl', fallback=defaults.result_ttl),
+            result_max_bytes=details.getint('result_cache_max_bytes', fallback=defaults.result_max_bytes)
+        )
+
+
+class WriteBehindOptions(NamedTuple):
+    """
+    Settings of write-behind mode, which queues insert_record() calls outside transactions and
+    writes them in multi-row batches from a background thread.
+
+    Attributes:
+        max_size (int): The maximum number of queued records; insert_record() waits for space
+            when it is reached.
+        batch_size (int): The number of queued records written per batch.
+        interval (float): Seconds after which queued records are written even if the batch is
+            not full.
+        timeout (Optional[float]): Seconds insert_record() waits for space in a full buffer
+            before failing, None to wait as long as needed.
+        drain_timeout (Optional[float]): Seconds close_connection() waits for the queued records
+            to be written, None to wait as long as needed. Records still queued when it expires
+            are passed to on_error, or logged as dropped.
+        on_error (Optional[Callable[[str, List[dict], Exception], None]]): Called with the table,
+            the records and the error when a queued batch cannot be written.
+    """
+    max_size: int = 10000
+    batch_size: int = 1000
+    interval: float = 1.0
+    timeout: Optional[float] = None
+    drain_timeout: Optional[float] = None
+    on_error: Optional[Callable[[str, List[Dict[str, Any]], Exception], None]] = None
+
+    @classmethod
+    def from_config(cls, details: configparser.SectionProxy) -> Optional['WriteBehindOptions']:
+        """
+        Read the write_behind* keys of a configuration section.
+
+        Args:
+            details (SectionProxy): The section holding the connection settings.
+
+        Returns:
+            Optional[WriteBehindOptions]: The options, or None unless write_behind is enabled.
+        """
+        if not details.getboolean('write_behind', fallback=False):
+            return None
+        defaults = cls()
+        return cls(
+            max_size=details.getint('write_behind_max_size', fallback=defaults.max_size),
+            batch_size=details.getint('write_behind_batch_size', fallback=defaults.batch_size),
+            interval=details.getfloat('write_behind_interval', fallback=defaults.interval),
+            timeout=details.getfloat('write_behind_timeout', fallback=defaults.timeout),
+            drain_timeout=details.getfloat('write_behind_drain_timeout', fallback=defaults.drain_timeout)
+        )
+
+
+class DiagnosticsOptions(NamedTuple):
+    """
+    Settings of diagnostics mode, which explains slow statements in the background and records
+    the expensive steps of their plans.
+
+    Attributes:
+        threshold (float): Seconds above which a statement is explained.
+        max_findings (int): The number of diagnostic findings kept.
+        interval (float): Seconds before a statement of the same shape is explained again.
+    """
+    threshold: float = 0.5
+    max_findings: int = 100
+    interval: float = 60.0
+
+    @classmethod
+    def from_config(cls, details: configparser.SectionProxy) -> Optional['DiagnosticsOptions']:
+        """
+        Read the diagnostics* keys of a configuration section.
+
+        Args:
+            details (SectionProxy): The section holding the connection settings.
+
+        Returns:
+            Optional[DiagnosticsOptions]: The options, or None unless diagnostics is enabled.
+        """
+        if not details.getboolean('diagnostics', fallback=False):
+            return None
+        defaults = cls()
+        return cls(
+            threshold=details.getfloat('diagnostics_threshold', fallback=defaults.threshold),
+            max_findings=details.getint('diagnostics_max_findings', fallback=defaults.max_findings),
+            interval=details.getfloat('diagnostics_interval', fallback=defaults.interval)
+        )
@@ -0,0 +1,267 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from contextlib import contextmanager
+import bisect
+import re
+import threading
+import time
+import logging
+
+# Quoted strings and numbers, replaced to group statements that differ only in their values.
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+
+
+def statement_fingerprint(statement: str) -> str:
+    """
+    Reduce a statement to its shape, with literal values replaced by '?' and whitespace collapsed.
+
+    Args:
+        statement (str): The statement text.
+
+    Returns:
+        str: The fingerprint, equal for statements that differ only in their values.
+    """
+    return ' '.join(_LITERALS.sub('?', statement).split())
+
+
+def statement_kind(query: str) -> str:
+    """
+    Get the leading keyword of a statement, such as 'SELECT', in upper case.
+
+    Args:
+        query (str): The statement text.
+
+    Returns:
+        str: The keyword, empty for an empty statement.
+    """
+    return query.lstrip().split(None, 1)[0].upper() if query.strip() else ''
+
+
+class QueryEvent(NamedTuple):
+    """
+    A record of one statement executed by the library.
+
+    Attributes:
+        kind (str): The statement keyword, such as 'SELECT' or 'INSERT'.
+        table (Optional[str]): The table the statement targets, if known.
+        latency (float): Seconds spent executing the statement.
+        rows (Optional[int]): Rows returned or affected, None for unbuffered reads.
+        statement_bytes (int): The size of the statement sent to the server, encoded as UTF-8.
+            Bytes received with the result are not measured.
+        statement (str): The statement text, with parameters substituted.
+        error (Optional[Exception]): The error raised by the statement, if any.
+        host (Optional[str]): The server the statement ran on, if known.
+    """
+    kind: str
+    table: Optional[str]
+    latency: float
+    rows: Optional[int]
+    statement_bytes: int
+    statement: str
+    error: Optional[Exception] = None
+    host: Optional[str] = None
+
+
+# Exponential latency bucket upper bounds, four per doubling, from 0.1 ms to about 2 minutes.
+_BUCKET_BOUNDS = [0.0001 * 2 ** (i / 4) for i in range(82)]
+
+
+class LatencyHistogram:
+    """
+    A fixed-size latency histogram with exponential buckets.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty LatencyHistogram.
+        """
+        self.buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.statement_bytes = 0
+
+    def record(self, event: QueryEvent) -> None:
+        """
+        Add a statement to the histogram.
+
+        Args:
+            event (QueryEvent): The executed statement.
+        """
+        self.buckets[bisect.bisect_left(_BUCKET_BOUNDS, event.latency)] += 1
+        self.count += 1
+        self.total += event.latency
+        self.max = max(self.max, event.latency)
+        self.rows += event.rows or 0
+        self.statement_bytes += event.statement_bytes
+        if event.error is not None:
+            self.errors += 1
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimate a latency percentile as the upper bound of the bucket that contains it.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The estimated latency in seconds, 0.0 if nothing was recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(_BUCKET_BOUNDS[index], self.max) if index < len(_BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the histogram.
+
+        Returns:
+            Dict[str, float]: The count, errors, rows, statement bytes and latency statistics in
+                seconds.
+        """
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'statement_bytes': self.statement_bytes,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+class QueryStats:
+    """
+    Thread-safe, in-process aggregation of per-statement latency and volume.
+    """
+
+    def __init__(self, slow_query_threshold: Optional[float] = 1.0, logger: Optional[logging.Logger] = None):
+        """
+        Initialize QueryStats.
+
+        Args:
+            slow_query_threshold (Optional[float]): Seconds above which a statement is logged as
+                slow, None to disable slow-query logging.
+            logger (Optional[logging.Logger]): The logger for slow statements and listener errors.
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Optional[str]], LatencyHistogram] = {}
+        self._listeners: List[Callable[[QueryEvent], None]] = []
+
+    def add_listener(self, callback: Callable[[QueryEvent], None]) -> None:
+        """
+        Call a function for every statement executed, e.g. to forward it to a metrics exporter.
+
+        The callback runs synchronously on the thread that executed the statement, so it should
+        be quick. Errors it raises are logged and ignored.
+
+        Args:
+            callback (Callable[[QueryEvent], None]): The function to call with each QueryEvent.
+        """
+        with self._lock:
+            self._listeners = self._listeners + [callback]
+
+    def remove_listener(self, callback: Callable[[QueryEvent], None]) -> None:
+        """
+        Stop calling a function registered with add_listener().
+
+        Args:
+            callback (Callable[[QueryEvent], None]): The function to remove.
+        """
+        with self._lock:
+            self._listeners = [listener for listener in self._listeners if listener != callback]
+
+    def record(self, event: QueryEvent) -> None:
+        """
+        Aggregate an executed statement, log it if slow and pass it to the listeners.
+
+        Slow statements are logged as their fingerprint, so parameter values do not reach the log.
+
+        Args:
+            event (QueryEvent): The executed statement.
+        """
+        key = (event.kind, event.table)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(event)
+            listeners = self._listeners
+        if self.slow_query_threshold is not None and event.latency >= self.slow_query_threshold:
+            self.logger.warning(
+                f"Slow query ({event.latency * 1000:.1f} ms, {event.kind} on {event.table}): "
+                f"{statement_fingerprint(event.statement)[:500]}")
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                self.logger.exception(f"Error in query listener {listener!r}: {e}")
+
+    @contextmanager
+    def timed(self, cursor: Any, query: str, table: Optional[str] = None, unbuffered: bool = False):
+        """
+        Time the statement executed on a cursor inside the with-block and record it.
+
+        Used by both the pymysql and the aiomysql client, so their statements are measured alike.
+
+        Args:
+            cursor (Any): The cursor the statement is executed on.
+            query (str): The statement, with %s placeholders if it has parameters.
+            table (Optional[str]): The table the statement targets, used to group statistics.
+            unbuffered (bool): Whether the cursor is unbuffered, so the row count is not known yet.
+        """
+        error = None
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            rows = None if unbuffered or error else cursor.rowcount
+            statement = getattr(cursor, '_executed', None) or query
+            host = getattr(getattr(cursor, 'connection', None), 'host', None)
+            self.record(QueryEvent(statement_kind(query), table, latency, rows,
+                                   len(statement.encode('utf-8', 'replace')), statement, error, host))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Summarize everything recorded so far.
+
+        Returns:
+            Dict[str, Dict]: 'total' with the summary over all statements, and 'statements' with
+                a summary per "KIND table" key. Latencies are in seconds.
+        """
+        total = LatencyHistogram()
+        statements = {}
+        with self._lock:
+            for (kind, table), histogram in self._histograms.items():
+                statements[f"{kind} {table}" if table else kind] = histogram.summary()
+                total.buckets = [a + b for a, b in zip(total.buckets, histogram.buckets)]
+                total.count += histogram.count
+                total.errors += histogram.errors
+                total.total += histogram.total
+                total.max = max(total.max, histogram.max)
+                total.rows += histogram.rows
+                total.statement_bytes += histogram.statement_bytes
+        return {'total': total.summary(), 'statements': statements}
+
+    def reset(self) -> None:
+        """
+        Discard everything recorded so far. Listeners stay registered.
+        """
+        with self._lock:
+            self._histograms.clear()
@@ -0,0 +1,207 @@
+from typing import Callable, Dict, List, Optional, Union
+import itertools
+import threading
+import time
+import logging
+import pymysql
+from pymysql.constants import ER
+from storageservice.connectionpool import ConnectionPool
+
+
+class Replica:
+    """
+    A read replica endpoint with its connection pool and last known health.
+    """
+
+    def __init__(self, host: str, pool: ConnectionPool):
+        """
+        Initialize the Replica.
+
+        Args:
+            host (str): The hostname of the replica.
+            pool (ConnectionPool): The pool of connections to the replica.
+        """
+        self.host = host
+        self.pool = pool
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.checked_at = float('-inf')
+        self.check_lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """
+    Routes reads across read replicas, dropping unreachable or lagging replicas from rotation.
+
+    Replica health is checked on background threads, so a read never waits for a check.
+    """
+
+    def __init__(self, hosts: List[str], pool_factory: Callable[[str], ConnectionPool],
+                 max_lag: Optional[float] = None, check_interval: float = 5.0,
+                 strategy: str = 'round_robin'):
+        """
+        Initialize the ReplicaRouter.
+
+        Args:
+            hosts (List[str]): The hostnames of the read replicas.
+            pool_factory (Callable[[str], ConnectionPool]): Builds the connection pool for a host.
+            max_lag (Optional[float]): Seconds of replication lag above which a replica is taken
+                out of rotation, None to only check that replicas are reachable.
+            check_interval (float): Seconds between health and lag checks of each replica.
+            strategy (str): 'round_robin' to rotate through healthy replicas, or 'least_loaded'
+                to pick the one with the fewest connections checked out.
+        """
+        if strategy not in ('round_robin', 'least_loaded'):
+            raise ValueError(f"Unknown replica routing strategy: {strategy}")
+        self.replicas = [Replica(host, pool_factory(host)) for host in hosts]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.strategy = strategy
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._counter = itertools.count()
+        self._lag_denied = False
+        for replica in self.replicas:
+            self._schedule_check(replica)
+
+    def choose(self) -> Optional[ConnectionPool]:
+        """
+        Pick the replica pool for the next read, starting a background check of any replica
+        whose check is due.
+
+        Returns:
+            Optional[ConnectionPool]: The chosen replica's pool, or None if no replica is healthy.
+        """
+        now = time.monotonic()
+        for replica in self.replicas:
+            if now - replica.checked_at >= self.check_interval:
+                self._schedule_check(replica)
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.strategy == 'least_loaded':
+            return min(healthy, key=lambda replica: replica.pool.size - replica.pool.idle).pool
+        return healthy[next(self._counter) % len(healthy)].pool
+
+    def mark_down(self, pool: ConnectionPool, error: Exception) -> None:
+        """
+        Take a replica out of rotation until its next health check, e.g. after a failed checkout.
+
+        Args:
+            pool (ConnectionPool): The pool of the failing replica.
+            error (Exception): The error that was raised.
+        """
+        for replica in self.replicas:
+            if replica.pool is pool:
+                replica.healthy = False
+                replica.checked_at = time.monotonic()
+                self.logger.warning(
+                    f"Read replica {replica.host} taken out of rotation: {error}")
+
+    def refresh(self) -> None:
+        """
+        Check every replica now on the calling thread, waiting for checks already running.
+        """
+        for replica in self.replicas:
+            replica.check_lock.acquire()
+            self._check(replica)
+
+    def status(self) -> List[Dict[str, Union[str, bool, float, None]]]:
+        """
+        Report the last known state of each replica.
+
+        Returns:
+            List[Dict[str, Union[str, bool, float, None]]]: The host, health and replication lag
+                in seconds of each replica.
+        """
+        return [{'host': replica.host, 'healthy': replica.healthy, 'lag': replica.lag}
+                for replica in self.replicas]
+
+    def close(self) -> None:
+        """
+        Close the connection pools of all replicas.
+        """
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def _schedule_check(self, replica: Replica) -> None:
+        """
+        Check a replica on a background thread, unless a check of it is already running.
+
+        A check opening a connection to a dead replica can take the full connect timeout, so it
+        must not run on a thread serving a read.
+        """
+        if not replica.check_lock.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(target=self._check, args=(replica,),
+                             name=f"replica-check-{replica.host}", daemon=True).start()
+        except Exception:
+            replica.check_lock.release()
+            raise
+
+    def _check(self, replica: Replica) -> None:
+        """
+        Check that a replica is reachable and, if max_lag is set, that it is not lagging.
+
+        The caller must hold the replica's check_lock, which is released when the check ends.
+        """
+        try:
+            lag_known = True
+            with replica.pool.connection(timeout=1.0) as connection:
+                try:
+                    lag = self._replication_lag(connection) if self.max_lag is not None else None
+                except pymysql.err.OperationalError as e:
+                    if not e.args or e.args[0] != ER.SPECIFIC_ACCESS_DENIED_ERROR:
+                        raise
+                    self._report_lag_denied(e)
+                    lag, lag_known = None, False
+            if self.max_lag is None or not lag_known:
+                healthy = True
+            else:
+                healthy = lag is not None and lag <= self.max_lag
+            if healthy != replica.healthy:
+                self.logger.info(
+                    f"Read replica {replica.host} {'back in' if healthy else 'taken out of'} "
+                    f"rotation (lag: {lag})")
+            replica.healthy = healthy
+            replica.lag = lag
+        except Exception as e:
+            if replica.healthy:
+                self.logger.warning(
+                    f"Read replica {replica.host} taken out of rotation: {e}")
+            replica.healthy = False
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.check_lock.release()
+
+    def _report_lag_denied(self, error: Exception) -> None:
+        """
+        Log once that replication lag cannot be read, so replicas stay in rotation with unknown lag.
+        """
+        if self._lag_denied:
+            return
+        self._lag_denied = True
+        self.logger.error(
+            f"Cannot read replication lag, max_lag is not enforced; grant REPLICATION CLIENT "
+            f"to the database user: {error}")
+
+    @staticmethod
+    def _replication_lag(connection: pymysql.connections.Connection) -> Optional[float]:
+        """
+        Read a replica's replication lag.
+
+        Returns:
+            Optional[float]: The lag in seconds, 0.0 for servers without binlog replication
+                status (such as Aurora readers), or None if replication is stopped.
+        """
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except pymysql.err.ProgrammingError:
+                # Servers before MySQL 8.0.22 only know the older statement.
+                cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+        if not status:
+            return 0.0
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return None if lag is None else float(lag)
@@ -0,0 +1,158 @@
+from typing import Any, Dict, Hashable, Tuple
+from collections import OrderedDict
+import sys
+import threading
+import time
+
+
+class ResultCache:
+    """
+    A thread-safe LRU cache of query results with a TTL, a memory cap and per-table invalidation.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the ResultCache.
+
+        Args:
+            max_entries (int): The maximum number of cached results.
+            ttl (float): Seconds a cached result stays valid.
+            max_bytes (int): The approximate memory cap for all cached results together.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (table, expires, size, value), least recently used first.
+        self._entries: OrderedDict = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        # Bumped by clear(), which invalidates tables that have no cached entry yet too.
+        self._epoch = 0
+        self._bytes = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key (Hashable): The key the result was stored under.
+
+        Returns:
+            Tuple[bool, Any]: Whether there was a valid cached result, and the result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[3]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def generation(self, table: str) -> Tuple[int, int]:
+        """
+        Get the invalidation generation of a table, to be passed to put() after the query runs.
+
+        Args:
+            table (str): The name of the table.
+
+        Returns:
+            Tuple[int, int]: A token that changes every time the table is invalidated or the
+                whole cache is cleared.
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(table, 0)
+
+    def put(self, key: Hashable, table: str, value: Any, generation: Tuple[int, int]) -> bool:
+        """
+        Store a result unless the table was invalidated while it was being read.
+
+        Args:
+            key (Hashable): The key to store the result under.
+            table (str): The table the result was read from.
+            value (Any): The result.
+            generation (Tuple[int, int]): The table's generation() from before the query ran.
+
+        Returns:
+            bool: True if the result was cached.
+        """
+        size = self._estimate_size(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return False
+        with self._lock:
+            if (self._epoch, self._generations.get(table, 0)) != generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (table, time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate_table(self, table: str) -> None:
+        """
+        Drop every cached result read from a table.
+
+        Args:
+            table (str): The name of the table that was written to.
+        """
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[0] == table]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """
+        Drop every cached result.
+        """
+        with self._lock:
+            # Reads still in flight for any table, cached or not, must not store their results.
+            self._epoch += 1
+            self._generations.clear()
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the cache counters.
+
+        Returns:
+            Dict[str, int]: The hits, misses, evictions, number of entries and approximate bytes.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Remove an entry. Must be called with the lock held.
+        """
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """
+        Estimate the memory used by a result made of lists, tuples and dictionaries of scalars.
+        """
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            for item in value.values():
+                size += sys.getsizeof(item)
+        elif isinstance(value, (list, tuple)):
+            for row in value:
+                size += ResultCache._estimate_size(row) if isinstance(row, (dict, list, tuple)) \
+                    else sys.getsizeof(row)
+        return size
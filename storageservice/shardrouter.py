@@ -0,0 +1,246 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import configparser
+import zlib
+import time
+import logging
+from storageservice.awsmysqllib import AWSMySQLLib
+
+# Seconds between checks for fan-out calls that were waiting for a free thread and have started.
+_QUEUED_POLL_INTERVAL = 0.05
+
+
+class ShardRouter:
+    """
+    Routes shard keys to AWSMySQLLib instances and runs calls across shards concurrently.
+    """
+
+    def __init__(self, shards: Dict[str, AWSMySQLLib], timeout: Optional[float] = 30.0,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize the ShardRouter.
+
+        Args:
+            shards (Dict[str, AWSMySQLLib]): The instance of each shard, by shard name. Shard keys
+                are mapped over the names in sorted order, so adding a shard remaps keys.
+            timeout (Optional[float]): Default seconds fan_out() waits for each shard, counted
+                from when the shard's call starts, None to wait as long as needed.
+            max_workers (Optional[int]): Threads that run shard calls, defaults to one per shard.
+        """
+        if not shards:
+            raise ValueError("A ShardRouter needs at least one shard")
+        self.shards = dict(shards)
+        self.timeout = timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._names = sorted(self.shards)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or len(self.shards),
+                                            thread_name_prefix='shard')
+
+    @classmethod
+    def init_from_file(cls, file_name: str, sections: Optional[Sequence[str]] = None,
+                       prefix: str = 'SHARD_', **kwargs) -> Union[None, 'ShardRouter']:
+        """
+        Initialize a ShardRouter from a configuration file with one AWSMySQLLib section per shard.
+
+        Args:
+            file_name (str): The name of the configuration file.
+            sections (Optional[Sequence[str]]): The sections to read, defaults to every section
+                whose name starts with prefix.
+            prefix (str): The section name prefix of shards, stripped to give the shard name.
+            **kwargs: Passed on to the ShardRouter constructor.
+
+        Returns:
+            Union[None, 'ShardRouter']: A ShardRouter if every shard section could be read, None otherwise.
+        """
+        config = configparser.ConfigParser()
+        config.read(file_name)
+        if sections is None:
+            sections = [section for section in config.sections() if section.startswith(prefix)]
+        shards = {}
+        for section in sections:
+            if section not in config:
+                logging.getLogger(cls.__name__).error(f"Shard section '{section}' not found in {file_name}")
+                return None
+            shard = AWSMySQLLib.init_from_file(file_name, section)
+            if shard is None:
+                return None
+            shards[section[len(prefix):] if section.startswith(prefix) else section] = shard
+        if not shards:
+            logging.getLogger(cls.__name__).error(f"No shard sections found in {file_name}")
+            return None
+        return cls(shards, **kwargs)
+
+    def __enter__(self) -> 'ShardRouter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def shard_for(self, key: Any) -> str:
+        """
+        Map a shard key to the name of its shard with a CRC32 hash of the key.
+
+        Args:
+            key (Any): The shard key, such as a tenant ID. It is hashed as its str().
+
+        Returns:
+            str: The shard name.
+        """
+        return self._names[zlib.crc32(str(key).encode('utf-8')) % len(self._names)]
+
+    def get(self, key: Any) -> AWSMySQLLib:
+        """
+        Get the instance of the shard a key maps to.
+
+        Args:
+            key (Any): The shard key.
+
+        Returns:
+            AWSMySQLLib: The shard's instance.
+        """
+        return self.shards[self.shard_for(key)]
+
+    def connect(self) -> Dict[str, bool]:
+        """
+        Connect every shard to its database concurrently.
+
+        Returns:
+            Dict[str, bool]: Whether each shard connected, by shard name.
+        """
+        return self.fan_out(lambda shard: shard.connect_to_database())
+
+    def fan_out(self, query_or_method: Union[str, Callable[..., Any]], *args: Any,
+                shards: Optional[Sequence[str]] = None, keys: Optional[Sequence[Any]] = None,
+                timeout: Optional[float] = None, merge: bool = False,
+                **kwargs: Any) -> Union[Dict[str, Any], List[Any]]:
+        """
+        Run a statement or call on many shards concurrently and collect the results.
+
+        Args:
+            query_or_method (Union[str, Callable[..., Any]]): The name of an AWSMySQLLib method,
+                such as 'list_entries_in_table', a callable taking the shard's instance as its
+                first argument, or an SQL statement run with execute_query().
+            *args (Any): Positional arguments for the method or callable, or the statement parameters.
+            shards (Optional[Sequence[str]]): The shard names to run on, defaults to all shards.
+            keys (Optional[Sequence[Any]]): Shard keys whose shards to run on, instead of shards.
+            timeout (Optional[float]): Seconds to wait for each shard, counted from when its call
+                starts, defaults to the router timeout.
+            merge (bool): Concatenate the list results of all shards into one list instead of
+                returning them per shard.
+            **kwargs (Any): Keyword arguments for the method or callable.
+
+        Returns:
+            Union[Dict[str, Any], List[Any]]: The result of each shard by shard name, None for a
+                shard that failed or timed out, or the concatenated rows when merge is set.
+        """
+        results = dict(self.iter_fan_out(query_or_method, *args, shards=shards, keys=keys,
+                                         timeout=timeout, **kwargs))
+        if not merge:
+            return results
+        merged = []
+        for name in self._names:
+            if isinstance(results.get(name), list):
+                merged.extend(results[name])
+        return merged
+
+    def iter_fan_out(self, query_or_method: Union[str, Callable[..., Any]], *args: Any,
+                     shards: Optional[Sequence[str]] = None, keys: Optional[Sequence[Any]] = None,
+                     timeout: Optional[float] = None, **kwargs: Any) -> Iterator[Tuple[str, Any]]:
+        """
+        Run a statement or call on many shards concurrently, yielding each result as it completes.
+
+        A shard that raises or does not finish within the timeout is logged and yielded with a
+        None result. Each shard's timeout starts when its call starts, so calls waiting for a
+        free thread are not charged for the wait. A timed-out call keeps running in the
+        background until the shard returns, and holds one of the router's threads meanwhile.
+
+        Args:
+            query_or_method (Union[str, Callable[..., Any]]): As for fan_out().
+            *args (Any): As for fan_out().
+            shards (Optional[Sequence[str]]): The shard names to run on, defaults to all shards.
+            keys (Optional[Sequence[Any]]): Shard keys whose shards to run on, instead of shards.
+            timeout (Optional[float]): Seconds to wait for each shard, counted from when its call
+                starts, defaults to the router timeout.
+            **kwargs (Any): As for fan_out().
+
+        Yields:
+            Tuple[str, Any]: The shard name and its result, fastest shard first.
+        """
+        names = self._select(shards, keys)
+        call = self._resolve_call(query_or_method, args, kwargs)
+        timeout = self.timeout if timeout is None else timeout
+        # When each call started; a shard's timeout runs from there, not from submission.
+        started: Dict[str, float] = {}
+
+        def run(name: str) -> Any:
+            started[name] = time.monotonic()
+            return call(self.shards[name])
+
+        futures = {self._executor.submit(run, name): name for name in names}
+        pending = set(futures)
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                now = time.monotonic()
+                deadlines = [started[futures[future]] + timeout for future in pending
+                             if futures[future] in started]
+                wait_for = max(0.0, min(deadlines) - now) if deadlines else None
+                if len(deadlines) < len(pending):
+                    # Calls still queued for a thread get their deadline once they start.
+                    wait_for = _QUEUED_POLL_INTERVAL if wait_for is None else min(wait_for, _QUEUED_POLL_INTERVAL)
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    yield name, future.result()
+                except Exception as e:
+                    self.logger.exception(f"Error running on shard '{name}': {e}")
+                    yield name, None
+            if timeout is None:
+                continue
+            now = time.monotonic()
+            for future in [future for future in pending if futures[future] in started
+                           and now - started[futures[future]] >= timeout and not future.done()]:
+                pending.discard(future)
+                self.logger.error(f"Shard '{futures[future]}' did not finish within {timeout} seconds.")
+                yield futures[future], None
+
+    def close(self) -> None:
+        """
+        Stop the router's threads and close the connections of every shard.
+        """
+        self._executor.shutdown(wait=False)
+        for shard in self.shards.values():
+            shard.close_connection()
+
+    def _select(self, shards: Optional[Sequence[str]], keys: Optional[Sequence[Any]]) -> List[str]:
+        """
+        Resolve the shards a fan-out runs on, without duplicates and in shard order.
+        """
+        if keys is not None:
+            selected = {self.shard_for(key) for key in keys}
+        elif shards is not None:
+            unknown = set(shards) - set(self.shards)
+            if unknown:
+                raise KeyError(f"Unknown shards: {', '.join(sorted(unknown))}")
+            selected = set(shards)
+        else:
+            selected = self.shards
+        return [name for name in self._names if name in selected]
+
+    @staticmethod
+    def _resolve_call(query_or_method: Union[str, Callable[..., Any]], args: Tuple[Any, ...],
+                      kwargs: Dict[str, Any]) -> Callable[[AWSMySQLLib], Any]:
+        """
+        Turn the fan_out() target into a function of a shard's instance.
+        """
+        if callable(query_or_method):
+            return lambda shard: query_or_method(shard, *args, **kwargs)
+        if query_or_method.startswith('_'):
+            raise AttributeError(f"AWSMySQLLib has no public method '{query_or_method}'")
+        # One-word statements such as 'COMMIT' are identifiers too, so only known methods are called.
+        if callable(getattr(AWSMySQLLib, query_or_method, None)):
+            return lambda shard: getattr(shard, query_or_method)(*args, **kwargs)
+        params = args[0] if len(args) == 1 and isinstance(args[0], (list, tuple, dict)) else (args or None)
+        return lambda shard: shard.execute_query(query_or_method, params, **kwargs)
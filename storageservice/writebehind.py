@@ -0,0 +1,201 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import deque
+import threading
+import time
+import logging
+
+
+class WriteBehindBuffer:
+    """
+    A bounded in-memory queue of records written to the database in batches by a background thread.
+    """
+
+    def __init__(self, write_batch: Callable[[str, List[Dict[str, Any]]], None], max_size: int = 10000,
+                 batch_size: int = 1000, flush_interval: float = 1.0,
+                 on_error: Optional[Callable[[str, List[Dict[str, Any]], Exception], None]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the WriteBehindBuffer and start its flush thread.
+
+        Args:
+            write_batch (Callable[[str, List[dict]], None]): Writes a list of records with the same
+                columns to a table, raising if they could not be written.
+            max_size (int): The maximum number of queued records; put() blocks when it is reached.
+            batch_size (int): The number of queued records that triggers a flush.
+            flush_interval (float): Seconds after which a record is flushed even if the batch is
+                not full.
+            on_error (Optional[Callable[[str, List[dict], Exception], None]]): Called with the
+                table, the records and the error when a batch fails. The records are dropped
+                unless the callback queues them again, which it must do with a put() timeout
+                since it runs on the flush thread.
+            logger (Optional[logging.Logger]): The logger for flushes and errors.
+        """
+        if max_size < 1 or batch_size < 1:
+            raise ValueError(
+                f"Invalid write-behind sizes: max_size={max_size}, batch_size={batch_size}")
+        self.write_batch = write_batch
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._condition = threading.Condition()
+        # Queued records as (table, record, queued_at), oldest on the left.
+        self._items: deque = deque()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """
+        int: The number of records queued or being written.
+        """
+        with self._condition:
+            return len(self._items) + self._in_flight
+
+    def put(self, table: str, record: Dict[str, Any], timeout: Optional[float] = None) -> bool:
+        """
+        Queue a record, waiting for space while the buffer is full.
+
+        Args:
+            table (str): The table to write the record to.
+            record (dict): The column names and values of the record.
+            timeout (Optional[float]): Seconds to wait for space, None to wait as long as needed.
+
+        Returns:
+            bool: True if the record was queued, False if the buffer stayed full or is closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while len(self._items) >= self.max_size and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            if self._closed:
+                return False
+            self._items.append((table, record, time.monotonic()))
+            if len(self._items) >= self.batch_size or len(self._items) == 1:
+                self._condition.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write all queued records now and wait until they have been written or have failed.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, None to wait as long as needed.
+
+        Returns:
+            bool: True if the buffer was drained, False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._items or self._in_flight:
+                if not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Refuse new records, write the queued ones and stop the flush thread.
+
+        Records still queued when the timeout expires are not written; they are passed to
+        on_error, or logged as dropped. The batch being written at that time is left to finish.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the queued records to be written,
+                None to wait as long as needed.
+
+        Returns:
+            bool: True if every queued record was written or handed to on_error.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            return True
+        with self._condition:
+            batch = list(self._items)
+            self._items.clear()
+            self._condition.notify_all()
+        error = TimeoutError(f"Write-behind buffer was not drained within {timeout} seconds")
+        for (table, _), records in self._group(batch).items():
+            self._report(table, records, error)
+        return False
+
+    def _run(self) -> None:
+        """
+        Flush batches until the buffer is closed and empty.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if self._items:
+                        due = self._items[0][2] + self.flush_interval
+                        if (len(self._items) >= self.batch_size or self._flush_requested
+                                or self._closed or time.monotonic() >= due):
+                            break
+                        self._condition.wait(due - time.monotonic())
+                    elif self._closed:
+                        return
+                    else:
+                        self._flush_requested = False
+                        self._condition.wait()
+                batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+                self._in_flight = len(batch)
+                # Wake producers waiting for space.
+                self._condition.notify_all()
+            try:
+                for (table, _), records in self._group(batch).items():
+                    self._write(table, records)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    if not self._items:
+                        self._flush_requested = False
+                    self._condition.notify_all()
+
+    @staticmethod
+    def _group(batch: List[Tuple[str, Dict[str, Any], float]]) -> Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]]:
+        """
+        Group queued records by table and columns, keeping their order within each group.
+        """
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for table, record, _ in batch:
+            groups.setdefault((table, tuple(record)), []).append(record)
+        return groups
+
+    def _write(self, table: str, records: List[Dict[str, Any]]) -> None:
+        """
+        Write one group of records, passing a failure to on_error.
+        """
+        try:
+            self.write_batch(table, records)
+            self.logger.debug(f"Flushed {len(records)} buffered records to '{table}'.")
+        except Exception as e:
+            self._report(table, records, e)
+
+    def _report(self, table: str, records: List[Dict[str, Any]], error: Exception) -> None:
+        """
+        Pass records that were not written to on_error, or log them as dropped.
+        """
+        if self.on_error is None:
+            self.logger.error(
+                f"Dropped {len(records)} buffered records for '{table}': {error}")
+            return
+        try:
+            self.on_error(table, records, error)
+        except Exception as callback_error:
+            self.logger.exception(
+                f"Error in write-behind error callback: {callback_error}")
@@ -0,0 +1,226 @@
+"""
+Benchmarks for AWSMySQLLib against a local mysqld or MariaDB server.
+
+The file name does not match test_*.py, so pytest does not collect it. The configuration file
+uses the same [AWS_MYSQL_CONFIG] section as the tests; the benchmark creates its own database
+and drops it again when done. Results are written as JSON so runs can be compared across
+releases.
+"""
+from typing import Any, Callable, Dict, Tuple
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+import pymysql
+from storageservice import awsmysqllib
+
+# ? python bench_awsmysqllib.py --config ./benchmark.cfg --rows 100000 --output bench.json
+
+
+TABLE_NAME = 'bench_table'
+COLUMNS = {'id': 'INT PRIMARY KEY', 'name': 'VARCHAR(64)', 'age': 'INT', 'score': 'DOUBLE'}
+
+
+def timed(func: Callable[[], Any]) -> Tuple[float, Any]:
+    """
+    Helper function to time a call.
+
+    Returns:
+        Tuple[float, Any]: The seconds taken and the result of the call.
+    """
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def traced(func: Callable[[], Any]) -> Dict[str, float]:
+    """
+    Helper function to time a call and measure the peak memory it allocates.
+
+    Returns:
+        Dict[str, float]: The seconds taken and the peak traced memory in bytes.
+    """
+    tracemalloc.start()
+    try:
+        seconds, _ = timed(func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'peak_bytes': peak}
+
+
+def make_rows(count: int, offset: int = 0):
+    """
+    Helper function to generate benchmark records.
+    """
+    return ({'id': offset + i, 'name': f"name {offset + i}", 'age': i % 100, 'score': i / 7.0}
+            for i in range(count))
+
+
+def reset_table(aws_db: awsmysqllib.AWSMySQLLib) -> None:
+    """
+    Helper function to recreate the empty benchmark table.
+    """
+    aws_db.delete_table(TABLE_NAME)
+    if not aws_db.create_table(TABLE_NAME, COLUMNS):
+        raise RuntimeError(f"Failed to create '{TABLE_NAME}'")
+
+
+def bench_inserts(aws_db: awsmysqllib.AWSMySQLLib, rows: int, single_rows: int) -> Dict[str, Any]:
+    """
+    Compare insert_record() one row at a time with insert_records() and bulk_load().
+    """
+    results = {}
+    reset_table(aws_db)
+    seconds, _ = timed(lambda: [aws_db.insert_record(TABLE_NAME, row) for row in make_rows(single_rows)])
+    results['insert_record'] = {'rows': single_rows, 'seconds': seconds, 'rows_per_second': single_rows / seconds}
+
+    reset_table(aws_db)
+    seconds, inserted = timed(lambda: aws_db.insert_records(TABLE_NAME, make_rows(rows)))
+    results['insert_records'] = {'rows': inserted, 'seconds': seconds, 'rows_per_second': rows / seconds}
+
+    if aws_db.local_infile:
+        reset_table(aws_db)
+        seconds, loaded = timed(lambda: aws_db.bulk_load(TABLE_NAME, make_rows(rows)))
+        results['bulk_load'] = {'rows': loaded['rows'], 'seconds': seconds, 'rows_per_second': rows / seconds}
+    return results
+
+
+def bench_scans(aws_db: awsmysqllib.AWSMySQLLib) -> Dict[str, Any]:
+    """
+    Compare the latency and peak memory of reading the whole benchmark table.
+    """
+    def stream():
+        for _ in aws_db.iter_entries(TABLE_NAME):
+            pass
+
+    def pages():
+        for _ in aws_db.iter_pages(TABLE_NAME, page_size=1000):
+            pass
+
+    return {
+        'list_entries_in_table': traced(lambda: aws_db.list_entries_in_table(TABLE_NAME)),
+        'iter_entries': traced(stream),
+        'iter_pages': traced(pages),
+        'fetch_columns': traced(lambda: aws_db.fetch_columns(TABLE_NAME)),
+    }
+
+
+def bench_metadata(aws_db: awsmysqllib.AWSMySQLLib, repeat: int) -> Dict[str, Any]:
+    """
+    Time the introspection methods, averaged over repeat calls.
+    """
+    def cold_listing():
+        aws_db.invalidate_schema_cache()
+        return aws_db.list_tables_with_columns()
+
+    calls = {
+        'list_tables_with_columns_cold': cold_listing,
+        'list_tables_with_columns_cached': aws_db.list_tables_with_columns,
+        'get_database_info': aws_db.get_database_info,
+        'get_database_info_with_sizes': lambda: aws_db.get_database_info(include_sizes=True),
+        'check_database_exists': lambda: aws_db.check_database_exists(aws_db.database),
+    }
+    results = {}
+    for name, call in calls.items():
+        seconds, _ = timed(lambda: [call() for _ in range(repeat)])
+        results[name] = {'calls': repeat, 'mean_seconds': seconds / repeat}
+    return results
+
+
+def bench_pool(aws_db: awsmysqllib.AWSMySQLLib, repeat: int) -> Dict[str, Any]:
+    """
+    Compare the cost of a pool checkout, with and without the liveness ping, to a new connection.
+    """
+    def checkouts():
+        for _ in range(repeat):
+            with aws_db.pool.connection():
+                pass
+
+    def connects():
+        for _ in range(max(1, repeat // 50)):
+            aws_db._create_connection(aws_db.database).close()
+
+    results = {}
+    # Ping on every checkout, even on a pool configured to skip recently used connections.
+    ping_interval, aws_db.pool.ping_interval = aws_db.pool.ping_interval, 0
+    try:
+        seconds, _ = timed(checkouts)
+    finally:
+        aws_db.pool.ping_interval = ping_interval
+    results['checkout_with_ping'] = {'calls': repeat, 'mean_seconds': seconds / repeat}
+    aws_db.pool.ping_on_checkout = False
+    try:
+        seconds, _ = timed(checkouts)
+    finally:
+        aws_db.pool.ping_on_checkout = True
+    results['checkout_without_ping'] = {'calls': repeat, 'mean_seconds': seconds / repeat}
+    calls = max(1, repeat // 50)
+    seconds, _ = timed(connects)
+    results['new_connection'] = {'calls': calls, 'mean_seconds': seconds / calls}
+    return results
+
+
+def main() -> int:
+    """
+    Run the benchmarks and write the results as JSON.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='./benchmark.cfg', help="Configuration file of the local server")
+    parser.add_argument('--database', default='storageservice_bench', help="Database created for the benchmark")
+    parser.add_argument('--rows', type=int, default=100000, help="Rows inserted and scanned")
+    parser.add_argument('--single-rows', type=int, default=1000, help="Rows inserted one at a time")
+    parser.add_argument('--repeat', type=int, default=200, help="Calls per metadata and pool measurement")
+    parser.add_argument('--output', help="File to write the JSON results to, stdout if omitted")
+    args = parser.parse_args()
+
+    logging.getLogger('AWSMySQLLib').setLevel(logging.WARNING)
+    aws_db = awsmysqllib.AWSMySQLLib.init_from_file(args.config)
+    if aws_db is None or not aws_db.connect_to_rds_host():
+        print(f"Cannot connect with the settings in {args.config}", file=sys.stderr)
+        return 1
+    aws_db.database = args.database
+    if not aws_db.check_database_exists(args.database) and not aws_db.create_database(args.database):
+        print(f"Cannot create database {args.database}", file=sys.stderr)
+        return 1
+    try:
+        if not aws_db.connect_to_database():
+            print(f"Cannot connect to database {args.database}", file=sys.stderr)
+            return 1
+        with aws_db.pool.connection() as connection:
+            server_version = connection.get_server_info()
+        results = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'pymysql': pymysql.__version__,
+                'server': server_version,
+                'rows': args.rows,
+            },
+            'inserts': bench_inserts(aws_db, args.rows, args.single_rows),
+            'scans': bench_scans(aws_db),
+            'metadata': bench_metadata(aws_db, args.repeat),
+            'pool': bench_pool(aws_db, args.repeat),
+        }
+        results['query_stats'] = aws_db.stats()['total']
+    finally:
+        aws_db.remove_database(args.database)
+        aws_db.close_connection()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import pytest
+
+# ? Shared test doubles, used as e.g. ConnectionPool(FakeConnection).
+
+
+class FakeCursor:
+    """
+    Stand-in for a pymysql cursor that records statements and returns its connection's row.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.connection.calls.append(query)
+        if self.connection.error is not None:
+            raise self.connection.error
+        self.rowcount = 1
+        return 1
+
+    def fetchone(self):
+        return self.connection.row
+
+
+class FakeConnection:
+    """
+    Stand-in for a pymysql connection in autocommit mode that records pings, statements and
+    transaction calls, and can be made to fail its ping, statements or commit.
+    """
+
+    def __init__(self):
+        self.open = True
+        self.encoding = 'utf8'
+        self.alive = True
+        self.fail_commit = False
+        self.pings = 0
+        self.row = None
+        self.error = None
+        self.calls = []
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+    def escape(self, value):
+        return repr(value)
+
+    def get_autocommit(self):
+        return True
+
+    def begin(self):
+        self.calls.append('begin')
+
+    def commit(self):
+        self.calls.append('commit')
+        if self.fail_commit:
+            raise ConnectionResetError("connection lost during commit")
+
+    def rollback(self):
+        self.calls.append('rollback')
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def pooled_aws_db():
+    """
+    Fixture to set up an AWSMySQLLib instance over a pool of fake connections.
+
+    Yields:
+        AWSMySQLLib: The instance, with a pool of at most two connections.
+    """
+    # Imported here, since importing the library reads the logging configuration.
+    from storageservice.awsmysqllib import AWSMySQLLib
+    from storageservice.connectionpool import ConnectionPool
+    aws_db = AWSMySQLLib('localhost', 'user', 'password', 'example', 3306)
+    aws_db.pool = ConnectionPool(FakeConnection, min_size=0, max_size=2, timeout=0.1)
+    aws_db._create_connection = lambda database, host=None: FakeConnection()
+    yield aws_db
+    aws_db.close_connection()
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from storageservice import asyncawsmysqllib
+
+# ? pytest -sv test_async_aws_db_connection.py
+
+pytest.importorskip("aiomysql")
+
+TABLE_NAME = 'example_async_table'
+AWS_RDS_CONFIG_FILE = './awsmysql.cfg'  # Change to your actual file path
+
+
+def run(coroutine):
+    """
+    Helper function to run a coroutine to completion.
+    """
+    return asyncio.run(coroutine)
+
+
+def test_async_insert_list_delete():
+    """
+    Test to create a table, insert, stream, update and delete records, and drop the table
+    through the asyncio client.
+    """
+    async def scenario():
+        async with asyncawsmysqllib.AsyncAWSMySQLLib.init_from_file(AWS_RDS_CONFIG_FILE) as aws_db:
+            assert await aws_db.connect_to_database(), "Connection to AWS MySQL RDS Database failed"
+            assert await aws_db.create_table(
+                TABLE_NAME, {'id': 'INT', 'name': 'VARCHAR(255)', 'age': 'INT'})
+            try:
+                assert await aws_db.insert_record(TABLE_NAME, {'id': 1, 'name': 'John', 'age': 40}) != -1
+                rows = ({'id': 100 + i, 'name': f"Name {i}", 'age': i} for i in range(50))
+                assert await aws_db.insert_records(TABLE_NAME, rows) == 50
+                assert await aws_db.update_record(TABLE_NAME, 1, {'age': 20})
+                entries = await aws_db.list_entries_in_table(TABLE_NAME)
+                assert len(entries) == 51
+                streamed = [entry async for entry in aws_db.iter_entries(TABLE_NAME, batch_size=8)]
+                assert len(streamed) == 51
+                assert await aws_db.delete_record(TABLE_NAME, 1)
+                assert aws_db.stats()['statements'][f"INSERT {TABLE_NAME}"]['rows'] == 51
+            finally:
+                assert await aws_db.delete_table(TABLE_NAME)
+
+    run(scenario())
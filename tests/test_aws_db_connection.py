@@ -1,5 +1,13 @@
+import gzip
+import json
+import threading
+from types import SimpleNamespace
 import pytest
+from conftest import FakeConnection
 from storageservice import awsmysqllib
+from storageservice.awsmysqllib import TransactionRollbackError
+from storageservice.connectionpool import ConnectionPool
+from storageservice.options import CacheOptions, PoolOptions, ReplicaOptions, WriteBehindOptions
 
 # ? pytest -sv test_aws_db_connection.py
 
@@ -69,6 +77,33 @@ def test_rds_host_connection(aws_rds_host):
             f"Name: {db_info.get('Owner')}, Owner: {db_info.get('Collation')}")
 
 
+def test_pooled_connection(aws_rds_host):
+    """
+    Test that a connection checked out of the pool reaches the server and goes back to the pool.
+
+    Args:
+        aws_rds_host (AWSMySQLLib): Fixture instance connected to the RDS host.
+    """
+    with aws_rds_host.pool.connection() as connection:
+        assert connection.get_server_info(), "Failed to read the server version"
+    assert aws_rds_host.pool.idle == aws_rds_host.pool.size
+
+
+def test_database_info_sizes(aws_rds_host):
+    """
+    Test to retrieve database information with table counts and sizes.
+
+    Args:
+        aws_rds_host (AWSMySQLLib): Fixture instance connected to the RDS host.
+    """
+    databases_info = aws_rds_host.get_database_info(include_sizes=True)
+    assert databases_info, "Failed to retrieve database information"
+    schema = next(db_info for db_info in databases_info
+                  if db_info['Name'] == 'information_schema')
+    assert schema['Tables'] > 0
+    assert {'CharacterSet', 'Collation', 'DataSize', 'IndexSize'} <= set(schema)
+
+
 def test_create_database(aws_rds_host):
     """
     Test to check if a database can be created if it doesn't already exist.
@@ -108,6 +143,28 @@ def test_can_reach_database(aws_database):
     ), "Connection to AWS MySQL RDS Database failed"
 
 
+def test_reconnect_reuses_pool(aws_rds_host):
+    """
+    Test that connecting to the database on an open connection switches databases instead of reconnecting.
+
+    Args:
+        aws_rds_host (AWSMySQLLib): Fixture instance connected to the RDS host.
+    """
+    pool = aws_rds_host.pool
+    assert aws_rds_host.connect_to_database()
+    assert aws_rds_host.pool is pool
+    assert aws_rds_host.list_tables_with_columns() is not None
+
+
+def test_context_manager_closes_connection():
+    """
+    Test that leaving a with-block closes the pooled connections.
+    """
+    with awsmysqllib.AWSMySQLLib.init_from_file(AWS_RDS_CONFIG_FILE) as aws_db:
+        assert aws_db.connect_to_database()
+    assert aws_db.pool is None
+
+
 def test_create_table(aws_database):
     """
     Test to check if a table can be created in the database.
@@ -120,6 +177,29 @@ def test_create_table(aws_database):
         TABLE_NAME, columns), f"Table Creation failed {TABLE_NAME}"
 
 
+def test_create_table_with_keys_and_indexes(aws_database):
+    """
+    Test to create a partitioned table with a primary key, then add and drop an index online.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    table = 'indexed_table'
+    columns = {'id': 'INT NOT NULL', 'email': 'VARCHAR(255)', 'age': 'INT'}
+    assert aws_database.create_table(table, columns, primary_key='id',
+                                     indexes=[{'columns': ['id', 'email'], 'unique': True}],
+                                     engine='InnoDB', table_row_format='DYNAMIC',
+                                     partition_by={'type': 'HASH', 'expression': 'id', 'partitions': 4})
+    try:
+        assert aws_database.create_index(table, 'age')
+        keys = aws_database.execute_query(f"SHOW INDEX FROM {table}")
+        assert {key['Key_name'] for key in keys} == {'PRIMARY', 'idx_indexed_table_id_email', 'idx_indexed_table_age'}
+        assert aws_database.drop_index(table, 'idx_indexed_table_age')
+        assert not aws_database.drop_index(table, 'idx_indexed_table_age')
+    finally:
+        aws_database.delete_table(table)
+
+
 def test_list_tables(aws_database):
     """
     Test to list all tables with columns in the database.
@@ -133,6 +213,39 @@ def test_list_tables(aws_database):
     assert result is not None, "Failed to list tables with columns"
 
 
+def test_init_from_file_reads_options(tmp_path):
+    """
+    Test that the optional settings of a configuration section are read into option objects.
+    """
+    config_file = tmp_path / 'awsmysql.cfg'
+    config_file.write_text(
+        "[AWS_MYSQL_CONFIG]\nhost = localhost\nuser = user\npassword = password\ndatabase = example\n"
+        "port = 3306\npool_max_size = 4\nreader_hosts = r1, r2\nresult_cache_size = 8\n"
+        "write_behind = true\nwrite_behind_drain_timeout = 5\n")
+    aws_db = awsmysqllib.AWSMySQLLib.init_from_file(str(config_file))
+    assert aws_db.pool_options == PoolOptions(max_size=4)
+    assert aws_db.replica_options == ReplicaOptions(hosts=('r1', 'r2'))
+    assert aws_db.cache_options == CacheOptions(result_size=8)
+    assert aws_db.write_behind_options == WriteBehindOptions(drain_timeout=5.0)
+    assert aws_db.result_cache is not None and aws_db.diagnostics is None
+
+
+def test_cached_schema_is_copied(pooled_aws_db):
+    """
+    Test that changing the list returned by list_tables_with_columns() does not change the cache.
+
+    Args:
+        pooled_aws_db (AWSMySQLLib): Fixture instance over a pool of fake connections.
+    """
+    columns = [{'column_name': 'id', 'data_type': 'int'}]
+    pooled_aws_db._schema_cache[(None, 'dict')] = (float('inf'), [{'table_name': 'example', 'columns': columns}])
+    tables = pooled_aws_db.list_tables_with_columns()
+    tables[0]['columns'][0]['data_type'] = 'bigint'
+    tables.append({'table_name': 'other', 'columns': []})
+    assert pooled_aws_db.list_tables_with_columns() == [
+        {'table_name': 'example', 'columns': [{'column_name': 'id', 'data_type': 'int'}]}]
+
+
 def print_entries(entries):
     """
     Helper function to print entries from a table.
@@ -180,6 +293,340 @@ def test_insert_update_delete_record(aws_database):
     print_entries(entries)
 
 
+def test_insert_records(aws_database):
+    """
+    Test to insert many records in batches from a generator.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    rows = ({'id': 1000 + i, 'name': f"Name {i}", 'age': i % 90} for i in range(2500))
+    assert aws_database.insert_records(
+        TABLE_NAME, rows, max_rows_per_batch=1000) == 2500, "Failed to insert records"
+
+
+def test_iter_entries(aws_database):
+    """
+    Test to stream entries from a table through a server-side cursor.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    entries = list(aws_database.iter_entries(
+        TABLE_NAME, columns=['id', 'age'], where={'age': 10}, batch_size=7))
+    assert entries, f"Failed to stream entries from '{TABLE_NAME}'"
+    assert all(entry['age'] == 10 for entry in entries)
+    assert set(entries[0]) == {'id', 'age'}
+
+
+def test_fetch_columns(aws_database):
+    """
+    Test to read a table into one buffer per column.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    result = aws_database.fetch_columns(TABLE_NAME, ['id', 'name', 'age'], where={'age': 10})
+    assert result is not None, f"Failed to fetch columns from '{TABLE_NAME}'"
+    assert set(result) == {'id', 'name', 'age'}
+    assert len(result['id']) == len(result['name']) == len(result['age']) > 0
+    assert all(age == 10 for age in result['age'])
+
+
+def test_export_table(aws_database, tmp_path):
+    """
+    Test to export a table to a CSV file and a gzip-compressed JSON Lines file.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+        tmp_path (Path): Pytest fixture with a temporary directory.
+    """
+    csv_path = tmp_path / 'export.csv'
+    count = aws_database.export_table(TABLE_NAME, str(csv_path), columns=['id', 'age'])
+    assert count > 0, f"Failed to export '{TABLE_NAME}'"
+    lines = csv_path.read_text().splitlines()
+    assert lines[0] == 'id,age'
+    assert len(lines) == count + 1
+
+    progress = []
+    jsonl_path = tmp_path / 'export.jsonl.gz'
+    assert aws_database.export_table(TABLE_NAME, str(jsonl_path), format='jsonl', compress='gzip',
+                                     progress=progress.append, progress_interval=10) == count
+    with gzip.open(jsonl_path, 'rt') as file:
+        assert sum(1 for line in file if json.loads(line)) == count
+    assert progress[-1] == count
+
+
+def test_bulk_load(aws_database):
+    """
+    Test to bulk load rows streamed from a generator with LOAD DATA LOCAL INFILE.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    if not aws_database.local_infile:
+        pytest.skip("local_infile is not enabled in the configuration file")
+    rows = ({'id': 3000 + i, 'name': 'Tab\tand\\slash' if i % 2 else None, 'age': i} for i in range(1000))
+    result = aws_database.bulk_load(TABLE_NAME, rows, relax_checks=True)
+    assert result is not None, f"Failed to bulk load into '{TABLE_NAME}'"
+    assert result['rows'] == 1000
+    entries = list(aws_database.iter_entries(TABLE_NAME, where="id BETWEEN 3000 AND 3001"))
+    assert [entry['name'] for entry in entries] == [None, 'Tab\tand\\slash']
+
+
+def test_bulk_load_csv_export_round_trip(aws_database, tmp_path):
+    """
+    Test that NULLs survive an export to CSV and a bulk load of the file.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+        tmp_path (Path): Pytest fixture with a temporary directory.
+    """
+    if not aws_database.local_infile:
+        pytest.skip("local_infile is not enabled in the configuration file")
+    csv_path = tmp_path / 'round_trip.csv'
+    assert aws_database.export_table(TABLE_NAME, str(csv_path), where="id BETWEEN 3000 AND 3009") == 10
+    assert aws_database.delete_records(TABLE_NAME, range(3000, 3010)) == 10
+    result = aws_database.bulk_load(TABLE_NAME, str(csv_path), format='csv', skip_lines=1)
+    assert result is not None and result['rows'] == 10
+    entries = list(aws_database.iter_entries(TABLE_NAME, where="id BETWEEN 3000 AND 3001"))
+    assert [entry['name'] for entry in entries] == [None, 'Tab\tand\\slash']
+
+
+def test_parallel_scan(aws_database):
+    """
+    Test to scan a table in parallel key ranges and merge the batches in the callback.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    ids = []
+    lock = threading.Lock()
+
+    def collect(rows):
+        with lock:
+            ids.extend(row['id'] for row in rows)
+
+    scanned = aws_database.parallel_scan(TABLE_NAME, collect, workers=3, columns=['id'], batch_size=5)
+    assert scanned > 0, f"Failed to scan '{TABLE_NAME}'"
+    assert sorted(ids) == sorted(entry['id'] for entry in aws_database.iter_entries(TABLE_NAME, columns=['id']))
+
+
+def test_iter_pages(aws_database):
+    """
+    Test to page through a table with keyset pagination and resume from a token.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    pages = list(aws_database.iter_pages(TABLE_NAME, page_size=3, columns=['name']))
+    ids = [entry['id'] for rows, token in pages for entry in rows]
+    assert ids == sorted(entry['id'] for entry in aws_database.iter_entries(TABLE_NAME, columns=['id']))
+    assert pages[-1][1] is None
+    if len(pages) > 1:
+        rows, token = next(aws_database.iter_pages(TABLE_NAME, page_size=3, after=pages[0][1]))
+        assert rows == list(aws_database.iter_pages(TABLE_NAME, page_size=3))[1][0]
+
+
+def test_tuple_row_format(aws_database):
+    """
+    Test that tuple rows hold the same values as dictionary rows, with attribute and index access.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    dict_rows = aws_database.list_entries_in_table(TABLE_NAME)
+    tuple_rows = aws_database.list_entries_in_table(TABLE_NAME, row_format='tuple')
+    assert [row._asdict() for row in tuple_rows] == dict_rows
+    assert tuple_rows[0].id == tuple_rows[0][0] == dict_rows[0]['id']
+    assert type(tuple_rows[0]) is type(tuple_rows[-1])
+    streamed = next(aws_database.iter_entries(TABLE_NAME, row_format='tuple'))
+    assert streamed._fields == tuple_rows[0]._fields
+    tables = aws_database.list_tables_with_columns(row_format='tuple')
+    assert tables[0]['columns'][0].column_name
+
+
+def test_upsert_records(aws_database):
+    """
+    Test that upserting inserts new keys, updates changed rows and counts unchanged ones.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    rows = [{'id': 700 + i, 'name': f"Upsert {i}", 'age': i} for i in range(3)]
+    assert aws_database.upsert_records(TABLE_NAME, rows, ['id']) == {'inserted': 3, 'updated': 0, 'unchanged': 0}
+    rows[0]['age'] = 99
+    counts = aws_database.upsert_records(TABLE_NAME, rows + [{'id': 703, 'name': 'Upsert 3', 'age': 3}], ['id'])
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 2}
+    entries = list(aws_database.iter_entries(TABLE_NAME, where={'id': 700}))
+    assert entries[0]['age'] == 99
+    assert aws_database.delete_records(TABLE_NAME, range(700, 704)) == 4
+
+
+def upsert_cursor(message=None):
+    """
+    Helper function to build a stand-in for a cursor after an upsert, holding the server's info message.
+    """
+    return SimpleNamespace(_result=SimpleNamespace(message=message))
+
+
+def test_upsert_counts_from_info_message():
+    """
+    Test that Duplicates counts only changed rows, so unchanged duplicates are not reported as inserted.
+    """
+    # 1 new row, 1 changed row and 2 rows whose values were already current.
+    cursor = upsert_cursor(b"Records: 4  Duplicates: 1  Warnings: 0")
+    assert awsmysqllib.AWSMySQLLib._upsert_counts(cursor, 4, 3) == {'inserted': 1, 'updated': 1, 'unchanged': 2}
+    # With no update columns, existing rows are counted as unchanged.
+    cursor = upsert_cursor(b"Records: 3  Duplicates: 0  Warnings: 0")
+    assert awsmysqllib.AWSMySQLLib._upsert_counts(cursor, 3, 1) == {'inserted': 1, 'updated': 0, 'unchanged': 2}
+
+
+def test_single_row_upsert_counts_without_info_message():
+    """
+    Test that a single-row statement, which has no info message, is split from its affected rows.
+    """
+    counts = awsmysqllib.AWSMySQLLib._upsert_counts
+    assert counts(upsert_cursor(), 1, 1) == {'inserted': 1, 'updated': 0, 'unchanged': 0}
+    assert counts(upsert_cursor(), 1, 2) == {'inserted': 0, 'updated': 1, 'unchanged': 0}
+    assert counts(upsert_cursor(), 1, 0) == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+
+
+def test_write_behind_insert_record():
+    """
+    Test that write-behind inserts are queued, written by flush() and drained on close.
+    """
+    aws_db = awsmysqllib.AWSMySQLLib.init_from_file(AWS_RDS_CONFIG_FILE)
+    aws_db.write_behind_options = WriteBehindOptions(interval=60)
+    assert aws_db.connect_to_database()
+    try:
+        for i in range(3):
+            assert aws_db.insert_record(TABLE_NAME, {'id': 800 + i, 'name': f"Buffered {i}", 'age': i}) == 0
+        assert aws_db.flush(timeout=10)
+        assert len(list(aws_db.iter_entries(TABLE_NAME, where='id >= 800 AND id < 804'))) == 3
+        assert aws_db.insert_record(TABLE_NAME, {'id': 803, 'name': 'Buffered 3', 'age': 3}) == 0
+    finally:
+        aws_db.close_connection()
+    aws_db.connect_to_database()
+    try:
+        assert aws_db.delete_records(TABLE_NAME, range(800, 804)) == 4
+    finally:
+        aws_db.close_connection()
+
+
+def test_diagnostics_flags_full_scan():
+    """
+    Test that diagnostics mode explains a slow full-table read and records a full scan finding.
+    """
+    aws_db = awsmysqllib.AWSMySQLLib.init_from_file(AWS_RDS_CONFIG_FILE)
+    if aws_db.diagnostics is None:
+        pytest.skip("diagnostics is not enabled in the configuration file")
+    aws_db.diagnostics.threshold = 0.0
+    assert aws_db.connect_to_database()
+    try:
+        assert aws_db.list_entries_in_table(TABLE_NAME) is not None
+        aws_db.diagnostics.close()
+        findings = aws_db.diagnostic_findings()
+        issues = [issue['issue'] for finding in findings for issue in finding['issues']]
+        assert 'full_scan' in issues
+    finally:
+        aws_db.close_connection()
+
+
+def test_transaction_commit_and_rollback(aws_database):
+    """
+    Test that a transaction commits once at the end and rolls back when a call inside it fails.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    with aws_database.transaction():
+        aws_database.insert_record(TABLE_NAME, {'id': 500, 'name': 'Committed', 'age': 1})
+        aws_database.update_record(TABLE_NAME, 500, {'age': 2})
+    entries = list(aws_database.iter_entries(TABLE_NAME, where={'id': 500}))
+    assert [entry['age'] for entry in entries] == [2]
+
+    with pytest.raises(TransactionRollbackError):
+        with aws_database.transaction():
+            aws_database.insert_record(TABLE_NAME, {'id': 501, 'name': 'Rolled back', 'age': 1})
+            aws_database.insert_record('missing_table', {'id': 1})
+    assert not list(aws_database.iter_entries(TABLE_NAME, where={'id': 501}))
+    assert aws_database.delete_record(TABLE_NAME, 500)
+
+
+def test_transaction_releases_to_its_own_pool(pooled_aws_db):
+    """
+    Test that a transaction open while the instance reconnects hands its connection back to the old pool.
+
+    Args:
+        pooled_aws_db (AWSMySQLLib): Fixture instance over a pool of fake connections.
+    """
+    old_pool = pooled_aws_db.pool
+    with pooled_aws_db.transaction():
+        pooled_aws_db.pool = ConnectionPool(FakeConnection, min_size=0, max_size=2)
+    assert old_pool.idle == 1
+    assert pooled_aws_db.pool.size == 0
+
+
+def test_failed_commit_discards_connection(pooled_aws_db):
+    """
+    Test that a connection whose commit failed is closed instead of going back to the pool.
+
+    Args:
+        pooled_aws_db (AWSMySQLLib): Fixture instance over a pool of fake connections.
+    """
+    with pytest.raises(ConnectionResetError):
+        with pooled_aws_db.transaction():
+            connection = pooled_aws_db._local.connection
+            connection.fail_commit = True
+    assert not connection.open
+    assert pooled_aws_db.pool.size == 0
+
+
+def test_invalid_arguments_roll_back_transaction(pooled_aws_db):
+    """
+    Test that a call rejecting its arguments before running any statement fails the transaction.
+
+    Args:
+        pooled_aws_db (AWSMySQLLib): Fixture instance over a pool of fake connections.
+    """
+    with pytest.raises(TransactionRollbackError):
+        with pooled_aws_db.transaction():
+            assert not pooled_aws_db.create_table('example', {'id': 'INT'}, partition_by={'type': 'HASH'})
+    assert pooled_aws_db.pool.size - pooled_aws_db.pool.idle == 0
+
+
+def test_rejected_bulk_load_rolls_back_transaction(pooled_aws_db):
+    """
+    Test that a bulk load refused before it runs, here because local_infile is off, fails the transaction.
+
+    Args:
+        pooled_aws_db (AWSMySQLLib): Fixture instance over a pool of fake connections.
+    """
+    with pytest.raises(TransactionRollbackError):
+        with pooled_aws_db.transaction():
+            connection = pooled_aws_db._local.connection
+            assert pooled_aws_db.bulk_load(TABLE_NAME, [{'id': 1}]) is None
+    assert connection.calls[-1] == 'rollback'
+
+
+def test_update_delete_records(aws_database):
+    """
+    Test to update and delete many records by ID in chunks.
+
+    Args:
+        aws_database (AWSMySQLLib): Fixture instance connected to the database.
+    """
+    ids = range(2000, 2100)
+    assert aws_database.insert_records(
+        TABLE_NAME, ({'id': i, 'name': 'Bulk', 'age': 0} for i in ids)) == 100
+    updates = {i: {'age': i % 7} if i % 2 else {'name': f"Bulk {i}"} for i in ids}
+    # Rows whose new age equals the current age of 0 are matched but not changed.
+    changed = sum(1 for i in ids if not (i % 2 and i % 7 == 0))
+    assert aws_database.update_records(TABLE_NAME, updates, chunk_size=30) == changed
+    assert aws_database.delete_records(TABLE_NAME, ids, chunk_size=40) == 100
+
+
 def test_delete_table(aws_database):
     """
     Test to delete a table from the database.
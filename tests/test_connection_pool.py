@@ -0,0 +1,199 @@
+import threading
+import time
+import pytest
+from conftest import FakeConnection
+from storageservice.connectionpool import ConnectionPool, PoolTimeoutError, PoolClosedError
+
+# ? pytest -sv test_connection_pool.py
+
+
+def test_fill_opens_min_size():
+    """
+    Test that fill() opens min_size connections up front.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=3, max_size=5)
+    pool.fill()
+    assert pool.size == 3 and pool.idle == 3
+
+
+def test_connection_is_reused():
+    """
+    Test that a released connection is handed out again instead of opening a new one.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert pool.size == 1
+    assert first.pings == 1
+
+
+def test_checkout_times_out_when_exhausted():
+    """
+    Test that checkout waits at most the timeout when all connections are in use.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(held)
+    assert pool.acquire(timeout=0.05) is held
+
+
+def test_dead_connection_is_replaced():
+    """
+    Test that a connection failing the checkout ping is replaced.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1)
+    with pool.connection() as first:
+        first.alive = False
+    with pool.connection() as second:
+        pass
+    assert second is not first
+    assert not first.open
+    assert pool.size == 1
+
+
+def test_error_in_block_discards_connection():
+    """
+    Test that a connection is discarded when its with-block fails.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            raise RuntimeError("boom")
+    assert pool.size == 0
+    assert not connection.open
+
+
+def test_max_lifetime_recycles():
+    """
+    Test that connections older than max_lifetime are recycled.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, max_lifetime=0.01)
+    with pool.connection() as first:
+        time.sleep(0.02)
+    with pool.connection() as second:
+        pass
+    assert second is not first
+    assert not first.open
+
+
+def test_idle_eviction_keeps_min_size():
+    """
+    Test that idle connections above min_size are evicted after max_idle.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=3, max_idle=0.01)
+    connections = [pool.acquire() for _ in range(3)]
+    for connection in connections:
+        pool.release(connection)
+    time.sleep(0.02)
+    pool.release(pool.acquire())
+    assert pool.size == 1
+    assert sum(connection.open for connection in connections) == 1
+
+
+def test_closed_pool_refuses_checkout():
+    """
+    Test that closing the pool closes idle connections and refuses checkouts.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=2, max_size=2)
+    connections = [pool.acquire() for _ in range(2)]
+    for connection in connections:
+        pool.release(connection)
+    pool.close()
+    assert not any(connection.open for connection in connections)
+    with pytest.raises(PoolClosedError):
+        pool.acquire()
+
+
+def test_concurrent_checkouts_stay_bounded():
+    """
+    Test that concurrent threads never share a connection or exceed max_size.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=4)
+    in_use = []
+    seen = set()
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            with pool.connection() as connection:
+                with lock:
+                    assert connection not in in_use
+                    in_use.append(connection)
+                    seen.add(connection)
+                    peak.append(len(in_use))
+                with lock:
+                    in_use.remove(connection)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 4
+    assert len(seen) <= 4
+
+
+def test_ping_skipped_for_recently_used_connection():
+    """
+    Test that only connections idle for at least ping_interval are pinged on checkout.
+    """
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, ping_interval=0.05)
+    with pool.connection() as first:
+        pass
+    with pool.connection():
+        pass
+    assert first.pings == 0
+    time.sleep(0.06)
+    with pool.connection():
+        pass
+    assert first.pings == 1
+
+
+def test_on_checkout_hook():
+    """
+    Test that on_checkout sees every connection handed out and a failing hook discards it.
+    """
+    seen = []
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, on_checkout=seen.append)
+    with pool.connection() as first:
+        pass
+    with pool.connection():
+        pass
+    assert seen == [first, first]
+
+    def failing(connection):
+        raise RuntimeError("cannot select database")
+
+    pool.on_checkout = failing
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert not first.open
+    assert pool.size == 0
+
+
+def test_connection_property_does_not_hold_pool_slots(pooled_aws_db):
+    """
+    Test that reading the deprecated connection property from many threads checks nothing out
+    and opens a single connection, closed with the instance.
+    """
+    with pytest.warns(DeprecationWarning):
+        legacy = pooled_aws_db.connection
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(pooled_aws_db.connection)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(connection is legacy for connection in seen)
+    assert pooled_aws_db.pool.size == 0
+    with pooled_aws_db.transaction():
+        assert pooled_aws_db.connection is pooled_aws_db._local.connection
+    assert pooled_aws_db.pool.size - pooled_aws_db.pool.idle == 0
+    pooled_aws_db.close_connection()
+    assert not legacy.open
@@ -0,0 +1,113 @@
+import threading
+from storageservice.diagnostics import QueryDiagnostics, analyze_plan, statement_fingerprint
+from storageservice.querystats import QueryEvent
+
+# ? pytest -sv test_diagnostics.py
+
+
+MYSQL_FULL_SCAN_PLAN = {
+    'query_block': {
+        'select_id': 1,
+        'ordering_operation': {
+            'using_filesort': True,
+            'table': {
+                'table_name': 'example_table',
+                'access_type': 'ALL',
+                'rows_examined_per_scan': 50000,
+                'attached_condition': "(`db`.`example_table`.`age` = 30)",
+            },
+        },
+    },
+}
+
+MARIADB_TEMPORARY_PLAN = {
+    'query_block': {
+        'select_id': 1,
+        'filesort': {
+            'sort_key': 'count(0) desc',
+            'temporary_table': {
+                'table': {'table_name': 'example_table', 'access_type': 'index', 'key': 'idx_age', 'rows': 900},
+            },
+        },
+    },
+}
+
+INDEXED_PLAN = {
+    'query_block': {
+        'select_id': 1,
+        'table': {'table_name': 'example_table', 'access_type': 'const', 'key': 'PRIMARY',
+                  'possible_keys': ['PRIMARY'], 'rows_examined_per_scan': 1},
+    },
+}
+
+
+def make_event(statement, latency=1.0, kind='SELECT', host=None):
+    """
+    Helper function to build a QueryEvent for a statement.
+    """
+    return QueryEvent(kind, 'example_table', latency, 1, len(statement), statement, host=host)
+
+
+def test_analyze_plan_flags_expensive_steps():
+    """
+    Test that full scans without usable indexes, filesorts and temporary tables are flagged.
+    """
+    issues = {issue['issue']: issue for issue in analyze_plan(MYSQL_FULL_SCAN_PLAN)}
+    assert set(issues) == {'filesort', 'full_scan', 'missing_index'}
+    assert issues['full_scan'] == {'issue': 'full_scan', 'table': 'example_table', 'rows': 50000}
+    issues = {issue['issue']: issue for issue in analyze_plan(MARIADB_TEMPORARY_PLAN)}
+    assert set(issues) == {'filesort', 'temporary_table', 'full_index_scan'}
+    assert issues['full_index_scan']['key'] == 'idx_age'
+    assert analyze_plan(INDEXED_PLAN) == []
+
+
+def test_fingerprint_ignores_values():
+    """
+    Test that statements differing only in their values share a fingerprint.
+    """
+    assert statement_fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'a b'") == \
+        statement_fingerprint("SELECT *  FROM t WHERE id = 123 AND name = 'it\\'s'") == \
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+
+
+def test_slow_statements_are_explained_once_per_interval():
+    """
+    Test that only slow, explainable statements are explained, each shape once per interval.
+    """
+    explained = []
+    done = threading.Event()
+
+    def explain(statement, host):
+        explained.append((statement, host))
+        done.set()
+        return MYSQL_FULL_SCAN_PLAN
+
+    diagnostics = QueryDiagnostics(explain, threshold=0.5, interval=60)
+    diagnostics.observe(make_event("SELECT * FROM example_table WHERE age = 30", latency=0.1))
+    diagnostics.observe(make_event("INSERT INTO example_table (id) VALUES (1)", kind='INSERT'))
+    diagnostics.observe(make_event("SELECT * FROM example_table WHERE age = 30", host='replica-1'))
+    diagnostics.observe(make_event("SELECT * FROM example_table WHERE age = 31"))
+    diagnostics.close()
+    assert explained == [("SELECT * FROM example_table WHERE age = 30", 'replica-1')]
+    findings = diagnostics.findings()
+    assert len(findings) == 1
+    assert findings[0]['fingerprint'] == "SELECT * FROM example_table WHERE age = ?"
+    assert findings[0]['host'] == 'replica-1'
+    assert 'statement' not in findings[0]
+    assert findings[0]['plan'] is MYSQL_FULL_SCAN_PLAN
+
+
+def test_findings_are_bounded_and_errors_ignored():
+    """
+    Test that only the most recent findings are kept and a failing EXPLAIN records nothing.
+    """
+    def explain(statement, host):
+        if 'broken' in statement:
+            raise RuntimeError("EXPLAIN failed")
+        return MYSQL_FULL_SCAN_PLAN
+
+    diagnostics = QueryDiagnostics(explain, max_findings=2, interval=60)
+    for table in ('t1', 't2', 'broken', 't3'):
+        diagnostics.observe(make_event(f"SELECT * FROM {table}"))
+    diagnostics.close()
+    assert [finding['fingerprint'] for finding in diagnostics.findings()] == ["SELECT * FROM t2", "SELECT * FROM t3"]
@@ -0,0 +1,105 @@
+import pytest
+from types import SimpleNamespace
+from storageservice.querystats import QueryEvent, QueryStats, LatencyHistogram
+
+# ? pytest -sv test_query_stats.py
+
+
+def make_event(latency, kind='SELECT', table='example_table', rows=1, error=None):
+    """
+    Helper function to build a QueryEvent with a short statement.
+    """
+    return QueryEvent(kind, table, latency, rows, 20, f"{kind} ... {table}", error)
+
+
+def test_percentiles_follow_distribution():
+    """
+    Test that histogram percentiles land within one bucket of the true values.
+    """
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.record(make_event(i / 1000.0))
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.2)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.2)
+    assert histogram.percentile(100) == pytest.approx(1.0)
+
+
+def test_snapshot_groups_by_kind_and_table():
+    """
+    Test that the snapshot has a summary per statement kind and table plus a total.
+    """
+    stats = QueryStats(slow_query_threshold=None)
+    stats.record(make_event(0.01, rows=5))
+    stats.record(make_event(0.02, kind='INSERT', rows=3))
+    stats.record(make_event(0.03, kind='INSERT', error=RuntimeError("boom")))
+    snapshot = stats.snapshot()
+    assert snapshot['total']['count'] == 3
+    assert snapshot['total']['errors'] == 1
+    assert snapshot['statements']['INSERT example_table']['rows'] == 4
+    assert snapshot['statements']['SELECT example_table']['count'] == 1
+    stats.reset()
+    assert stats.snapshot()['total']['count'] == 0
+
+
+def test_listeners_receive_events_and_errors_are_contained():
+    """
+    Test that listeners see every event and a failing listener does not stop the others.
+    """
+    stats = QueryStats(slow_query_threshold=None)
+    received = []
+
+    def failing(event):
+        raise ValueError("listener failure")
+
+    stats.add_listener(failing)
+    stats.add_listener(received.append)
+    event = make_event(0.001)
+    stats.record(event)
+    assert received == [event]
+    stats.remove_listener(received.append)
+    stats.record(event)
+    assert received == [event]
+
+
+def test_slow_queries_are_logged(caplog):
+    """
+    Test that statements above the threshold are logged as warnings.
+    """
+    stats = QueryStats(slow_query_threshold=0.5)
+    with caplog.at_level('WARNING'):
+        stats.record(make_event(0.1))
+        stats.record(make_event(0.75))
+    assert len(caplog.records) == 1
+    assert 'Slow query' in caplog.records[0].getMessage()
+
+
+def test_slow_query_log_hides_values(caplog):
+    """
+    Test that a slow statement is logged as its fingerprint, without the values it was run with.
+    """
+    stats = QueryStats(slow_query_threshold=0.5)
+    statement = "SELECT * FROM example_table WHERE name = 'John Smith' AND age = 40"
+    with caplog.at_level('WARNING'):
+        stats.record(QueryEvent('SELECT', 'example_table', 0.75, 1, len(statement), statement))
+    message = caplog.records[0].getMessage()
+    assert 'John Smith' not in message and '40' not in message
+    assert "WHERE name = ? AND age = ?" in message
+
+
+def test_timed_records_executed_statement_and_errors():
+    """
+    Test that a timed statement is recorded with its kind, row count and size, and a failed one with its error.
+    """
+    stats = QueryStats(slow_query_threshold=None)
+    received = []
+    stats.add_listener(received.append)
+    cursor = SimpleNamespace(rowcount=3, _executed="UPDATE example_table SET name = 'é'")
+    with stats.timed(cursor, "UPDATE example_table SET name = %s", 'example_table'):
+        pass
+    with pytest.raises(ValueError):
+        with stats.timed(cursor, "  delete FROM example_table", 'example_table'):
+            raise ValueError("statement failure")
+    assert [(e.kind, e.rows) for e in received] == [('UPDATE', 3), ('DELETE', None)]
+    assert received[0].statement_bytes == len(cursor._executed) + 1
+    assert isinstance(received[1].error, ValueError)
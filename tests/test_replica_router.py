@@ -0,0 +1,155 @@
+from contextlib import contextmanager, nullcontext
+import threading
+import time
+import pymysql
+from conftest import FakeConnection
+from storageservice.connectionpool import ConnectionPool
+from storageservice.replicarouter import ReplicaRouter
+
+# ? pytest -sv test_replica_router.py
+
+
+class FakePool:
+    """
+    Stand-in for a ConnectionPool of one replica, whose connection reports the replica's lag.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.server = FakeConnection()
+        self.lag = 0
+        self.reachable = True
+        self.size = 0
+        self.idle = 0
+        self.closed = False
+
+    @contextmanager
+    def connection(self, timeout=None):
+        if not self.reachable:
+            raise ConnectionError(f"{self.host} is down")
+        self.server.row = {'Seconds_Behind_Source': self.lag}
+        yield self.server
+
+    def close(self):
+        self.closed = True
+
+
+def test_round_robin_across_replicas():
+    """
+    Test that reads rotate across all healthy replicas.
+    """
+    router = ReplicaRouter(['r1', 'r2', 'r3'], FakePool)
+    chosen = [router.choose().host for _ in range(6)]
+    assert chosen == ['r1', 'r2', 'r3', 'r1', 'r2', 'r3']
+
+
+def test_lagging_replica_is_dropped_and_restored():
+    """
+    Test that a replica above max_lag leaves rotation and returns once it catches up.
+    """
+    router = ReplicaRouter(['r1', 'r2'], FakePool, max_lag=5, check_interval=3600)
+    r2 = router.replicas[1].pool
+    r2.lag = 30
+    router.refresh()
+    assert {router.choose().host for _ in range(4)} == {'r1'}
+    r2.lag = 1
+    router.refresh()
+    assert {router.choose().host for _ in range(4)} == {'r1', 'r2'}
+    assert router.status()[1] == {'host': 'r2', 'healthy': True, 'lag': 1.0}
+
+
+def test_unreachable_replicas_fall_back_to_none():
+    """
+    Test that no pool is chosen when every replica is unreachable, so reads use the writer.
+    """
+    router = ReplicaRouter(['r1'], FakePool, check_interval=3600)
+    router.replicas[0].pool.reachable = False
+    router.refresh()
+    assert router.choose() is None
+
+
+def test_mark_down_until_next_check():
+    """
+    Test that a replica marked down after a failed checkout is skipped until it is rechecked.
+    """
+    router = ReplicaRouter(['r1', 'r2'], FakePool, check_interval=3600)
+    router.mark_down(router.replicas[0].pool, ConnectionError("refused"))
+    assert {router.choose().host for _ in range(4)} == {'r2'}
+
+
+def test_least_loaded_strategy():
+    """
+    Test that the least_loaded strategy picks the replica with the fewest checked-out connections.
+    """
+    router = ReplicaRouter(['r1', 'r2'], FakePool, strategy='least_loaded')
+    r1, r2 = (replica.pool for replica in router.replicas)
+    r1.size = 5
+    r2.size = 2
+    assert router.choose().host == 'r2'
+    router.close()
+    assert r1.closed and r2.closed
+
+
+def test_checks_run_in_background():
+    """
+    Test that a due health check does not block the read that triggers it.
+    """
+    router = ReplicaRouter(['r1'], FakePool, check_interval=0)
+    router.refresh()
+    r1 = router.replicas[0].pool
+    r1.reachable = False
+    release = threading.Event()
+    r1.connection = lambda timeout=None: (release.wait(), FakePool.connection(r1))[1]
+    start = time.monotonic()
+    assert router.choose().host == 'r1'
+    assert time.monotonic() - start < 0.5
+    release.set()
+    router.refresh()
+    assert router.choose() is None
+
+
+def test_missing_replication_privilege_keeps_replicas(caplog):
+    """
+    Test that a denied SHOW REPLICA STATUS leaves replicas in rotation with unknown lag and logs once.
+    """
+    router = ReplicaRouter(['r1', 'r2'], FakePool, max_lag=5, check_interval=3600)
+    for replica in router.replicas:
+        replica.pool.server.error = pymysql.err.OperationalError(
+            1227, "Access denied; you need the REPLICATION CLIENT privilege")
+    router.refresh()
+    router.refresh()
+    assert {router.choose().host for _ in range(4)} == {'r1', 'r2'}
+    assert router.status()[0] == {'host': 'r1', 'healthy': True, 'lag': None}
+    assert len([record for record in caplog.records if 'REPLICATION CLIENT' in record.getMessage()]) == 1
+
+
+def test_busy_replica_stays_in_rotation(pooled_aws_db):
+    """
+    Test that a read finding the replica pool busy falls back to the writer without marking the replica down.
+    """
+    replica_pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, timeout=5)
+    router = ReplicaRouter(['r1'], lambda host: replica_pool, check_interval=3600)
+    router.refresh()
+    pooled_aws_db.replicas = router
+    with replica_pool.connection() as held:
+        with pooled_aws_db._borrow(read_only=True) as connection:
+            assert connection is not held
+    assert router.status()[0]['healthy']
+    with pooled_aws_db._borrow(read_only=True) as connection:
+        assert replica_pool.size == 1 and replica_pool.idle == 0
+
+
+def test_statement_is_explained_on_the_server_that_ran_it(pooled_aws_db):
+    """
+    Test that EXPLAIN for a statement read from a replica runs on that replica, and others on the writer.
+    """
+    router = ReplicaRouter(['r1', 'r2'], FakePool, check_interval=3600)
+    pooled_aws_db.replicas = router
+    r2 = router.replicas[1].pool
+    statement = "SELECT * FROM example_table WHERE age = 30"
+    r2.server.row = ('{"query_block": {}}',)
+    # FakePool resets the row on checkout, so only the replica's own connection is consulted.
+    r2.connection = lambda timeout=None: nullcontext(r2.server)
+    assert pooled_aws_db._explain(statement, 'r2') == {'query_block': {}}
+    assert r2.server.calls == [f"EXPLAIN FORMAT=JSON {statement}"]
+    assert router.replicas[0].pool.server.calls == []
@@ -0,0 +1,134 @@
+import time
+from storageservice.resultcache import ResultCache
+
+# ? pytest -sv test_result_cache.py
+
+
+def test_hits_and_misses_are_counted():
+    """
+    Test that a stored result is returned and the counters track hits and misses.
+    """
+    cache = ResultCache(max_entries=4)
+    assert cache.get('a') == (False, None)
+    assert cache.put('a', 'example_table', [{'id': 1}], cache.generation('example_table'))
+    assert cache.get('a') == (True, [{'id': 1}])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['bytes'] > 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """
+    Test that the least recently used result is evicted when max_entries is exceeded.
+    """
+    cache = ResultCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.put(key, 'example_table', [key], cache.generation('example_table'))
+    cache.get('a')
+    cache.put('c', 'example_table', ['c'], cache.generation('example_table'))
+    assert cache.get('b')[0] is False
+    assert cache.get('a')[0] is True
+    assert cache.stats()['evictions'] == 1
+
+
+def test_memory_cap_and_ttl():
+    """
+    Test that results larger than max_bytes are not cached and expired results are dropped.
+    """
+    cache = ResultCache(max_entries=4, ttl=0.05, max_bytes=1024)
+    assert not cache.put('big', 't', [{'data': 'x' * 4096}], cache.generation('t'))
+    assert cache.put('small', 't', [1, 2, 3], cache.generation('t'))
+    time.sleep(0.1)
+    assert cache.get('small') == (False, None)
+    assert cache.stats()['bytes'] == 0
+
+
+def test_write_invalidates_table_and_in_flight_reads():
+    """
+    Test that invalidating a table drops its results and rejects a read that started before the write.
+    """
+    cache = ResultCache()
+    cache.put('t1', 'table_one', [1], cache.generation('table_one'))
+    cache.put('t2', 'table_two', [2], cache.generation('table_two'))
+    generation = cache.generation('table_one')
+    cache.invalidate_table('table_one')
+    assert cache.get('t1')[0] is False
+    assert cache.get('t2')[0] is True
+    assert not cache.put('t1', 'table_one', [1], generation)
+
+
+def test_clear_rejects_in_flight_read_of_uncached_table():
+    """
+    Test that a read that missed the cache before clear() cannot store its result afterwards.
+    """
+    cache = ResultCache()
+    assert cache.get('t1') == (False, None)
+    generation = cache.generation('table_one')
+    cache.clear()
+    assert not cache.put('t1', 'table_one', [1], generation)
+    assert cache.put('t1', 'table_one', [1], cache.generation('table_one'))
+
+
+def test_unscoped_write_in_transaction_clears_cache_at_commit(pooled_aws_db):
+    """
+    Test that a write through execute_query() inside a transaction clears the result cache again
+    at commit, and that schema changes clear the schema cache.
+    """
+    cache = pooled_aws_db.result_cache = ResultCache(max_entries=8)
+    with pooled_aws_db.transaction():
+        assert pooled_aws_db.execute_query("DELETE FROM example_table WHERE age > 30") == 1
+        # Another thread reads the rows as committed before this transaction ends.
+        assert cache.put('rows', 'example_table', [{'id': 1}], cache.generation('example_table'))
+    assert cache.get('rows') == (False, None)
+    pooled_aws_db._schema_cache[(None, 'dict')] = (float('inf'), [])
+    assert pooled_aws_db.execute_query("ALTER TABLE example_table ADD COLUMN email VARCHAR(255)") == 1
+    assert not pooled_aws_db._schema_cache
+
+
+def test_own_transaction_clears_cache_at_commit(pooled_aws_db):
+    """
+    Test that a read caching the old rows between a single-transaction insert and its commit
+    is dropped when the insert commits.
+    """
+    cache = pooled_aws_db.result_cache = ResultCache(max_entries=8)
+    pooled_aws_db._max_allowed_packet = 1024 * 1024
+    connection = pooled_aws_db.pool.acquire()
+    commit = connection.commit
+
+    def read_then_commit():
+        # Another thread reads the rows as committed before the insert commits.
+        table = pooled_aws_db._cache_table('example_table')
+        assert cache.put('rows', table, [], cache.generation(table))
+        commit()
+
+    connection.commit = read_then_commit
+    pooled_aws_db.pool.release(connection)
+    assert pooled_aws_db.insert_records('example_table', [{'id': 1}], single_transaction=True) == 1
+    assert connection.calls[-1] == 'commit'
+    assert cache.get('rows') == (False, None)
+
+
+def test_remove_database_clears_caches(pooled_aws_db):
+    """
+    Test that dropping a database clears the cached results and schema of its tables.
+    """
+    cache = pooled_aws_db.result_cache = ResultCache(max_entries=8)
+    assert cache.put('rows', 'example_table', [{'id': 1}], cache.generation('example_table'))
+    pooled_aws_db._schema_cache[('example', 'dict')] = (float('inf'), [])
+    assert pooled_aws_db.remove_database('example')
+    assert cache.get('rows') == (False, None)
+    assert not pooled_aws_db._schema_cache
+
+
+def test_qualified_and_quoted_writes_invalidate_cached_reads(pooled_aws_db):
+    """
+    Test that a table written to as `database`.`table` drops the results cached for its plain name.
+    """
+    cache = pooled_aws_db.result_cache = ResultCache(max_entries=8)
+    pooled_aws_db._connected_database = 'example'
+    table = pooled_aws_db._cache_table('example_table')
+    assert cache.put('rows', table, [{'id': 1}], cache.generation(table))
+    assert cache.put('other', 'other.example_table', [{'id': 2}], cache.generation('other.example_table'))
+    assert pooled_aws_db.delete_records('`example`.`example_table`', [1]) == 1
+    assert cache.get('rows') == (False, None)
+    assert cache.get('other') == (True, [{'id': 2}])
@@ -0,0 +1,107 @@
+import time
+import pytest
+from storageservice.shardrouter import ShardRouter
+
+# ? pytest -sv test_shard_router.py
+
+
+class FakeShard:
+    """
+    Stand-in for an AWSMySQLLib instance returning fixed rows after a delay.
+    """
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.queries = []
+
+    def execute_query(self, query, params=None):
+        self.queries.append((query, params))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("shard is down")
+        return [{'shard': self.name}]
+
+    def list_entries_in_table(self, table):
+        return [{'shard': self.name, 'table': table}]
+
+    def close_connection(self):
+        return True
+
+
+@pytest.fixture
+def router():
+    """
+    Fixture to set up a ShardRouter over three fake shards, the last one slow.
+
+    Yields:
+        ShardRouter: The router.
+    """
+    shards = {'a': FakeShard('a'), 'b': FakeShard('b'), 'c': FakeShard('c', delay=0.5)}
+    shard_router = ShardRouter(shards, timeout=0.2)
+    yield shard_router
+    shard_router.close()
+
+
+def test_shard_for_is_stable_and_spread(router):
+    """
+    Test that a key always maps to the same shard and keys spread over all shards.
+    """
+    assert router.shard_for(42) == router.shard_for('42')
+    assert {router.shard_for(tenant) for tenant in range(100)} == {'a', 'b', 'c'}
+    assert router.get(42) is router.shards[router.shard_for(42)]
+
+
+def test_fan_out_query_with_timeout(router):
+    """
+    Test that a statement runs on every shard and a shard that exceeds the timeout yields None.
+    """
+    start = time.monotonic()
+    results = router.fan_out("SELECT * FROM example_table WHERE id = %s", 5)
+    assert time.monotonic() - start < 0.45
+    assert results == {'a': [{'shard': 'a'}], 'b': [{'shard': 'b'}], 'c': None}
+    assert router.shards['a'].queries == [("SELECT * FROM example_table WHERE id = %s", (5,))]
+
+
+def test_fan_out_method_on_selected_shards_merged(router):
+    """
+    Test that a method name runs on the selected shards only and merge concatenates the rows.
+    """
+    rows = router.fan_out('list_entries_in_table', 'example_table', shards=['b', 'a'], merge=True)
+    assert rows == [{'shard': 'a', 'table': 'example_table'}, {'shard': 'b', 'table': 'example_table'}]
+    with pytest.raises(AttributeError):
+        router.fan_out('_borrow')
+    with pytest.raises(KeyError):
+        router.fan_out('list_entries_in_table', 'example_table', shards=['z'])
+
+
+def test_iter_fan_out_streams_and_isolates_failures(router):
+    """
+    Test that results are yielded as shards finish and a failing shard does not stop the others.
+    """
+    router.shards['a'].fail = True
+    results = list(router.iter_fan_out(lambda shard: shard.execute_query("SELECT 1"), timeout=2))
+    assert results[-1][0] == 'c'
+    assert dict(results) == {'a': None, 'b': [{'shard': 'b'}], 'c': [{'shard': 'c'}]}
+
+
+def test_one_word_statement_runs_as_sql(router):
+    """
+    Test that a one-word statement such as COMMIT is run as SQL rather than looked up as a method.
+    """
+    results = router.fan_out('COMMIT', shards=['a'])
+    assert results == {'a': [{'shard': 'a'}]}
+    assert router.shards['a'].queries == [('COMMIT', None)]
+
+
+def test_timeout_counts_from_when_each_call_starts():
+    """
+    Test that a shard queued behind a slow one is not timed out for the time it waited for a thread.
+    """
+    shards = {'a': FakeShard('a', delay=0.3), 'b': FakeShard('b', delay=0.1)}
+    shard_router = ShardRouter(shards, timeout=0.2, max_workers=1)
+    try:
+        assert shard_router.fan_out("SELECT 1") == {'a': None, 'b': [{'shard': 'b'}]}
+    finally:
+        shard_router.close()
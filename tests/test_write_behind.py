@@ -0,0 +1,108 @@
+import threading
+import time
+from storageservice.writebehind import WriteBehindBuffer
+
+# ? pytest -sv test_write_behind.py
+
+
+class FakeWriter:
+    """
+    Stand-in for the batch write function that records batches and can be made to block or fail.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, table, records):
+        self.release.wait()
+        if self.fail:
+            raise RuntimeError("server has gone away")
+        self.batches.append((table, list(records)))
+
+
+def test_full_batch_is_flushed_and_grouped_by_table():
+    """
+    Test that reaching batch_size flushes the records as one write per table.
+    """
+    writer = FakeWriter()
+    buffer = WriteBehindBuffer(writer, batch_size=4, flush_interval=60)
+    for i in range(4):
+        assert buffer.put('table_one' if i % 2 else 'table_two', {'id': i})
+    deadline = time.monotonic() + 2
+    while len(writer.batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(writer.batches) == [('table_one', [{'id': 1}, {'id': 3}]),
+                                      ('table_two', [{'id': 0}, {'id': 2}])]
+    buffer.close()
+
+
+def test_partial_batch_is_flushed_after_interval():
+    """
+    Test that a batch below batch_size is written once the oldest record reaches flush_interval.
+    """
+    writer = FakeWriter()
+    buffer = WriteBehindBuffer(writer, batch_size=100, flush_interval=0.05)
+    buffer.put('example_table', {'id': 1})
+    time.sleep(0.3)
+    assert writer.batches == [('example_table', [{'id': 1}])]
+    buffer.close()
+
+
+def test_full_buffer_applies_backpressure():
+    """
+    Test that put() waits for space and gives up after its timeout while the buffer is full.
+    """
+    writer = FakeWriter()
+    writer.release.clear()
+    buffer = WriteBehindBuffer(writer, max_size=2, batch_size=1, flush_interval=0)
+    assert buffer.put('example_table', {'id': 1})
+    time.sleep(0.05)
+    assert buffer.put('example_table', {'id': 2})
+    assert buffer.put('example_table', {'id': 3})
+    assert not buffer.put('example_table', {'id': 4}, timeout=0.05)
+    writer.release.set()
+    assert buffer.flush(timeout=2)
+    assert [records[0]['id'] for _, records in writer.batches] == [1, 2, 3]
+    buffer.close()
+
+
+def test_failed_batch_goes_to_error_callback_and_close_drains():
+    """
+    Test that a failing batch is handed to on_error and close() writes what is still queued.
+    """
+    writer = FakeWriter()
+    failures = []
+    buffer = WriteBehindBuffer(writer, batch_size=100, flush_interval=60,
+                               on_error=lambda table, records, error: failures.append((table, records, error)))
+    writer.fail = True
+    buffer.put('example_table', {'id': 1})
+    assert buffer.flush(timeout=2)
+    assert failures[0][:2] == ('example_table', [{'id': 1}])
+    writer.fail = False
+    buffer.put('example_table', {'id': 2})
+    assert buffer.close(timeout=2)
+    assert writer.batches == [('example_table', [{'id': 2}])]
+    assert not buffer.put('example_table', {'id': 3})
+
+
+def test_close_timeout_reports_undrained_records():
+    """
+    Test that records still queued when close() times out go to on_error while the batch in flight finishes.
+    """
+    writer = FakeWriter()
+    writer.release.clear()
+    failures = []
+    buffer = WriteBehindBuffer(writer, batch_size=1, flush_interval=0,
+                               on_error=lambda table, records, error: failures.append((table, records, error)))
+    buffer.put('example_table', {'id': 1})
+    time.sleep(0.05)
+    buffer.put('example_table', {'id': 2})
+    assert not buffer.close(timeout=0.05)
+    assert failures[0][:2] == ('example_table', [{'id': 2}])
+    assert isinstance(failures[0][2], TimeoutError)
+    writer.release.set()
+    buffer._thread.join(2)
+    assert writer.batches == [('example_table', [{'id': 1}])]